@@ -0,0 +1,25 @@
+import asyncio
+
+from app.core import settings
+from app.services.diagnostics import admission_controller, loop_stall_detector
+
+
+async def watch_loop_stalls():
+	"""Run the event loop stall detector while the application is running."""
+	threshold = settings.SLOW_CALLBACK_THRESHOLD
+	if threshold is None:
+		return
+	loop_stall_detector.start(threshold=threshold)
+	try:
+		while True:
+			await asyncio.sleep(60)
+	finally:
+		loop_stall_detector.stop()
+
+
+async def probe_loop_lag():
+	"""Measure the event loop lag for admission control while the stall detector is off."""
+	max_lag = settings.ADMISSION_MAX_LAG
+	if max_lag is None or settings.SLOW_CALLBACK_THRESHOLD is not None:
+		return
+	await admission_controller.probe_lag(interval=max(max_lag / 4, 0.005))
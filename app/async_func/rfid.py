@@ -59,6 +59,83 @@ async def clear_old_tags():
 				)
 
 
+async def snapshot_tag_state():
+	"""Save the tags and write list periodically so a restart can restore them."""
+	interval = settings.TAG_SNAPSHOT_INTERVAL
+	if interval is None:
+		return
+	snapshot = rfid_manager.snapshot
+	try:
+		while True:
+			await asyncio.sleep(interval)
+			record = snapshot.capture()
+			if record is None:
+				continue
+			try:
+				await asyncio.to_thread(snapshot.write, record)
+			except OSError as e:
+				# the next capture() is a full record, so the changes in this one are not lost
+				logging.error(f'Error writing tag snapshot: {e}')
+	finally:
+		# shutdown: write what changed since the last record
+		try:
+			snapshot.save()
+		except Exception as e:
+			logging.error(f'Error writing final tag snapshot: {e}')
+
+
+async def flush_traffic_recorder():
+	"""Write queued capture records once per second while a capture is running."""
+	recorder = rfid_manager.recorder
+	try:
+		while True:
+			await asyncio.sleep(1)
+			await recorder.flush()
+	finally:
+		await recorder.flush()
+
+
+async def publish_mqtt():
+	"""Keep the MQTT connection open and publish the queued tag/event batches."""
+	publisher = rfid_manager.integration.mqtt_publisher
+	if publisher is None:
+		return
+	await publisher.run()
+
+
+async def run_mqtt_ingest():
+	"""Subscribe to the configured reader topics and feed received tags/events."""
+	ingest = rfid_manager.mqtt_ingest
+	if ingest is None:
+		return
+	await ingest.run()
+
+
+async def run_line_ingest():
+	"""Serve the raw TCP/UDP line-protocol listeners when a port is configured."""
+	server = rfid_manager.line_ingest
+	if not server.enabled:
+		return
+	await server.run()
+
+
+async def watch_product_master():
+	"""Load the product master index and reload it when the source file changes."""
+	product_master = rfid_manager.product_master
+	if product_master is None:
+		return
+	try:
+		await product_master.reload_if_changed()
+		interval = settings.PRODUCT_MASTER_INTERVAL
+		if interval is None:
+			await asyncio.Future()  # keep the index open until shutdown
+		while True:
+			await asyncio.sleep(interval)
+			await product_master.reload_if_changed()
+	finally:
+		product_master.close()
+
+
 async def clear_db():
 	"""Clear database at startup and daily at midnight."""
 	seconds_until_midnight = 0
@@ -124,3 +201,11 @@ async def clear_db():
 					session.rollback()
 
 		logging.info('Database cleanup completed.')
+
+
+async def close_priority_lanes():
+	"""Close the lane work still queued at shutdown so no coroutine is left unawaited."""
+	try:
+		await asyncio.Future()
+	finally:
+		rfid_manager.controller.lanes.close()
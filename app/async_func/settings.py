@@ -0,0 +1,21 @@
+import asyncio
+
+from app.core import settings
+from app.services.settings_service import settings_service
+
+
+async def watch_config_files():
+	"""Hot-reload device and dispatcher configs when their files change on disk."""
+	interval = settings.CONFIG_WATCH_INTERVAL
+	if interval is None:
+		return
+	reloader = settings_service.reloader
+	last_signature = reloader.signature()
+	while True:
+		await asyncio.sleep(interval)
+		signature = reloader.signature()
+		if signature == last_signature:
+			continue
+		await settings_service.hot_reload()
+		# the reload may rewrite device files (normalised keys)
+		last_signature = reloader.signature()
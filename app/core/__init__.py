@@ -3,6 +3,7 @@ from smartx_rfid.utils.logger_manager import LoggerManager
 import os
 from .build_templates import TemplateManager
 from .indicator import Indicator
+from .log_pipeline import setup_log_pipeline
 from smartx_rfid.utils.path import get_frozen_path
 from smartx_rfid.utils import AlertsManager
 import sys
@@ -25,6 +26,8 @@ ICON_PATH = get_frozen_path('app/static/icons/logo.ico')
 EXAMPLE_PATH = get_frozen_path('examples')
 
 DISPATCHER_PATH = f'{FILES_PATH}/dispatchers'
+STATE_PATH = f'{FILES_PATH}/state'
+CAPTURES_PATH = f'{FILES_PATH}/captures'
 EXAMPLES_DISPATCHER_PATH = f'{EXAMPLE_PATH}/dispatchers'
 
 ##CONFIG APLICATION
@@ -37,6 +40,8 @@ logger = LoggerManager(
 	storage_days=settings.STORAGE_DAYS,
 	base_filename=os.path.basename(os.getcwd()),
 )
+if settings.LOG_ASYNC:
+	log_listener = setup_log_pipeline(logger, rate_limits=settings.LOG_RATE_LIMITS)
 
 # templates
 templates = TemplateManager(TEMPLATES_PATH).templates
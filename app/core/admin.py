@@ -0,0 +1,31 @@
+import hmac
+import os
+
+from fastapi import Request
+
+ADMIN_TOKEN_ENV = 'ADMIN_TOKEN'
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+_LOCAL_HOSTS = {'127.0.0.1', '::1', 'localhost'}
+
+
+def is_admin_request(request: Request) -> bool:
+	"""
+	Check access to admin-only endpoints.
+
+	When the ``ADMIN_TOKEN`` environment variable is set, the request must send it in the
+	``X-Admin-Token`` header. Otherwise only requests from the gateway itself (loopback) are
+	accepted. The token is kept out of config.json because the settings are readable through
+	the API.
+
+	Args:
+	    request: Incoming request
+
+	Returns:
+	    True if the request may use admin endpoints
+	"""
+	token = os.environ.get(ADMIN_TOKEN_ENV)
+	if token:
+		provided = request.headers.get(ADMIN_TOKEN_HEADER, '')
+		return hmac.compare_digest(provided.encode(), token.encode())
+	client = request.client
+	return client is not None and client.host in _LOCAL_HOSTS
@@ -10,6 +10,7 @@ from smartx_rfid.utils.path import get_frozen_path, load_file, include_all_route
 from app.async_func import create_async_tasks
 from .exeption_handlers import setup_exeptions
 from .middleware import setup_middlewares
+from .responses import FastJSONResponse
 
 
 # Lifecicle
@@ -61,6 +62,7 @@ def create_application(title: str, swagger_path: str) -> FastAPI:
 		description=markdown_description,
 		redoc_url=None,
 		docs_url=None,
+		default_response_class=FastJSONResponse,
 	)
 
 	# Configure exception handlers and middlewares
@@ -0,0 +1,282 @@
+"""
+Non-blocking logging pipeline.
+
+LoggerManager (smartx_rfid) already writes the JSONL file from its own thread,
+but it serializes every record to JSON and writes the console line on the
+calling thread, which is the event loop for most of the RFID pipeline, and its
+writer opens the file once per record. This module replaces those handlers with
+a QueueHandler on the caller side and a QueueListener thread that owns the
+console and file output:
+
+- the caller only pays for the rate-limit check and the message formatting;
+- JSON serialization and console output happen on the listener thread;
+- the file handler writes everything that is queued in one batch;
+- noisy categories (per-tag messages) are capped per second before any
+  formatting, so suppressed messages cost a dict lookup.
+
+LoggerManager's writer thread is stopped once the pipeline takes over. File
+naming, daily rotation, cleanup and the fallback path still come from the
+LoggerManager instance through members that are private in smartx_rfid 11.7.2
+(``_get_filename_for_date``, ``_cleanup_old_logs``, ``_switch_to_default_path``);
+check them when upgrading that package.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from smartx_rfid.utils import LoggerManager
+
+_STANDARD_FIELDS = {
+	'name',
+	'msg',
+	'args',
+	'levelname',
+	'levelno',
+	'pathname',
+	'filename',
+	'module',
+	'exc_info',
+	'exc_text',
+	'stack_info',
+	'lineno',
+	'funcName',
+	'created',
+	'msecs',
+	'relativeCreated',
+	'thread',
+	'threadName',
+	'processName',
+	'process',
+	'message',
+	'taskName',
+	'asctime',
+}
+
+CONSOLE_FORMAT = '%(asctime)s [%(levelname)s] [%(pathname)s:%(lineno)d:%(funcName)s] %(message)s'
+
+
+class RateLimitFilter(logging.Filter):
+	"""
+	Cap the number of records per second for message categories.
+
+	A category is matched by the prefix of the *unformatted* message template
+	(``record.msg``), so the check never formats the message. When a window
+	closes with suppressed records, the next record of that category carries a
+	``suppressed`` field with the count.
+	"""
+
+	def __init__(self, limits: Dict[str, int] | None = None):
+		super().__init__()
+		self.limits: Dict[str, int] = {
+			prefix: int(limit) for prefix, limit in (limits or {}).items() if limit is not None
+		}
+		self._prefixes = tuple(self.limits)
+		self._windows: Dict[str, list] = {}  # prefix -> [window_start, count, suppressed]
+		self._lock = threading.Lock()
+		self.suppressed_total: Dict[str, int] = {prefix: 0 for prefix in self.limits}
+
+	def _category(self, record: logging.LogRecord) -> str | None:
+		msg = record.msg
+		if not self._prefixes or not isinstance(msg, str) or not msg.startswith(self._prefixes):
+			return None
+		for prefix in self._prefixes:
+			if msg.startswith(prefix):
+				return prefix
+		return None
+
+	def filter(self, record: logging.LogRecord) -> bool:
+		if record.levelno >= logging.WARNING:
+			return True
+		prefix = self._category(record)
+		if prefix is None:
+			return True
+
+		now = time.monotonic()
+		with self._lock:
+			window = self._windows.get(prefix)
+			if window is None or now - window[0] >= 1.0:
+				suppressed = window[2] if window else 0
+				self._windows[prefix] = [now, 1, 0]
+				if suppressed:
+					record.suppressed = suppressed
+				return True
+			if window[1] < self.limits[prefix]:
+				window[1] += 1
+				return True
+			window[2] += 1
+			self.suppressed_total[prefix] += 1
+			return False
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+	"""
+	QueueHandler that only merges the message arguments on the caller thread.
+
+	Exception text is kept apart (``exc_text``) so the JSON output keeps its
+	``exception`` field, and a full queue drops the record instead of blocking.
+	"""
+
+	def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+		message = record.getMessage()
+		exc_text = record.exc_text
+		if record.exc_info and not exc_text:
+			exc_text = logging.Formatter().formatException(record.exc_info)
+		record = copy.copy(record)
+		record.message = message
+		record.msg = message
+		record.args = None
+		record.exc_info = None
+		record.exc_text = exc_text
+		return record
+
+	def enqueue(self, record: logging.LogRecord) -> None:
+		try:
+			self.queue.put_nowait(record)
+		except queue.Full:
+			pass
+
+
+class BatchedJsonFileHandler(logging.Handler):
+	"""
+	JSONL file handler that buffers records and writes them in one call.
+
+	The buffer is flushed when it reaches ``batch_size`` or as soon as the
+	listener queue is empty, so bursts are written in batches and quiet periods
+	are written immediately. File naming, daily rotation, cleanup and the
+	fallback path are delegated to the LoggerManager instance (see the module
+	docstring for the smartx_rfid internals this relies on). A batch that
+	cannot be written is reported through ``handleError``.
+	"""
+
+	def __init__(self, manager: LoggerManager, log_queue: queue.Queue, batch_size: int = 500):
+		super().__init__()
+		self.manager = manager
+		self.log_queue = log_queue
+		self.batch_size = max(1, batch_size)
+		self._buffer: list[str] = []
+
+	@staticmethod
+	def to_json(record: logging.LogRecord) -> str:
+		entry: Dict[str, Any] = {
+			'timestamp': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+			'level': record.levelname,
+			'logger': record.name,
+			'message': record.getMessage(),
+			'module': record.module,
+			'function': record.funcName,
+			'thread': record.threadName,
+			'pathname': record.pathname,
+		}
+		if record.exc_text:
+			entry['exception'] = record.exc_text
+		for key, value in record.__dict__.items():
+			if key not in _STANDARD_FIELDS and key not in entry:
+				try:
+					json.dumps(value)
+					entry[key] = value
+				except TypeError:
+					entry[key] = str(value)
+		return json.dumps(entry, ensure_ascii=False)
+
+	def emit(self, record: logging.LogRecord) -> None:
+		try:
+			self._buffer.append(self.to_json(record))
+		except Exception:
+			self.handleError(record)
+			return
+		if len(self._buffer) >= self.batch_size or self.log_queue.empty():
+			self._flush(record)
+
+	def flush(self) -> None:
+		self._flush(None)
+
+	def _flush(self, record: logging.LogRecord | None) -> None:
+		if not self._buffer:
+			return
+		count = len(self._buffer)
+		data = '\n'.join(self._buffer) + '\n'
+		self._buffer.clear()
+
+		manager = self.manager
+		today = datetime.now(timezone.utc).date()
+		if today != manager.current_date:
+			manager.current_date = today
+			manager.filename = manager._get_filename_for_date(today)
+			manager._cleanup_old_logs()
+		try:
+			try:
+				self._write(manager.filename, data)
+			except OSError as e:
+				if not manager._switch_to_default_path(failed_path=manager.log_path, error=e):
+					raise
+				self._write(manager.filename, data)
+		except OSError:
+			if record is None:
+				record = logging.makeLogRecord({'msg': f'{count} buffered log records lost'})
+			self.handleError(record)
+
+	@staticmethod
+	def _write(filename: str, data: str) -> None:
+		with open(filename, 'a', encoding='utf-8') as f:
+			f.write(data)
+
+	def close(self) -> None:
+		self.flush()
+		super().close()
+
+
+def setup_log_pipeline(
+	manager: LoggerManager,
+	rate_limits: Dict[str, int] | None = None,
+	queue_size: int = 50_000,
+	batch_size: int = 500,
+) -> logging.handlers.QueueListener:
+	"""
+	Move console and JSON file output of the root logger to a listener thread.
+
+	Args:
+	    manager: LoggerManager that owns the log path and daily file naming.
+	    rate_limits: Max records per second for each message prefix.
+	    queue_size: Max records waiting for the listener; extra records are dropped.
+	    batch_size: Max records per file write.
+
+	Returns:
+	    The started QueueListener (stopped automatically at exit).
+	"""
+	log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+
+	console_handler = logging.StreamHandler()
+	console_handler.setLevel(logging.INFO)
+	console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+	file_handler = BatchedJsonFileHandler(manager, log_queue, batch_size=batch_size)
+	file_handler.setLevel(logging.INFO)
+
+	queue_handler = LazyQueueHandler(log_queue)
+	queue_handler.setLevel(logging.INFO)
+	queue_handler.addFilter(RateLimitFilter(rate_limits))
+
+	root = logging.getLogger()
+	for handler in root.handlers[:]:
+		root.removeHandler(handler)
+	# the file is written by file_handler now; let LoggerManager's writer drain and exit
+	manager.close()
+	root.addHandler(queue_handler)
+
+	listener = logging.handlers.QueueListener(
+		log_queue, console_handler, file_handler, respect_handler_level=True
+	)
+	listener.start()
+	# atexit runs in LIFO order: stop the listener first, then write what is left in the buffer
+	atexit.register(file_handler.flush)
+	atexit.register(listener.stop)
+
+	logging.info(f'Async log pipeline enabled: {manager.filename}')
+	return listener
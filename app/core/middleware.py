@@ -8,6 +8,8 @@ from fastapi.responses import JSONResponse
 from prometheus_fastapi_instrumentator import Instrumentator
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.gzip import GZipMiddleware
+from app.services.diagnostics import admission_controller
+from app.services.diagnostics.admission import classify
 from app.services.license import license_manager
 from fastapi.responses import RedirectResponse
 
@@ -35,6 +37,8 @@ def setup_middlewares(app: FastAPI):
 			app.add_middleware(obj)
 			print(f'[Middleware] Registered: {name}')
 
+	# Admission control runs before the BaseHTTPMiddleware stack, so shed requests cost little
+	app.add_middleware(AdmissionControlMiddleware)
 	app.add_middleware(GZipMiddleware, minimum_size=1000)
 	Instrumentator().instrument(app).expose(app, include_in_schema=False)
 
@@ -87,3 +91,35 @@ class LicenseValidationMiddleware(BaseHTTPMiddleware):
 				logging.warning(f'License validation failed for request to {request.url.path}')
 				return RedirectResponse(url='/license')
 		return await call_next(request)
+
+
+class AdmissionControlMiddleware:
+	"""
+	Pure ASGI middleware that admits requests by class (see
+	app.services.diagnostics.admission). Rejected requests get a 503 with
+	Retry-After; admitted ones are counted in flight until the response ends.
+	"""
+
+	def __init__(self, app):
+		self.app = app
+
+	async def __call__(self, scope, receive, send):
+		if scope['type'] != 'http':
+			return await self.app(scope, receive, send)
+
+		request_class = classify(scope['method'], scope['path'])
+		reason = admission_controller.admit(request_class)
+		if reason is not None:
+			response = JSONResponse(
+				status_code=503,
+				content={
+					'message': f'Server busy ({reason}), retry later.',
+					'class': request_class,
+				},
+				headers={'Retry-After': str(admission_controller.retry_after)},
+			)
+			return await response(scope, receive, send)
+		try:
+			await self.app(scope, receive, send)
+		finally:
+			admission_controller.release(request_class)
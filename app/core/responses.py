@@ -0,0 +1,102 @@
+"""
+Fast response encoding for large API payloads.
+
+``FastJSONResponse`` serializes with orjson when it is installed (tag dicts,
+datetimes and lists are encoded natively) and with the stdlib ``json`` module
+otherwise. Both produce the same output as FastAPI's ``jsonable_encoder`` for
+the payloads returned here (naive datetimes as ISO 8601 strings); anything
+else goes through ``jsonable_encoder`` one value at a time.
+
+Endpoints that return big lists build their response with
+``negotiated_response``, which skips the ``jsonable_encoder`` pass FastAPI
+runs on returned values and answers with MessagePack when the client sends
+``Accept: application/msgpack`` and the ``msgpack`` package is installed.
+"""
+
+import json
+from datetime import date, datetime, time
+from typing import Any
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+try:
+	import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+	orjson = None
+
+try:
+	import msgpack
+except ImportError:  # pragma: no cover - depends on the environment
+	msgpack = None
+
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+def _default(obj: Any) -> Any:
+	"""Encode values the fast encoders do not handle like jsonable_encoder does."""
+	return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+	"""
+	Serialize content to compact JSON.
+
+	Args:
+	    content: JSON-compatible data (datetimes and other ``jsonable_encoder`` types allowed).
+
+	Returns:
+	    bytes: UTF-8 JSON.
+	"""
+	if orjson is not None:
+		return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+	return json.dumps(
+		content,
+		default=_default,
+		ensure_ascii=False,
+		allow_nan=False,
+		separators=(',', ':'),
+	).encode('utf-8')
+
+
+def _msgpack_default(obj: Any) -> Any:
+	if isinstance(obj, (datetime, date, time)):
+		return obj.isoformat()
+	return jsonable_encoder(obj)
+
+
+class FastJSONResponse(JSONResponse):
+	def render(self, content: Any) -> bytes:
+		return dumps(content)
+
+
+class MsgpackResponse(Response):
+	media_type = 'application/msgpack'
+
+	def render(self, content: Any) -> bytes:
+		return msgpack.packb(content, default=_msgpack_default, use_bin_type=True)
+
+
+def wants_msgpack(request: Request) -> bool:
+	"""True when the client accepts MessagePack and msgpack is installed."""
+	if msgpack is None:
+		return False
+	accept = request.headers.get('accept', '')
+	return any(media_type in accept for media_type in MSGPACK_TYPES)
+
+
+def negotiated_response(request: Request, content: Any, status_code: int = 200) -> Response:
+	"""
+	Build a MessagePack or JSON response from the request's Accept header.
+
+	Args:
+	    request: Incoming request.
+	    content: Response data.
+	    status_code: HTTP status code.
+
+	Returns:
+	    Response: ``MsgpackResponse`` or ``FastJSONResponse``.
+	"""
+	response_class = MsgpackResponse if wants_msgpack(request) else FastJSONResponse
+	return response_class(content=content, status_code=status_code, headers={'Vary': 'Accept'})
@@ -0,0 +1,100 @@
+"""
+Uvicorn server profiles.
+
+``default`` keeps uvicorn's own choices (auto-detected loop and HTTP parser,
+5 s keep-alive, one process). ``performance`` is meant for the Linux gateways:
+
+- uvloop event loop and httptools HTTP parser, each falling back to asyncio /
+  h11 with a warning when the package is missing (uvloop never runs on
+  Windows, where main.py installs ``WindowsSelectorEventLoopPolicy``);
+- longer keep-alive so readers and dashboards reuse their connections instead
+  of reconnecting between posts, and a deeper listen backlog for bursts;
+- ``SERVER_WORKERS`` processes sharing the port. Every worker runs the whole
+  application lifespan with its own RfidManager, so more workers are refused
+  (one process is used) while a feature that must run once is enabled:
+  configured devices (each worker would connect them), line ingest (port
+  binds), MQTT ingest (duplicate subscriptions) or tag snapshots (concurrent
+  writes to one file). What remains is readers pushing over HTTP, where each
+  worker keeps the tags of the requests it received. Windows and frozen builds
+  always run a single process.
+"""
+
+import importlib.util
+import logging
+import sys
+from typing import Any, Dict, Optional, Sequence
+
+PROFILES = ('default', 'performance')
+
+PERFORMANCE_KEEP_ALIVE = 75
+PERFORMANCE_BACKLOG = 4096
+
+
+def _installed(module: str) -> bool:
+	return importlib.util.find_spec(module) is not None
+
+
+def server_options(
+	profile: str = 'default',
+	workers: int = 1,
+	keep_alive: Optional[int] = None,
+	backlog: Optional[int] = None,
+	platform: str = sys.platform,
+	frozen: bool = getattr(sys, 'frozen', False),
+	single_process: Sequence[str] = (),
+) -> Dict[str, Any]:
+	"""
+	Build the ``uvicorn.run`` keyword arguments of a server profile.
+
+	Args:
+	    profile: ``default`` or ``performance``.
+	    workers: Worker processes (``performance`` only).
+	    keep_alive: Keep-alive timeout in seconds; None uses the profile value.
+	    backlog: Listen backlog; None uses the profile value.
+	    platform: ``sys.platform`` of the host.
+	    frozen: True when running from a PyInstaller build.
+	    single_process: Enabled features that must not run in more than one worker.
+
+	Returns:
+	    Dict[str, Any]: Options for ``uvicorn.run``; ``workers`` is always present.
+
+	Raises:
+	    ValueError: If the profile is unknown.
+	"""
+	if profile not in PROFILES:
+		raise ValueError(f'Unknown server profile: {profile!r} (expected one of {PROFILES})')
+
+	options: Dict[str, Any] = {'workers': 1}
+	if profile == 'performance':
+		if platform == 'win32':
+			options['loop'] = 'asyncio'
+		elif _installed('uvloop'):
+			options['loop'] = 'uvloop'
+		else:
+			logging.warning('[ SERVER ] uvloop is not installed, using the asyncio loop')
+			options['loop'] = 'asyncio'
+
+		if _installed('httptools'):
+			options['http'] = 'httptools'
+		else:
+			logging.warning('[ SERVER ] httptools is not installed, using the h11 parser')
+			options['http'] = 'h11'
+
+		options['timeout_keep_alive'] = PERFORMANCE_KEEP_ALIVE
+		options['backlog'] = PERFORMANCE_BACKLOG
+		if workers > 1:
+			if platform == 'win32' or frozen:
+				logging.warning('[ SERVER ] Multiple workers are not supported here, using 1')
+			elif single_process:
+				logging.warning(
+					f'[ SERVER ] Multiple workers would each run {", ".join(single_process)}, '
+					'using 1'
+				)
+			else:
+				options['workers'] = workers
+
+	if keep_alive is not None:
+		options['timeout_keep_alive'] = keep_alive
+	if backlog is not None:
+		options['backlog'] = backlog
+	return options
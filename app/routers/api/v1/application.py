@@ -1,13 +1,14 @@
 import asyncio
 from app import __version__
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 from smartx_rfid.utils.path import get_prefix_from_path
 
 from app.services.settings_service import settings_service
 from app.schemas.application import SettingsSchema
 from app.core import settings
+from app.core.responses import negotiated_response
 from smartx_rfid.utils import delayed_function
 from app.services.tray import tray_manager
 from app.core import alerts_manager
@@ -66,6 +67,19 @@ async def import_config(data: dict):
 	return JSONResponse(content=settings_service.import_config(data))
 
 
+@router.post(
+	'/reload_config',
+	summary='Apply device and dispatcher config changes without restarting',
+	description=(
+		'Compares config/devices and config/dispatchers with the last applied content, '
+		'reloads only the devices that changed, rebuilds the dispatchers if needed and '
+		'keeps the tags in memory.'
+	),
+)
+async def reload_config():
+	return JSONResponse(content=await settings_service.hot_reload())
+
+
 @router.get('/get_version', summary='Get the current application version')
 async def get_version():
 	return JSONResponse(content={'version': __version__})
@@ -81,7 +95,9 @@ async def get_alerts():
 	summary='Generate table report',
 	description='Generates a report for a specified database table.',
 )
-async def generate_table_report(table_name: str, limit: int = 1000, offset: int = 0):
+async def generate_table_report(
+	request: Request, table_name: str, limit: int = 1000, offset: int = 0
+):
 	# Validate table
 	models = get_all_models()
 	valid_table = False
@@ -96,8 +112,9 @@ async def generate_table_report(table_name: str, limit: int = 1000, offset: int
 		return JSONResponse(status_code=400, content={'error': 'Invalid table name'})
 
 	try:
-		return rfid_manager.integration.generate_table_report(
+		report = rfid_manager.integration.generate_table_report(
 			model=table_model, limit=limit, offset=offset
 		)
+		return negotiated_response(request, report)
 	except Exception as e:
 		return JSONResponse(status_code=500, content={'error': str(e)})
@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 from smartx_rfid.utils.path import get_prefix_from_path
-from app.schemas.write_list import WriteListPrefixModel
+from app.schemas.write_list import WriteListBulkModel, WriteListPrefixModel
 from app.services import rfid_manager
 
 router_prefix = get_prefix_from_path(__file__)
@@ -28,6 +28,27 @@ async def controller_info():
 	return info
 
 
+@router.get(
+	'/write_stats',
+	summary='Get write-list scheduler statistics',
+	description='Scheduled, attempted and confirmed writes, queue sizes and tags encoded per minute.',
+)
+async def write_stats():
+	return rfid_manager.controller.write_scheduler.get_stats()
+
+
+@router.get(
+	'/lane_stats',
+	summary='Get priority lane statistics',
+	description=(
+		'Queued, running, started and dropped work per lane (control: device events, '
+		'tag: tag read dispatches) and the longest queue wait in seconds.'
+	),
+)
+async def lane_stats():
+	return rfid_manager.controller.lanes.get_stats()
+
+
 @router.post(
 	'/create_write_list_prefix',
 	summary='Write a list of tags to the RFID controller',
@@ -43,6 +64,27 @@ async def create_write_list_prefix(write_list: WriteListPrefixModel):
 	return write_list
 
 
+@router.post(
+	'/create_write_list',
+	summary='Create the write list in bulk',
+	description=(
+		'Adds many tags to the write list in one call, from a list of EPCs or a selector '
+		'(device, GTIN, EPC prefix). Targets are computed with a transform rule (prefix, '
+		'sgtin re-serialization or counter) and a single write_list_created event is emitted.'
+	),
+)
+async def create_write_list(data: WriteListBulkModel):
+	result = rfid_manager.controller.create_write_list(
+		rule=data.rule.model_dump(),
+		epcs=data.epcs,
+		selector=data.selector.model_dump() if data.selector is not None else None,
+		replace=data.replace,
+	)
+	if result['created'] == 0:
+		return JSONResponse(status_code=400, content={'message': 'No tags added', **result})
+	return result
+
+
 @router.post(
 	'/add_to_write_list/{tid}/{target}',
 	summary='Add a tag to the write list in the RFID controller',
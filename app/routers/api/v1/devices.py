@@ -1,11 +1,15 @@
 import logging
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 from smartx_rfid.utils.path import get_prefix_from_path
 from app.schemas.protected import ProtectedInventoryModel, ProtectedModeModel, ProtectListModel
 from smartx_rfid.schemas.devices import GpoSchema
 
+from app.core import settings
+from app.core.responses import negotiated_response
 from app.services import rfid_manager
+from app.services.jobs import job_manager, run_fleet_command, run_protected_mode_job, select_devices
+from app.schemas.fleet import FleetCommandModel
 from app.schemas.print import PrintModel
 
 router_prefix = get_prefix_from_path(__file__)
@@ -89,9 +93,9 @@ async def get_device_info(device_name: str):
 	summary='Get all devices information',
 	description='Returns connection and reading status for all registered devices.',
 )
-async def get_devices_info():
+async def get_devices_info(request: Request):
 	info = rfid_manager.devices.get_device_info()
-	return JSONResponse(status_code=200, content=info)
+	return negotiated_response(request, info)
 
 
 @router.get(
@@ -164,6 +168,35 @@ async def stop_inventory_all():
 	}
 
 
+@router.post(
+	'/fleet_command',
+	summary='Run a command on many devices',
+	description=(
+		'Runs set_power, write_gpo, start/stop_inventory or update_config on every device '
+		'matched by the selector, concurrently with a timeout per device, and returns the '
+		'result of each device. set_power and update_config are not cancelled at the timeout: '
+		'the device is reported as failed and its reconfiguration finishes in the background.'
+	),
+)
+async def fleet_command(data: FleetCommandModel):
+	names = select_devices(rfid_manager.devices, **data.selector.model_dump())
+	if not names:
+		return JSONResponse(status_code=404, content={'message': 'No devices match the selector.'})
+	try:
+		summary = await run_fleet_command(
+			rfid_manager.devices,
+			names,
+			command=data.command,
+			params=data.params,
+			concurrency=data.concurrency or settings.FLEET_CONCURRENCY,
+			timeout=data.timeout or settings.FLEET_DEVICE_TIMEOUT,
+		)
+	except ValueError as e:
+		return JSONResponse(status_code=400, content={'message': str(e)})
+	status_code = 200 if summary['failed'] == 0 else 207  # 207: Multi-Status
+	return JSONResponse(status_code=status_code, content=summary)
+
+
 @router.post(
 	'/protected_inventory/{device_name}',
 	summary='Start or stop protected inventory on a device',
@@ -209,39 +242,68 @@ async def protected_mode(device_name: str, protected_mode: ProtectedModeModel):
 	)
 
 
+def _submit_protected_list(device_name: str, protect_list: ProtectListModel):
+	return job_manager.submit(
+		kind='protected_mode',
+		total=len(protect_list.epcs),
+		params={
+			'devices': [device_name],
+			'active': protect_list.active,
+			'window': settings.PROTECTED_MODE_WINDOW,
+		},
+		runner=lambda job: run_protected_mode_job(
+			job,
+			devices=rfid_manager.devices,
+			targets={device_name: protect_list.epcs},
+			password=protect_list.password,
+			active=protect_list.active,
+			window=settings.PROTECTED_MODE_WINDOW,
+		),
+	)
+
+
 @router.post(
 	'/protected_list/{device_name}',
 	summary='Start or stop protected inventory on a list of tags',
 	description='Starts or stops the protected inventory process on a list of tags for the specified device.',
 )
 async def protected_list(device_name: str, protect_list: ProtectListModel):
-	success_count = 0
-	error_count = 0
-	errors = []
-	for epc in protect_list.epcs:
-		success, msg = await rfid_manager.devices.protected_mode(
-			device_name=device_name,
-			epc=epc,
-			password=protect_list.password,
-			active=protect_list.active,
-		)
-		if success:
-			success_count += 1
-		else:
-			error_count += 1
-			errors.append({'epc': epc, 'error': msg})
+	job = _submit_protected_list(device_name, protect_list)
+	await job.wait()
+	error_count = job.failed
 	status_code = 200 if error_count == 0 else 207  # 207: Multi-Status
 	return JSONResponse(
 		status_code=status_code,
 		content={
 			'message': f"Commands sent to device '{device_name}'.",
-			'success_count': success_count,
+			'success_count': job.succeeded,
 			'error_count': error_count,
-			'errors': errors if error_count > 0 else None,
+			'errors': (
+				[{'epc': error['item'], 'error': error['error']} for error in job.errors]
+				if error_count > 0
+				else None
+			),
 		},
 	)
 
 
+@router.post(
+	'/protected_list_job/{device_name}',
+	summary='Start a protected-mode job on a list of tags',
+	description=(
+		'Same as /protected_list but returns a job ID immediately; '
+		'poll /api/v1/jobs/get_job/{job_id} for progress and errors.'
+	),
+)
+async def protected_list_job(device_name: str, protect_list: ProtectListModel):
+	if rfid_manager.devices.get_device(device_name) is None:
+		return JSONResponse(
+			status_code=404, content={'message': f"Device '{device_name}' not found."}
+		)
+	job = _submit_protected_list(device_name, protect_list)
+	return JSONResponse(status_code=202, content=job.to_dict(include_errors=False))
+
+
 @router.post(
 	'/print/{device_name}',
 	summary='If device is a printer, send print command',
@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from smartx_rfid.utils.path import get_prefix_from_path
+
+from app.core.admin import is_admin_request
+from app.services.diagnostics import (
+	admission_controller,
+	loop_stall_detector,
+	sampling_profiler,
+)
+
+router_prefix = get_prefix_from_path(__file__)
+router = APIRouter(prefix=router_prefix, tags=[router_prefix])
+
+FORBIDDEN = {'message': 'Admin access required (loopback client or X-Admin-Token header).'}
+
+
+@router.get(
+	'/profile',
+	summary='Run the sampling profiler',
+	description=(
+		'Admin only. Samples the stacks of all threads and asyncio tasks for the given time and '
+		'returns a collapsed-stack file (flamegraph.pl / speedscope compatible).'
+	),
+)
+async def profile(
+	request: Request,
+	seconds: float = Query(10.0, gt=0, le=120),
+	interval_ms: float = Query(10.0, ge=1, le=1000),
+	tasks: bool = Query(True, description='Sample the asyncio task await chains as well'),
+):
+	if not is_admin_request(request):
+		return JSONResponse(status_code=403, content=FORBIDDEN)
+	if sampling_profiler.running:
+		return JSONResponse(status_code=409, content={'message': 'Profiler is already running'})
+
+	loop = asyncio.get_running_loop() if tasks else None
+	try:
+		result = await asyncio.to_thread(
+			sampling_profiler.profile,
+			duration=seconds,
+			interval=interval_ms / 1000,
+			loop=loop,
+		)
+	except RuntimeError as e:
+		return JSONResponse(status_code=409, content={'message': str(e)})
+
+	filename = f'profile_{datetime.now().strftime("%Y%m%d_%H%M%S")}.collapsed'
+	return PlainTextResponse(
+		content=result['collapsed'],
+		headers={
+			'Content-Disposition': f'attachment; filename="{filename}"',
+			'X-Profile-Samples': str(result['samples']),
+			'X-Profile-Duration': str(result['duration']),
+		},
+	)
+
+
+@router.get(
+	'/loop_stalls',
+	summary='Recent event loop stalls',
+	description='Admin only. Stalls detected by the slow-callback detector, newest last.',
+)
+async def loop_stalls(request: Request):
+	if not is_admin_request(request):
+		return JSONResponse(status_code=403, content=FORBIDDEN)
+	return JSONResponse(
+		content={
+			'running': loop_stall_detector.running,
+			'threshold': loop_stall_detector.threshold,
+			'lag': round(loop_stall_detector.lag, 4),
+			'stalls': list(loop_stall_detector.stalls),
+		}
+	)
+
+
+@router.get(
+	'/admission',
+	summary='Admission control stats',
+	description=(
+		'Requests in flight, admitted and rejected (by reason) per class, with the current '
+		'event loop lag and pipeline queue depth.'
+	),
+)
+async def admission():
+	return JSONResponse(content=admission_controller.get_stats())
@@ -28,6 +28,16 @@ async def get_dispatches():
 	return rfid_manager.controller.dispatcher.get_dispatch_names()
 
 
+@router.get(
+	'/get_stats',
+)
+async def get_stats():
+	return {
+		**rfid_manager.controller.dispatcher.get_stats(),
+		**rfid_manager.controller.dispatch_index.get_stats(),
+	}
+
+
 @router.get(
 	'/get_dispatch/{dispatch_name}',
 )
@@ -0,0 +1,85 @@
+import json
+
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from smartx_rfid.utils.path import get_prefix_from_path
+
+from app.core import settings
+from app.schemas.protected import ProtectJobModel
+from app.services import rfid_manager
+from app.services.jobs import job_manager, run_protected_mode_job
+
+router_prefix = get_prefix_from_path(__file__)
+router = APIRouter(prefix=router_prefix, tags=[router_prefix])
+
+
+@router.post(
+	'/protected_mode',
+	summary='Start a bulk protected-mode job',
+	description=(
+		'Activates or deactivates protected mode on many EPCs across one or more devices. '
+		'Commands are pipelined per device and devices run in parallel. Returns a job ID '
+		'to poll with /get_job or follow with /stream_job.'
+	),
+)
+async def protected_mode_job(data: ProtectJobModel):
+	unknown = [name for name in data.targets if rfid_manager.devices.get_device(name) is None]
+	if unknown:
+		return JSONResponse(status_code=404, content={'message': f'Devices not found: {unknown}'})
+
+	window = data.window or settings.PROTECTED_MODE_WINDOW
+	job = job_manager.submit(
+		kind='protected_mode',
+		total=sum(len(epcs) for epcs in data.targets.values()),
+		params={'devices': list(data.targets), 'active': data.active, 'window': window},
+		runner=lambda job: run_protected_mode_job(
+			job,
+			devices=rfid_manager.devices,
+			targets=data.targets,
+			password=data.password,
+			active=data.active,
+			window=window,
+		),
+	)
+	return JSONResponse(status_code=202, content=job.to_dict(include_errors=False))
+
+
+@router.get('/get_jobs', summary='List jobs')
+async def get_jobs(kind: str | None = None):
+	return [job.to_dict(include_errors=False) for job in job_manager.list_jobs(kind=kind)]
+
+
+@router.get('/get_job/{job_id}', summary='Get job status and errors')
+async def get_job(job_id: str):
+	job = job_manager.get(job_id)
+	if job is None:
+		return JSONResponse(status_code=404, content={'message': f'Job {job_id} not found'})
+	return job.to_dict()
+
+
+@router.get(
+	'/stream_job/{job_id}',
+	summary='Stream job progress',
+	description='Streams job status snapshots as NDJSON until the job finishes.',
+)
+async def stream_job(job_id: str, interval: float = Query(0.5, ge=0.05, le=10)):
+	job = job_manager.get(job_id)
+	if job is None:
+		return JSONResponse(status_code=404, content={'message': f'Job {job_id} not found'})
+
+	async def generate():
+		while not job.finished:
+			yield json.dumps(job.to_dict(include_errors=False)) + '\n'
+			await job.wait(timeout=interval)
+		yield json.dumps(job.to_dict()) + '\n'
+
+	return StreamingResponse(generate(), media_type='application/x-ndjson')
+
+
+@router.post('/cancel_job/{job_id}', summary='Cancel a running job')
+async def cancel_job(job_id: str):
+	if not job_manager.cancel(job_id):
+		return JSONResponse(
+			status_code=404, content={'message': f'Job {job_id} not found or already finished'}
+		)
+	return {'message': f'Job {job_id} cancelled'}
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
+from smartx_rfid.utils.path import get_prefix_from_path
+
+from app.schemas.print import PrintJobModel
+from app.services import rfid_manager
+
+router_prefix = get_prefix_from_path(__file__)
+router = APIRouter(prefix=router_prefix, tags=[router_prefix])
+
+
+@router.post(
+	'/create_job/{device_name}',
+	summary='Start a print job',
+	description=(
+		'Renders the ZPL template for every label and streams the labels to the printer, '
+		'one at a time as the printer reports ready. The job resumes after printer reconnects. '
+		'Poll progress and labels per second with /api/v1/jobs/get_job/{job_id}.'
+	),
+)
+async def create_job(device_name: str, data: PrintJobModel):
+	try:
+		job = rfid_manager.printing.create_job(
+			device=device_name,
+			template=data.template,
+			labels=data.labels,
+			label_timeout=data.label_timeout,
+			retries=data.retries,
+		)
+	except ValueError as e:
+		return JSONResponse(status_code=400, content={'message': str(e)})
+	return JSONResponse(status_code=202, content=job.to_dict(include_errors=False))
+
+
+@router.get(
+	'/get_labels/{job_id}',
+	summary='Get per-label status of a print job',
+	description='Status of each label (pending, sent, printed, error), with optional filter.',
+)
+async def get_labels(
+	job_id: str,
+	status: str | None = None,
+	offset: int = Query(0, ge=0),
+	limit: int = Query(500, ge=1, le=10_000),
+):
+	run = rfid_manager.printing.runs.get(job_id)
+	if run is None:
+		return JSONResponse(status_code=404, content={'message': f'Print job {job_id} not found'})
+	return run.get_labels(status=status, offset=offset, limit=limit)
@@ -108,3 +108,20 @@ async def receive_x_scan(events: list[EventDeviceSchema] | EventDeviceSchema):
 		status_code=200,
 		content={'message': 'X-SCAN events received successfully.', 'received_count': len(events)},
 	)
+
+
+@router.get(
+	'/ingest_stats',
+	summary='Push ingest statistics',
+	description=(
+		'Connection, byte and record counters of the raw TCP/UDP line-protocol listener '
+		'and the MQTT ingest listener (null when not configured).'
+	),
+)
+async def get_ingest_stats():
+	line_ingest = rfid_manager.line_ingest
+	mqtt_ingest = rfid_manager.mqtt_ingest
+	return {
+		'line': line_ingest.get_stats() if line_ingest.enabled else None,
+		'mqtt': mqtt_ingest.get_stats() if mqtt_ingest is not None else None,
+	}
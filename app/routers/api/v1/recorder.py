@@ -0,0 +1,115 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from smartx_rfid.utils.path import get_prefix_from_path
+
+from app.core.admin import is_admin_request
+from app.schemas.recorder import CaptureStartModel, ReplayModel
+from app.services import rfid_manager
+from app.services.jobs import job_manager
+from app.services.rfid.recorder import replay_capture
+
+router_prefix = get_prefix_from_path(__file__)
+router = APIRouter(prefix=router_prefix, tags=[router_prefix])
+
+FORBIDDEN = {'message': 'Admin access required (loopback client or X-Admin-Token header).'}
+
+
+@router.post(
+	'/start',
+	summary='Start a traffic capture',
+	description=(
+		'Admin only. Records every device event and /receive/* payload with a monotonic '
+		'timestamp into compressed, rotating segments under config/captures.'
+	),
+)
+async def start_capture(request: Request, data: CaptureStartModel | None = None):
+	if not is_admin_request(request):
+		return JSONResponse(status_code=403, content=FORBIDDEN)
+	if rfid_manager.recorder.active:
+		return JSONResponse(
+			status_code=409,
+			content={'message': f'Capture {rfid_manager.recorder.capture} is already running'},
+		)
+	rfid_manager.recorder.start(name=data.name if data else None)
+	return rfid_manager.recorder.get_status()
+
+
+@router.post(
+	'/stop',
+	summary='Stop the traffic capture',
+	description='Admin only. Stops recording and writes the queued records.',
+)
+async def stop_capture(request: Request):
+	if not is_admin_request(request):
+		return JSONResponse(status_code=403, content=FORBIDDEN)
+	rfid_manager.recorder.stop()
+	await rfid_manager.recorder.flush()
+	return rfid_manager.recorder.get_status()
+
+
+@router.get(
+	'/get_status',
+	summary='Traffic capture status',
+)
+async def get_status():
+	return rfid_manager.recorder.get_status()
+
+
+@router.get(
+	'/get_captures',
+	summary='List traffic captures',
+)
+async def get_captures():
+	return rfid_manager.recorder.list_captures()
+
+
+@router.delete(
+	'/delete_capture/{capture}',
+	summary='Delete a traffic capture',
+	description='Admin only.',
+)
+async def delete_capture(request: Request, capture: str):
+	if not is_admin_request(request):
+		return JSONResponse(status_code=403, content=FORBIDDEN)
+	try:
+		rfid_manager.recorder.delete_capture(capture)
+	except ValueError as e:
+		return JSONResponse(status_code=404, content={'message': str(e)})
+	return {'message': f'Capture {capture} deleted'}
+
+
+@router.post(
+	'/replay',
+	summary='Replay a traffic capture',
+	description=(
+		'Admin only. Feeds a capture back through the tag and event pipeline at the recorded '
+		'pace, N times faster or as fast as possible. Runs as a job (see /jobs/get_job).'
+	),
+)
+async def replay(request: Request, data: ReplayModel):
+	if not is_admin_request(request):
+		return JSONResponse(status_code=403, content=FORBIDDEN)
+	try:
+		path = rfid_manager.recorder.capture_path(data.capture)
+	except ValueError as e:
+		return JSONResponse(status_code=404, content={'message': str(e)})
+
+	async def runner(job):
+		def on_progress(replayed: int, loaded: int) -> None:
+			job.succeeded = replayed
+			job.total = loaded
+
+		await replay_capture(
+			path,
+			on_event=rfid_manager.on_event,
+			on_tag=rfid_manager.on_tag,
+			speed=data.speed,
+			on_progress=on_progress,
+		)
+
+	job = job_manager.submit(
+		kind='replay',
+		runner=runner,
+		params={'capture': data.capture, 'speed': data.speed},
+	)
+	return JSONResponse(status_code=202, content=job.to_dict(include_errors=False))
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Path
+from fastapi import APIRouter, Path, Request
 from fastapi.responses import JSONResponse
 from smartx_rfid.utils.path import get_prefix_from_path
 from smartx_rfid.schemas.tag import WriteTagValidator
 from app.schemas import write_tag_example
+from app.core.responses import negotiated_response
 
 from app.services import rfid_manager
 
@@ -15,8 +16,8 @@ router = APIRouter(prefix=router_prefix, tags=[router_prefix])
 	summary='Get all tags',
 	description='Returns a list of all detected RFID tags.',
 )
-async def get_tags():
-	return rfid_manager.tags.get_all()
+async def get_tags(request: Request):
+	return negotiated_response(request, rfid_manager.tags.get_all())
 
 
 @router.get(
@@ -24,8 +25,8 @@ async def get_tags():
 	summary='Get limited tags',
 	description='Returns only the first N detected RFID tags.',
 )
-async def get_n_tags(limit: int = Path(..., ge=0)):
-	return rfid_manager.tags.get_all(limit=limit)
+async def get_n_tags(request: Request, limit: int = Path(..., ge=0)):
+	return negotiated_response(request, rfid_manager.tags.get_all(limit=limit))
 
 
 @router.get(
@@ -68,8 +69,8 @@ async def clear_tags_device(device_name: str):
 	summary='Get all EPCs',
 	description='Returns a list of all detected EPCs from RFID tags.',
 )
-async def get_epcs():
-	return rfid_manager.tags.get_epcs()
+async def get_epcs(request: Request):
+	return negotiated_response(request, rfid_manager.tags.get_epcs())
 
 
 @router.get(
@@ -77,8 +78,8 @@ async def get_epcs():
 	summary='Get limited EPCs',
 	description='Returns only the first N detected EPCs from RFID tags.',
 )
-async def get_n_epcs(limit: int = Path(..., ge=0)):
-	return rfid_manager.tags.get_epcs(limit=limit)
+async def get_n_epcs(request: Request, limit: int = Path(..., ge=0)):
+	return negotiated_response(request, rfid_manager.tags.get_epcs(limit=limit))
 
 
 @router.get(
@@ -86,9 +87,9 @@ async def get_n_epcs(limit: int = Path(..., ge=0)):
 	summary='Get all TIDs',
 	description='Returns a list of all detected TIDs from RFID tags.',
 )
-async def get_tids():
+async def get_tids(request: Request):
 	tags = rfid_manager.tags.get_all()
-	return [tag.get('tid') for tag in tags]
+	return negotiated_response(request, [tag.get('tid') for tag in tags])
 
 
 @router.get(
@@ -109,6 +110,32 @@ async def get_tag_info(epc: str):
 	return rfid_manager.tags.get_by_identifier(identifier_value=epc, identifier_type='epc')
 
 
+@router.get(
+	'/get_filter_stats',
+	summary='Get pre-ingest filter statistics',
+	description=(
+		'Active TAG_FILTER/TAG_PREFIX rules with accepted reads and drops per rule '
+		'(null when no rule is configured).'
+	),
+)
+async def get_filter_stats():
+	tag_filter = rfid_manager.tag_filter
+	return tag_filter.get_stats() if tag_filter is not None else None
+
+
+@router.get(
+	'/get_product_master',
+	summary='Get product master status',
+	description=(
+		'Source, indexed keys, added fields and lookup hit/miss counters of the product '
+		'master used to enrich tags (null when PRODUCT_MASTER_PATH is not set).'
+	),
+)
+async def get_product_master():
+	product_master = rfid_manager.product_master
+	return product_master.get_stats() if product_master is not None else None
+
+
 @router.post(
 	'/write_epc/{device_name}',
 	summary='Write EPC to a tag',
@@ -1,59 +1,53 @@
-from collections import deque
-import hashlib
+import asyncio
+import threading
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Query, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 import json
 import os
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from app.core import templates
 from app.core import logger
+from app.services.logs import log_searcher, log_tailer
 
 router = APIRouter(prefix='', tags=['Logs'])
 
-_NO_LIMIT = object()
 
-
-def _read_tail(file_path: str, n: Optional[int]) -> list[str]:
-	"""Read the last *n* non-empty lines of a file efficiently using a deque.
-	If *n* is None, all lines are returned."""
-	with open(file_path, 'rb') as f:
-		raw_lines = list(deque(f, n) if n is not None else f.readlines())
-	return [line.decode('utf-8', errors='replace').strip() for line in raw_lines if line.strip()]
-
-
-async def get_log_content(limit: Optional[int] = 500) -> Dict[str, Any]:
+async def get_log_content(
+	limit: Optional[int] = 500, offset: Optional[int] = None, inode: Optional[int] = None
+) -> Dict[str, Any]:
 	"""
 	Function to fetch log content and file information.
 
 	Args:
-		limit: Maximum number of lines to return (None = all lines).
+		limit: Maximum number of lines to return on a full (tail) read (None = all lines).
+		offset: Byte offset returned by the previous call; only newer lines are returned.
+		inode: Inode returned by the previous call, used to detect file rotation.
 
 	Returns:
-		Dict containing log content, file metadata and content hash.
+		Dict containing log lines, the next cursor and file metadata.
 	"""
 	file_path = logger._get_filename_for_date(datetime.now().date())
 
-	total_lines = 0
 	try:
-		log_content = _read_tail(file_path, limit)
-		# Count total lines for display purposes (cheap: count newlines)
-		if os.path.exists(file_path):
-			with open(file_path, 'rb') as f:
-				total_lines = sum(1 for line in f if line.strip())
-	except FileNotFoundError:
-		log_content = [
-			json.dumps(
-				{
-					'level': 'ERROR',
-					'message': 'Log file not found.',
-					'timestamp': datetime.now().isoformat(),
-				}
-			)
-		]
+		result = await asyncio.to_thread(
+			log_tailer.read, file_path, offset=offset, inode=inode, limit=limit
+		)
+		log_content = result['lines']
+		if not result['inode'] and result['reset']:
+			log_content = [
+				json.dumps(
+					{
+						'level': 'ERROR',
+						'message': 'Log file not found.',
+						'timestamp': datetime.now().isoformat(),
+					}
+				)
+			]
 	except Exception as e:
+		result = {'offset': 0, 'inode': None, 'reset': True, 'total_lines': 0, 'file_size': 0}
 		log_content = [
 			json.dumps(
 				{
@@ -64,23 +58,27 @@ async def get_log_content(limit: Optional[int] = 500) -> Dict[str, Any]:
 			)
 		]
 
-	content_hash = hashlib.md5(''.join(log_content).encode()).hexdigest()  # noqa: S324
-
+	file_exists = os.path.exists(file_path)
 	log_info = {
 		'file_path': file_path,
-		'file_exists': os.path.exists(file_path),
-		'file_size': os.path.getsize(file_path) if os.path.exists(file_path) else 0,
+		'file_exists': file_exists,
+		'file_size': result['file_size'],
 		'last_modified': datetime.fromtimestamp(os.path.getmtime(file_path)).strftime(
 			'%Y-%m-%d %H:%M:%S'
 		)
-		if os.path.exists(file_path)
+		if file_exists
 		else 'N/A',
-		'total_lines': total_lines,
+		'total_lines': result['total_lines'],
 		'returned_lines': len(log_content),
 		'timestamp': datetime.now().isoformat(),
 	}
 
-	return {'content': log_content, 'info': log_info, 'hash': content_hash}
+	return {
+		'content': log_content,
+		'info': log_info,
+		'cursor': {'offset': result['offset'], 'inode': result['inode']},
+		'reset': result['reset'],
+	}
 
 
 @router.get('/logs', response_class=HTMLResponse)
@@ -97,23 +95,66 @@ async def logs(request: Request):
 
 
 @router.get('/logs/get_content')
-async def get_logs_content(limit: Optional[int] = 500, last_hash: Optional[str] = None):
+async def get_logs_content(
+	limit: Optional[int] = 500, offset: Optional[int] = None, inode: Optional[int] = None
+):
 	"""Return log lines.
 
 	Query params:
 	- limit: number of lines to return from the end of the file (omit or 0 = all).
-	- last_hash: MD5 of the last received content. If unchanged, returns 304-style empty response.
+	- offset / inode: cursor returned by the previous call. When valid, only the lines
+	  appended since then are returned; otherwise ('reset': true) the tail is returned.
 	"""
 	effective_limit = limit if limit and limit > 0 else None
-	log_data = await get_log_content(limit=effective_limit)
+	log_data = await get_log_content(limit=effective_limit, offset=offset, inode=inode)
+
+	return JSONResponse(
+		content=log_data,
+		headers={'Cache-Control': 'no-cache, no-store, must-revalidate'},
+	)
 
-	if last_hash and log_data['hash'] == last_hash:
-		return JSONResponse(
-			content={'changed': False, 'hash': log_data['hash']},
-			headers={'Cache-Control': 'no-cache, no-store, must-revalidate'},
+
+@router.get('/logs/search')
+async def search_logs(
+	text: Optional[str] = None,
+	device: Optional[str] = None,
+	level: Optional[List[str]] = Query(None),
+	start: Optional[datetime] = None,
+	end: Optional[datetime] = None,
+	limit: int = Query(200, ge=1, le=5000),
+	cursor: Optional[str] = None,
+	timeout: float = Query(5.0, gt=0, le=60),
+):
+	"""Search all stored log files on the server.
+
+	Query params:
+	- text: case-insensitive free text (EPC, event type, message...).
+	- device: device name that must appear in the log message.
+	- level: one or more levels (repeat the param: level=ERROR&level=WARNING).
+	- start / end: ISO timestamps delimiting the search window.
+	- limit: page size; pass 'next_cursor' back as 'cursor' to get the next page.
+	- timeout: scan budget in seconds; partial results come with 'timed_out': true.
+	"""
+	cancel_event = threading.Event()
+	try:
+		result = await asyncio.to_thread(
+			log_searcher.search,
+			text=text,
+			device=device,
+			levels=level,
+			start=start,
+			end=end,
+			limit=limit,
+			cursor=cursor,
+			timeout=timeout,
+			cancel_event=cancel_event,
 		)
+	except asyncio.CancelledError:
+		# Client went away: stop the scan thread at its next checkpoint
+		cancel_event.set()
+		raise
 
 	return JSONResponse(
-		content={**log_data, 'changed': True},
+		content=result,
 		headers={'Cache-Control': 'no-cache, no-store, must-revalidate'},
 	)
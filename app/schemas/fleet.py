@@ -0,0 +1,38 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+
+class FleetSelectorModel(BaseModel):
+	names: list[str] | None = Field(None, description='Device names')
+	pattern: str | None = Field(None, description='Shell-style name pattern, e.g. portal_*')
+	device_type: str | None = Field('rfid', description='Device type (null for any)')
+	connected: bool | None = Field(
+		None, description='Only connected (true) or disconnected (false)'
+	)
+
+
+class FleetCommandModel(BaseModel):
+	selector: FleetSelectorModel = Field(default_factory=FleetSelectorModel)
+	command: Literal[
+		'set_power', 'write_gpo', 'start_inventory', 'stop_inventory', 'update_config'
+	] = Field('set_power')
+	params: dict[str, Any] = Field(
+		{'power': 25},
+		description=(
+			'set_power: {"power"}; write_gpo: {"pin", "state", "control", "time"}; '
+			'update_config: {"config": {keys to change}}; inventory commands: {}'
+		),
+	)
+	concurrency: int | None = Field(
+		None, ge=1, le=256, description='Devices handled at the same time (default from settings)'
+	)
+	timeout: float | None = Field(
+		None, gt=0, le=300, description='Seconds allowed per device (default from settings)'
+	)
+
+	@model_validator(mode='after')
+	def validate_params(self):
+		if self.command == 'update_config' and not isinstance(self.params.get('config'), dict):
+			raise ValueError('update_config requires params.config')
+		return self
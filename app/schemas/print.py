@@ -1,6 +1,27 @@
+from typing import Any
+
 from pydantic import BaseModel, Field
-from smartx_rfid.devices.printer import simple_zpl_example
+from smartx_rfid.devices.printer import params_zpl_example, simple_zpl_example
 
 
 class PrintModel(BaseModel):
 	zpl: str = Field(simple_zpl_example, description='ZPL code to be sent to the printer')
+
+
+class PrintJobModel(BaseModel):
+	template: str = Field(
+		params_zpl_example, description='ZPL template with {variable} placeholders'
+	)
+	labels: list[dict[str, Any]] = Field(
+		[
+			{'sequential': '000000000000000000000001', 'epc': '000000000000000000000001'},
+			{'sequential': '000000000000000000000002', 'epc': '000000000000000000000002'},
+		],
+		min_length=1,
+		max_length=100_000,
+		description='Variables of each label, in print order',
+	)
+	label_timeout: float = Field(
+		30.0, gt=0, le=600, description='Seconds to wait for the printer confirmation'
+	)
+	retries: int = Field(1, ge=0, le=10, description='Extra attempts after a printer error')
@@ -42,3 +42,21 @@ class ProtectListModel(ProtectedInventoryModel):
 					f'{info.field_name} must contain only hexadecimal characters (0-9, a-f) and have exactly 24 characters'
 				)
 		return [epc.lower() for epc in v]
+
+
+class ProtectJobModel(ProtectedInventoryModel):
+	targets: dict[str, list[str]] = Field(
+		{'device_1': ['000000000000000000000001', '000000000000000000000002']},
+		description='EPCs to lock or unlock, per device name',
+	)
+	window: int | None = Field(
+		None, ge=1, le=256, description='Commands in flight per device (default from settings)'
+	)
+
+	@field_validator('targets')
+	def validate_targets(cls, v, info: ValidationInfo):
+		for device_name, epcs in v.items():
+			invalid = [epc for epc in epcs if not regex_hex(epc)]
+			if invalid:
+				raise ValueError(f'{info.field_name}[{device_name}] has invalid EPC(s): {invalid}')
+		return {device_name: [epc.lower() for epc in epcs] for device_name, epcs in v.items()}
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+
+
+class CaptureStartModel(BaseModel):
+	name: str | None = Field(
+		None, pattern=r'^[\w.-]+$', description='Capture name (default: capture_<timestamp>)'
+	)
+
+
+class ReplayModel(BaseModel):
+	capture: str = Field(..., description='Capture name from /get_captures')
+	speed: float = Field(
+		1.0, ge=0, description='1 = recorded pace, 10 = ten times faster, 0 = as fast as possible'
+	)
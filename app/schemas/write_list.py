@@ -1,4 +1,7 @@
-from pydantic import BaseModel, Field, field_validator
+import re
+from typing import Literal
+
+from pydantic import BaseModel, Field, field_validator, model_validator
 from smartx_rfid.utils.regex import regex_hex
 
 
@@ -23,3 +26,77 @@ class WriteListPrefixModel(BaseModel):
 		if invalid:
 			raise ValueError(f'Invalid EPC(s): {invalid}')
 		return value
+
+
+class WriteRuleModel(BaseModel):
+	type: Literal['prefix', 'sgtin', 'counter'] = Field(
+		'prefix',
+		description=(
+			'prefix: replace the first characters with `prefix`; '
+			'sgtin: re-serialize as SGTIN-96 with serials start, start+step, ...; '
+			'counter: `prefix` followed by a zero-padded hex counter'
+		),
+	)
+	prefix: str | None = Field('abc', description='Hex prefix (prefix and counter rules)')
+	start: int = Field(1, ge=0, description='First serial / counter value')
+	step: int = Field(1, ge=1, description='Serial / counter increment')
+	gtin: str | None = Field(
+		None, description='GTIN-14 for the sgtin rule (default: keep the GTIN of each tag)'
+	)
+	company_prefix_len: int = Field(7, ge=6, le=12)
+
+	@field_validator('prefix')
+	def validate_prefix(cls, value: str | None) -> str | None:
+		if value and not regex_hex(value):
+			raise ValueError(f'Prefix {value!r} is not a valid hexadecimal string')
+		return value.lower() if value else value
+
+	@field_validator('gtin')
+	def validate_gtin(cls, value: str | None) -> str | None:
+		if value is not None and not re.fullmatch(r'\d{14}', value):
+			raise ValueError('GTIN must have exactly 14 digits')
+		return value
+
+	@model_validator(mode='after')
+	def validate_rule(self):
+		if self.type == 'prefix' and not self.prefix:
+			raise ValueError('The prefix rule requires a prefix')
+		return self
+
+
+class WriteListSelectorModel(BaseModel):
+	device: str | None = Field(None, description='Only tags last read by this device')
+	gtin: str | None = Field(None, description='Only tags with this GTIN')
+	prefix: str | None = Field(None, description='Only tags whose EPC starts with this prefix')
+
+	@field_validator('prefix')
+	def validate_prefix(cls, value: str | None) -> str | None:
+		if value and not regex_hex(value):
+			raise ValueError(f'Prefix {value!r} is not a valid hexadecimal string')
+		return value.lower() if value else value
+
+
+class WriteListBulkModel(BaseModel):
+	epcs: list[str] | None = Field(
+		None, description='EPCs to add to the write list (alternative to selector)'
+	)
+	selector: WriteListSelectorModel | None = Field(
+		None, description='Select tags from the current tag list (alternative to epcs)'
+	)
+	rule: WriteRuleModel = Field(default_factory=WriteRuleModel)
+	replace: bool = Field(False, description='Clear the current write list first')
+
+	@field_validator('epcs')
+	def validate_epcs(cls, value: list[str] | None) -> list[str] | None:
+		if value is None:
+			return value
+		invalid = [epc for epc in value if not regex_hex(epc)]
+		if invalid:
+			raise ValueError(f'Invalid EPC(s): {invalid[:20]}')
+		return value
+
+	@model_validator(mode='after')
+	def validate_source(self):
+		if (self.epcs is None) == (self.selector is None):
+			raise ValueError('Provide either epcs or selector')
+		return self
@@ -0,0 +1,16 @@
+from .admission import AdmissionController
+from .profiler import SamplingProfiler
+from .slow_callbacks import LoopStallDetector
+from app.core import settings
+
+sampling_profiler = SamplingProfiler()
+loop_stall_detector = LoopStallDetector(threshold=settings.SLOW_CALLBACK_THRESHOLD or 0.25)
+
+admission_controller = AdmissionController(
+	limits=settings.ADMISSION_LIMITS,
+	max_lag=settings.ADMISSION_MAX_LAG,
+	max_queue=settings.ADMISSION_MAX_QUEUE,
+)
+admission_controller.lag_source = lambda: (
+	loop_stall_detector.lag if loop_stall_detector.running else admission_controller.probed_lag
+)
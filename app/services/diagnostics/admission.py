@@ -0,0 +1,190 @@
+"""
+Admission control for HTTP requests.
+
+Reader ingest shares the event loop with the UI and the read API. A few
+browsers polling ``/rfid/get_tags`` or rendering pages during a burst used to
+stretch the latency of every ``/receive`` request. Requests are now classified
+into four classes and admitted by class:
+
+- ``ingest``: reader pushes (``POST /api/v1/receive/...``). Never shed.
+- ``control``: other API writes and the admin endpoints. Never shed.
+- ``read``: API reads and ``/metrics``.
+- ``ui``: pages, logs and static files.
+
+Every class can have a cap on requests in flight. ``read`` and ``ui``
+requests are also rejected while the event loop lag or the pipeline queue
+depth is above its threshold, so that the work already queued for ingest is
+drained first. Rejected requests get a 503 with ``Retry-After``.
+
+The lag is read from the loop stall detector while it runs. When stall
+reporting is disabled (``SLOW_CALLBACK_THRESHOLD`` is null) ``probe_lag``
+measures it instead, as the overshoot of a short timer.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Optional
+
+INGEST = 'ingest'
+CONTROL = 'control'
+READ = 'read'
+UI = 'ui'
+CLASSES = (INGEST, CONTROL, READ, UI)
+SHEDDABLE = (READ, UI)
+REASONS = ('limit', 'lag', 'queue')
+
+# Paths under /api that are operator tools rather than data reads
+CONTROL_PREFIXES = ('/api/v1/diagnostics', '/api/v1/license')
+
+
+def classify(method: str, path: str) -> str:
+	"""
+	Return the admission class of a request.
+
+	Args:
+	    method: HTTP method.
+	    path: Request path.
+
+	Returns:
+	    str: ``ingest``, ``control``, ``read`` or ``ui``.
+	"""
+	if path.startswith('/api/'):
+		if path.startswith('/api/v1/receive/') and method == 'POST':
+			return INGEST
+		if path.startswith(CONTROL_PREFIXES) or method not in ('GET', 'HEAD'):
+			return CONTROL
+		return READ
+	if path == '/metrics':
+		return READ
+	return UI
+
+
+class AdmissionController:
+	"""
+	Per-class in-flight caps and load shedding for low-priority requests.
+	"""
+
+	def __init__(
+		self,
+		limits: Optional[Dict[str, int]] = None,
+		max_lag: Optional[float] = 0.1,
+		max_queue: Optional[int] = 5000,
+		retry_after: int = 1,
+	):
+		"""
+		Args:
+		    limits: Max requests in flight per class (missing classes are unlimited).
+		    max_lag: Event loop lag in seconds above which read/ui requests are shed.
+		    max_queue: Pipeline queue depth above which read/ui requests are shed.
+		    retry_after: ``Retry-After`` seconds sent with a 503.
+		"""
+		self.limits: Dict[str, int] = {}
+		self.max_lag: Optional[float] = None
+		self.max_queue: Optional[int] = None
+		self.retry_after = retry_after
+		self.configure(limits=limits, max_lag=max_lag, max_queue=max_queue)
+
+		self.lag_source: Optional[Callable[[], float]] = None
+		self.probed_lag = 0.0
+		self.queue_source: Optional[Callable[[], int]] = None
+
+		self.in_flight = dict.fromkeys(CLASSES, 0)
+		self.admitted = dict.fromkeys(CLASSES, 0)
+		self.rejected = {cls: dict.fromkeys(REASONS, 0) for cls in CLASSES}
+
+	def configure(
+		self,
+		limits: Optional[Dict[str, int]] = None,
+		max_lag: Optional[float] = None,
+		max_queue: Optional[int] = None,
+	) -> None:
+		"""
+		Replace the limits and thresholds.
+
+		Args:
+		    limits: Max requests in flight per class; unknown classes raise.
+		    max_lag: Lag threshold in seconds (None disables it).
+		    max_queue: Queue depth threshold (None disables it).
+
+		Raises:
+		    ValueError: If a class is unknown or a limit is not a positive int.
+		"""
+		for cls, limit in (limits or {}).items():
+			if cls not in CLASSES:
+				raise ValueError(f'Unknown admission class: {cls!r}')
+			if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+				raise ValueError(f'Admission limit for {cls!r} must be a positive int')
+		self.limits = dict(limits or {})
+		self.max_lag = max_lag
+		self.max_queue = max_queue
+
+	@property
+	def lag(self) -> float:
+		return self.lag_source() if self.lag_source is not None else 0.0
+
+	async def probe_lag(self, interval: float = 0.025) -> None:
+		"""
+		Measure the event loop lag into ``probed_lag`` until cancelled.
+
+		Args:
+		    interval: Seconds between probes; the lag is how late each one wakes up.
+		"""
+		loop = asyncio.get_running_loop()
+		try:
+			while True:
+				start = loop.time()
+				await asyncio.sleep(interval)
+				self.probed_lag = max(loop.time() - start - interval, 0.0)
+		finally:
+			self.probed_lag = 0.0
+
+	@property
+	def queue_depth(self) -> int:
+		return self.queue_source() if self.queue_source is not None else 0
+
+	def admit(self, request_class: str) -> Optional[str]:
+		"""
+		Admit a request, counting it in flight until ``release``.
+
+		Args:
+		    request_class: Class returned by ``classify``.
+
+		Returns:
+		    Optional[str]: None when admitted, else the rejection reason
+		    (``limit``, ``lag`` or ``queue``).
+		"""
+		reason = None
+		limit = self.limits.get(request_class)
+		if limit is not None and self.in_flight[request_class] >= limit:
+			reason = 'limit'
+		elif request_class in SHEDDABLE:
+			if self.max_lag is not None and self.lag > self.max_lag:
+				reason = 'lag'
+			elif self.max_queue is not None and self.queue_depth > self.max_queue:
+				reason = 'queue'
+
+		if reason is not None:
+			self.rejected[request_class][reason] += 1
+			return reason
+		self.in_flight[request_class] += 1
+		self.admitted[request_class] += 1
+		return None
+
+	def release(self, request_class: str) -> None:
+		self.in_flight[request_class] -= 1
+
+	def get_stats(self) -> Dict[str, Any]:
+		return {
+			'lag': round(self.lag, 4),
+			'queue_depth': self.queue_depth,
+			'max_lag': self.max_lag,
+			'max_queue': self.max_queue,
+			'classes': {
+				cls: {
+					'limit': self.limits.get(cls),
+					'in_flight': self.in_flight[cls],
+					'admitted': self.admitted[cls],
+					'rejected': dict(self.rejected[cls]),
+				}
+				for cls in CLASSES
+			},
+		}
@@ -0,0 +1,161 @@
+"""
+In-process sampling profiler.
+
+A background thread samples the stack of every thread at a fixed interval and,
+when an event loop is given, the await chain of every asyncio task. Samples are
+aggregated into the "collapsed stack" format (``frame;frame;frame count``)
+read by flamegraph.pl, speedscope and similar tools.
+
+Thread stacks come from ``sys._current_frames()``. Task stacks are collected
+on the loop itself (``call_soon_threadsafe``) so the task set is read
+consistently; while the loop is blocked no task samples are taken, and the
+thread stacks show what is blocking it.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any, Dict, Optional
+
+
+def _frame_label(frame: FrameType) -> str:
+	code = frame.f_code
+	return f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})'.replace(';', ':')
+
+
+def _thread_stack(frame: Optional[FrameType]) -> list[str]:
+	"""Return frame labels from the outermost call to *frame*."""
+	stack = []
+	while frame is not None:
+		stack.append(_frame_label(frame))
+		frame = frame.f_back
+	stack.reverse()
+	return stack
+
+
+def _task_stack(task: asyncio.Task) -> list[str]:
+	"""Follow the await chain of a task from its coroutine to the innermost awaitable."""
+	stack = []
+	awaitable: Any = task.get_coro()
+	for _ in range(256):  # guard against unexpected cycles
+		frame = getattr(awaitable, 'cr_frame', None) or getattr(awaitable, 'gi_frame', None)
+		if frame is None:
+			break
+		stack.append(_frame_label(frame))
+		awaitable = getattr(awaitable, 'cr_await', None) or getattr(awaitable, 'gi_yieldfrom', None)
+		if awaitable is None:
+			break
+	return stack
+
+
+class SamplingProfiler:
+	"""
+	Stack-sampling profiler for all threads and asyncio tasks.
+	"""
+
+	def __init__(self, max_duration: float = 120.0):
+		"""
+		Args:
+		    max_duration: Upper bound in seconds for a single profiling run.
+		"""
+		self.max_duration = max_duration
+		self._lock = threading.Lock()
+
+	@property
+	def running(self) -> bool:
+		return self._lock.locked()
+
+	@staticmethod
+	def _sample_tasks(
+		loop: asyncio.AbstractEventLoop,
+		samples: Counter,
+		lock: threading.Lock,
+		done: threading.Event,
+	):
+		try:
+			snapshot = Counter()
+			for task in asyncio.all_tasks(loop):
+				stack = _task_stack(task)
+				if stack:
+					snapshot[';'.join([f'task:{task.get_name()}', *stack])] += 1
+			with lock:
+				samples.update(snapshot)
+		finally:
+			done.set()
+
+	def profile(
+		self,
+		duration: float = 10.0,
+		interval: float = 0.01,
+		loop: Optional[asyncio.AbstractEventLoop] = None,
+	) -> Dict[str, Any]:
+		"""
+		Sample stacks for *duration* seconds (blocking; run it in a worker thread).
+
+		Args:
+		    duration: Sampling time in seconds (capped at max_duration).
+		    interval: Time between samples in seconds.
+		    loop: Event loop whose tasks are sampled as well (None = threads only).
+
+		Returns:
+		    Dict with 'collapsed' (collapsed-stack text), 'samples', 'duration' and 'interval'.
+
+		Raises:
+		    RuntimeError: If another profiling run is in progress.
+		"""
+		if not self._lock.acquire(blocking=False):
+			raise RuntimeError('A profiling run is already in progress')
+		try:
+			duration = max(0.0, min(duration, self.max_duration))
+			interval = max(interval, 0.001)
+			samples: Counter = Counter()
+			task_samples: Counter = Counter()
+			task_lock = threading.Lock()
+			task_done = threading.Event()
+			task_done.set()
+			own_ident = threading.get_ident()
+			sample_count = 0
+
+			start = time.monotonic()
+			deadline = start + duration
+			while True:
+				names = {thread.ident: thread.name for thread in threading.enumerate()}
+				for ident, frame in sys._current_frames().items():
+					if ident == own_ident:
+						continue
+					stack = _thread_stack(frame)
+					if stack:
+						name = names.get(ident, ident)
+						samples[';'.join([f'thread:{name}', *stack])] += 1
+				sample_count += 1
+
+				# only one task snapshot in flight; skipped while the loop is busy
+				if loop is not None and task_done.is_set() and not loop.is_closed():
+					task_done.clear()
+					try:
+						loop.call_soon_threadsafe(
+							self._sample_tasks, loop, task_samples, task_lock, task_done
+						)
+					except RuntimeError:
+						task_done.set()
+
+				now = time.monotonic()
+				if now >= deadline:
+					break
+				time.sleep(min(interval, deadline - now))
+
+			task_done.wait(timeout=1.0)
+			with task_lock:
+				samples.update(task_samples)
+			collapsed = '\n'.join(f'{stack} {count}' for stack, count in samples.most_common())
+			return {
+				'collapsed': collapsed + '\n' if collapsed else '',
+				'samples': sample_count,
+				'duration': round(time.monotonic() - start, 3),
+				'interval': interval,
+			}
+		finally:
+			self._lock.release()
@@ -0,0 +1,124 @@
+"""
+Event loop stall detector.
+
+asyncio only reports slow callbacks in debug mode, which is too expensive for
+production. Instead, a watchdog thread posts a probe to the loop with
+``call_soon_threadsafe`` and measures how long it takes to run. When a probe is
+still pending after the threshold, the loop thread is blocked: its current
+stack is captured *while it is blocked* and logged, which points at the sync
+code running on the loop. The measured lag is also kept for other components
+(e.g. load shedding).
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class LoopStallDetector:
+	"""
+	Log callbacks that block the event loop for longer than a threshold.
+	"""
+
+	def __init__(self, threshold: float = 0.25, history: int = 50):
+		"""
+		Args:
+		    threshold: Blocking time in seconds that is reported as a stall.
+		    history: Number of recent stalls kept for the diagnostics API.
+		"""
+		self.threshold = threshold
+		self.lag: float = 0.0  # last measured scheduling delay of the loop, in seconds
+		self.stalls: deque = deque(maxlen=history)
+		self._loop: Optional[asyncio.AbstractEventLoop] = None
+		self._loop_ident: Optional[int] = None
+		self._thread: Optional[threading.Thread] = None
+		self._stop = threading.Event()
+		self._probe_sent: Optional[float] = None
+		self._reported: Optional[Dict[str, Any]] = None
+		self._lock = threading.Lock()
+
+	@property
+	def running(self) -> bool:
+		return self._thread is not None and self._thread.is_alive()
+
+	def start(self, threshold: Optional[float] = None) -> None:
+		"""Start watching the running loop (must be called from the loop thread)."""
+		if threshold is not None:
+			self.threshold = threshold
+		self.stop()
+		self._loop = asyncio.get_running_loop()
+		self._loop_ident = threading.get_ident()
+		self._stop.clear()
+		self._probe_sent = None
+		self._reported = None
+		self._thread = threading.Thread(target=self._watch, name='loop-stall-detector', daemon=True)
+		self._thread.start()
+		logging.info(f'Loop stall detector started (threshold={self.threshold}s)')
+
+	def stop(self) -> None:
+		self._stop.set()
+		if self._thread is not None and self._thread is not threading.current_thread():
+			self._thread.join(timeout=2)
+		self._thread = None
+
+	# [ LOOP SIDE ]
+	def _on_probe(self, sent: float) -> None:
+		now = time.monotonic()
+		with self._lock:
+			self.lag = now - sent
+			self._probe_sent = None
+			stall, self._reported = self._reported, None
+		if stall is not None:
+			stall['duration'] = round(self.lag, 3)
+			logging.warning(f'[ LOOP STALL ] Event loop unblocked after {self.lag:.3f}s')
+
+	# [ WATCHDOG THREAD ]
+	def _capture_stack(self) -> str:
+		frame = sys._current_frames().get(self._loop_ident)
+		if frame is None:
+			return ''
+		return ''.join(traceback.format_stack(frame))
+
+	def _watch(self) -> None:
+		while not self._stop.is_set():
+			interval = max(self.threshold / 4, 0.005)
+			now = time.monotonic()
+			loop = self._loop
+			if loop is None or loop.is_closed():
+				break
+
+			with self._lock:
+				sent = self._probe_sent
+				if sent is None:
+					self._probe_sent = now
+			if sent is None:
+				try:
+					loop.call_soon_threadsafe(self._on_probe, now)
+				except RuntimeError:
+					break  # loop closed
+			else:
+				blocked = now - sent
+				self.lag = max(self.lag, blocked)
+				if blocked >= self.threshold and self._reported is None:
+					stack = self._capture_stack()
+					stall = {
+						'timestamp': datetime.now().isoformat(),
+						'blocked_for': round(blocked, 3),
+						'duration': None,  # set when the loop runs again
+						'stack': stack,
+					}
+					with self._lock:
+						if self._probe_sent == sent:
+							self._reported = stall
+					self.stalls.append(stall)
+					logging.warning(
+						f'[ LOOP STALL ] Event loop blocked for more than {blocked:.3f}s '
+						f'(threshold {self.threshold}s). Loop thread stack:\n{stack}'
+					)
+			self._stop.wait(interval)
@@ -0,0 +1,5 @@
+from ._main import Job, JobManager
+from .fleet import FLEET_COMMANDS, run_fleet_command, select_devices
+from .protected import run_protected_mode_job
+
+job_manager = JobManager()
@@ -0,0 +1,162 @@
+"""
+Background job registry.
+
+Long running device operations are submitted as jobs: the HTTP request returns
+a job ID right away and the client polls (or streams) the progress instead of
+holding the request open until the last command is acknowledged.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+@dataclass
+class Job:
+	id: str
+	kind: str
+	total: int = 0
+	status: str = 'pending'  # pending, running, completed, failed, cancelled
+	succeeded: int = 0
+	failed: int = 0
+	devices: Dict[str, Dict[str, int]] = field(default_factory=dict)
+	errors: list = field(default_factory=list)
+	error: Optional[str] = None
+	params: Dict[str, Any] = field(default_factory=dict)
+	created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+	started_at: Optional[float] = None
+	finished_at: Optional[float] = None
+	task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+	@property
+	def done(self) -> int:
+		return self.succeeded + self.failed
+
+	@property
+	def finished(self) -> bool:
+		return self.status in FINISHED_STATUSES
+
+	def add_device(self, device: str, total: int) -> None:
+		self.devices[device] = {'total': total, 'succeeded': 0, 'failed': 0}
+
+	def record(self, device: str, item: Any, success: bool, error: Optional[str] = None) -> None:
+		"""Record the result of one item processed on *device*."""
+		counters = self.devices.setdefault(device, {'total': 0, 'succeeded': 0, 'failed': 0})
+		if success:
+			self.succeeded += 1
+			counters['succeeded'] += 1
+		else:
+			self.failed += 1
+			counters['failed'] += 1
+			self.errors.append({'device': device, 'item': item, 'error': error})
+
+	async def wait(self, timeout: Optional[float] = None) -> bool:
+		"""Wait until the job finishes or *timeout* expires. Returns True when finished."""
+		if self.task is not None and not self.task.done():
+			await asyncio.wait({self.task}, timeout=timeout)
+		return self.finished
+
+	def to_dict(self, include_errors: bool = True) -> Dict[str, Any]:
+		elapsed = None
+		if self.started_at is not None:
+			elapsed = (self.finished_at or time.monotonic()) - self.started_at
+		data = {
+			'id': self.id,
+			'kind': self.kind,
+			'status': self.status,
+			'total': self.total,
+			'done': self.done,
+			'succeeded': self.succeeded,
+			'failed': self.failed,
+			'progress': round(self.done / self.total, 4) if self.total else 1.0,
+			'devices': self.devices,
+			'params': self.params,
+			'created_at': self.created_at,
+			'elapsed': round(elapsed, 3) if elapsed is not None else None,
+			'rate_per_second': round(self.done / elapsed, 2) if elapsed else None,
+			'error': self.error,
+		}
+		if include_errors:
+			data['errors'] = self.errors
+		return data
+
+
+class JobManager:
+	"""
+	Create, track and cancel background jobs. Finished jobs are kept for polling
+	until more than ``max_finished`` jobs have finished after them.
+	"""
+
+	def __init__(self, max_finished: int = 100):
+		self.max_finished = max_finished
+		self.jobs: 'OrderedDict[str, Job]' = OrderedDict()
+
+	def submit(
+		self,
+		kind: str,
+		runner: Callable[[Job], Awaitable[None]],
+		total: int = 0,
+		params: Optional[Dict[str, Any]] = None,
+	) -> Job:
+		"""
+		Start *runner* as a background task.
+
+		Args:
+		    kind: Job type shown in the API (e.g. 'protected_mode').
+		    runner: Coroutine function receiving the job and updating its progress.
+		    total: Number of items the job will process.
+		    params: Request parameters echoed back in the job status.
+
+		Returns:
+		    The created Job
+		"""
+		job = Job(id=uuid.uuid4().hex[:12], kind=kind, total=total, params=params or {})
+		self.jobs[job.id] = job
+		job.task = asyncio.create_task(self._run(job, runner))
+		self._prune()
+		logging.info(f'[ JOB ] {kind} {job.id} submitted ({total} items)')
+		return job
+
+	async def _run(self, job: Job, runner: Callable[[Job], Awaitable[None]]) -> None:
+		job.status = 'running'
+		job.started_at = time.monotonic()
+		try:
+			await runner(job)
+			job.status = 'completed'
+		except asyncio.CancelledError:
+			job.status = 'cancelled'
+		except Exception as e:
+			job.status = 'failed'
+			job.error = str(e)
+			logging.error(f'[ JOB ] {job.kind} {job.id} failed: {e}', exc_info=True)
+		finally:
+			job.finished_at = time.monotonic()
+			logging.info(
+				f'[ JOB ] {job.kind} {job.id} {job.status}: '
+				f'{job.succeeded} succeeded, {job.failed} failed'
+			)
+
+	def _prune(self) -> None:
+		finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+		for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+			del self.jobs[job_id]
+
+	def get(self, job_id: str) -> Optional[Job]:
+		return self.jobs.get(job_id)
+
+	def list_jobs(self, kind: Optional[str] = None) -> list[Job]:
+		return [job for job in self.jobs.values() if kind is None or job.kind == kind]
+
+	def cancel(self, job_id: str) -> bool:
+		job = self.jobs.get(job_id)
+		if job is None or job.finished or job.task is None:
+			return False
+		job.task.cancel()
+		return True
@@ -0,0 +1,196 @@
+"""
+Fleet-wide device commands.
+
+A command is sent to every selected device concurrently, with at most
+*concurrency* devices in progress and a timeout per device, so reconfiguring a
+whole fleet takes about as long as the slowest device instead of the sum of all
+of them. Every device gets its own result; one slow or failing reader does not
+affect the others.
+
+``set_power`` and ``update_config`` rewrite the device config and reload the
+device (shut down, remove, add again), so they are never cancelled: when one
+times out the device is reported as failed and the command keeps running in
+the background, holding its concurrency slot until it finishes.
+"""
+
+import asyncio
+import fnmatch
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from smartx_rfid.devices import DeviceManager
+from smartx_rfid.schemas.devices import GpoSchema
+
+DeviceCommand = Callable[[DeviceManager, str], Awaitable[tuple[bool, Optional[str]]]]
+
+
+def select_devices(
+	devices: DeviceManager,
+	names: Optional[list[str]] = None,
+	pattern: Optional[str] = None,
+	device_type: Optional[str] = None,
+	connected: Optional[bool] = None,
+) -> list[str]:
+	"""
+	Resolve a device selector to device names (all filters must match).
+
+	Args:
+	    names: Explicit device names.
+	    pattern: Shell-style name pattern (e.g. ``portal_*``).
+	    device_type: Device type (``rfid``, ``printer``, ...).
+	    connected: Only connected (True) or disconnected (False) devices.
+	"""
+	selected = []
+	for name in devices.get_devices():
+		device = devices.get_device(name)
+		if names is not None and name not in names:
+			continue
+		if pattern is not None and not fnmatch.fnmatchcase(name, pattern):
+			continue
+		if device_type is not None and getattr(device, 'device_type', None) != device_type:
+			continue
+		if connected is not None and bool(getattr(device, 'is_connected', False)) != connected:
+			continue
+		selected.append(name)
+	return selected
+
+
+# [ COMMANDS ]
+def _set_power(params: Dict[str, Any]) -> DeviceCommand:
+	power = params.get('power')
+	if not isinstance(power, int) or isinstance(power, bool):
+		raise ValueError("set_power requires an integer 'power'")
+	return lambda devices, name: devices.set_power(name, power)
+
+
+def _write_gpo(params: Dict[str, Any]) -> DeviceCommand:
+	gpo = GpoSchema(**params).model_dump()  # raises pydantic ValidationError (a ValueError)
+	return lambda devices, name: devices.write_gpo(device_name=name, **gpo)
+
+
+def _inventory(start: bool) -> Callable[[Dict[str, Any]], DeviceCommand]:
+	def build(params: Dict[str, Any]) -> DeviceCommand:
+		async def run(devices: DeviceManager, name: str) -> tuple[bool, Optional[str]]:
+			method = devices.start_inventory if start else devices.stop_inventory
+			success = await method(name)
+			return success, None if success else 'Device not connected, not RFID or command failed'
+
+		return run
+
+	return build
+
+
+def _update_config(params: Dict[str, Any]) -> DeviceCommand:
+	changes = params.get('config')
+	if not isinstance(changes, dict) or not changes:
+		raise ValueError("update_config requires a non-empty 'config' object")
+
+	async def run(devices: DeviceManager, name: str) -> tuple[bool, Optional[str]]:
+		current = devices.get_device_config(name)
+		if current is None:
+			return False, f"Device config '{name}' not found."
+		return await devices.update_device_config(name, {**current, **changes})
+
+	return run
+
+
+FLEET_COMMANDS: Dict[str, Callable[[Dict[str, Any]], DeviceCommand]] = {
+	'set_power': _set_power,
+	'write_gpo': _write_gpo,
+	'start_inventory': _inventory(start=True),
+	'stop_inventory': _inventory(start=False),
+	'update_config': _update_config,
+}
+
+# commands that reload the device; cancelling one halfway can leave the device removed
+RECONFIGURING_COMMANDS = frozenset({'set_power', 'update_config'})
+
+# reconfigurations still running after their timeout was reported
+_background: set[asyncio.Task] = set()
+
+
+def _finish_in_background(name: str, command: str, task: asyncio.Task) -> None:
+	_background.discard(task)
+	if task.cancelled():
+		return
+	error = task.exception()
+	if error is not None:
+		logging.error(f'[ FLEET ] {command} on {name} failed after its timeout: {error}')
+		return
+	success, error = task.result()
+	logging.info(
+		f'[ FLEET ] {command} on {name} finished after its timeout: '
+		f'{"success" if success else error}'
+	)
+
+
+async def run_fleet_command(
+	devices: DeviceManager,
+	names: list[str],
+	command: str,
+	params: Optional[Dict[str, Any]] = None,
+	concurrency: int = 16,
+	timeout: float = 10.0,
+) -> Dict[str, Any]:
+	"""
+	Run *command* on every device in *names*.
+
+	Args:
+	    devices: Device manager used to send the command.
+	    names: Target device names.
+	    command: One of FLEET_COMMANDS.
+	    params: Command parameters (``power`` for set_power, GPO fields for write_gpo,
+	        ``config`` with the keys to change for update_config).
+	    concurrency: Maximum devices handled at the same time.
+	    timeout: Seconds allowed per device; a device that times out is reported as failed
+	        (reconfiguring commands keep running, see RECONFIGURING_COMMANDS).
+
+	Returns:
+	    Summary with a result (success, error, elapsed) per device
+
+	Raises:
+	    ValueError: Unknown command or invalid parameters.
+	"""
+	if command not in FLEET_COMMANDS:
+		raise ValueError(f'Unknown command {command!r}, expected one of {sorted(FLEET_COMMANDS)}')
+	send = FLEET_COMMANDS[command](params or {})
+	semaphore = asyncio.Semaphore(max(1, concurrency))
+
+	shielded = command in RECONFIGURING_COMMANDS
+
+	async def run_device(name: str) -> Dict[str, Any]:
+		await semaphore.acquire()
+		start = time.perf_counter()
+		task = asyncio.ensure_future(send(devices, name))
+		task.add_done_callback(lambda _: semaphore.release())
+		try:
+			success, error = await asyncio.wait_for(
+				asyncio.shield(task) if shielded else task, timeout
+			)
+		except asyncio.TimeoutError:
+			success, error = False, f'Timed out after {timeout}s'
+			if shielded:
+				error += ', still reconfiguring in the background'
+				_background.add(task)
+				task.add_done_callback(lambda task: _finish_in_background(name, command, task))
+		except Exception as e:
+			success, error = False, str(e)
+		return {
+			'success': bool(success),
+			'error': None if success else error,
+			'elapsed': round(time.perf_counter() - start, 3),
+		}
+
+	start = time.perf_counter()
+	outcomes = await asyncio.gather(*(run_device(name) for name in names))
+	results = dict(zip(names, outcomes))
+	succeeded = sum(1 for result in outcomes if result['success'])
+	return {
+		'command': command,
+		'total': len(names),
+		'succeeded': succeeded,
+		'failed': len(names) - succeeded,
+		'elapsed': round(time.perf_counter() - start, 3),
+		'results': results,
+	}
@@ -0,0 +1,49 @@
+import asyncio
+
+from smartx_rfid.devices import DeviceManager
+
+from ._main import Job
+
+
+async def run_protected_mode_job(
+	job: Job,
+	devices: DeviceManager,
+	targets: dict[str, list[str]],
+	password: str | None,
+	active: bool,
+	window: int,
+) -> None:
+	"""
+	Send protected-mode commands for many EPCs.
+
+	Each device gets its own pipeline with up to *window* commands in flight, and all
+	devices run in parallel, so a pallet costs about len(epcs) / window round-trips per
+	reader instead of one round-trip per EPC.
+
+	Args:
+	    job: Job updated with the result of every command.
+	    devices: Device manager used to send the commands.
+	    targets: EPC list per device name.
+	    password: Access password (None uses the reader default).
+	    active: Activate (True) or deactivate (False) protected mode.
+	    window: Maximum commands in flight per device.
+	"""
+
+	async def run_device(device_name: str, epcs: list[str]) -> None:
+		semaphore = asyncio.Semaphore(max(1, window))
+
+		async def send(epc: str) -> None:
+			async with semaphore:
+				try:
+					success, msg = await devices.protected_mode(
+						device_name=device_name, epc=epc, password=password, active=active
+					)
+				except Exception as e:
+					success, msg = False, str(e)
+				job.record(device_name, epc, success, msg)
+
+		await asyncio.gather(*(send(epc) for epc in epcs))
+
+	for device_name, epcs in targets.items():
+		job.add_device(device_name, len(epcs))
+	await asyncio.gather(*(run_device(name, epcs) for name, epcs in targets.items()))
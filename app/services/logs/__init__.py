@@ -0,0 +1,6 @@
+from .tail import LogTailer
+from .search import LogSearcher
+from app.core import logger
+
+log_tailer = LogTailer()
+log_searcher = LogSearcher(log_path=logger.log_path, base_filename=logger.base_filename)
@@ -0,0 +1,243 @@
+"""
+Server-side search over the JSONL log files written by LoggerManager.
+
+Files are scanned through ``mmap`` so the regex engine walks the page cache
+directly instead of Python reading and decoding every line. Only the lines
+that contain the most selective needle (free text, device or level) are
+decoded and checked against the remaining filters.
+"""
+
+import json
+import mmap
+import re
+import threading
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class LogSearcher:
+	"""
+	Search log files with level, time-range, device and free-text filters.
+	"""
+
+	def __init__(self, log_path: str | Path, base_filename: str):
+		"""
+		Args:
+		    log_path: Directory containing the log files.
+		    base_filename: Base name used by LoggerManager (``YYYY-MM-DD_<base>.jsonl``).
+		"""
+		self.log_path = Path(log_path)
+		self.base_filename = base_filename
+
+	# [ FILES ]
+	def _file_date(self, path: Path) -> Optional[date]:
+		try:
+			return datetime.strptime(path.name.split('_')[0], '%Y-%m-%d').date()
+		except ValueError:
+			return None
+
+	def list_files(
+		self, start: Optional[datetime] = None, end: Optional[datetime] = None
+	) -> list[Path]:
+		"""Return the log files overlapping [start, end], oldest first."""
+		files = []
+		for path in self.log_path.glob(f'*_{self.base_filename}.jsonl'):
+			file_date = self._file_date(path)
+			if file_date is None:
+				continue
+			if start is not None and file_date < start.astimezone(timezone.utc).date():
+				continue
+			if end is not None and file_date > end.astimezone(timezone.utc).date():
+				continue
+			files.append((file_date, path))
+		return [path for _, path in sorted(files)]
+
+	# [ FILTERS ]
+	@staticmethod
+	def _to_utc(value: Optional[datetime]) -> Optional[datetime]:
+		if value is None:
+			return None
+		if value.tzinfo is None:
+			value = value.astimezone()  # naive values are local time
+		return value.astimezone(timezone.utc)
+
+	@staticmethod
+	def _build_needle(
+		text: Optional[str], device: Optional[str], levels: Optional[set[str]]
+	) -> Optional[re.Pattern]:
+		"""Pick the most selective byte pattern used to locate candidate lines."""
+		if text:
+			return re.compile(re.escape(text.encode('utf-8')), re.IGNORECASE)
+		if device:
+			return re.compile(re.escape(device.encode('utf-8')))
+		if levels:
+			alternatives = b'|'.join(re.escape(level.encode('utf-8')) for level in sorted(levels))
+			return re.compile(b'"level": "(?:' + alternatives + b')"')
+		return None
+
+	@staticmethod
+	def _matches(
+		entry: Dict[str, Any],
+		text: Optional[str],
+		device: Optional[str],
+		levels: Optional[set[str]],
+		start: Optional[datetime],
+		end: Optional[datetime],
+	) -> bool:
+		if levels and entry.get('level') not in levels:
+			return False
+		if device and device not in str(entry.get('message', '')):
+			return False
+		if text:
+			needle = text.lower()
+			if not any(isinstance(v, str) and needle in v.lower() for v in entry.values()):
+				return False
+		if start is not None or end is not None:
+			try:
+				timestamp = datetime.fromisoformat(entry.get('timestamp'))
+			except (TypeError, ValueError):
+				return False
+			if timestamp.tzinfo is None:
+				timestamp = timestamp.replace(tzinfo=timezone.utc)
+			if start is not None and timestamp < start:
+				return False
+			if end is not None and timestamp > end:
+				return False
+		return True
+
+	# [ SEARCH ]
+	@staticmethod
+	def _parse_cursor(cursor: Optional[str]) -> tuple[Optional[str], int]:
+		if not cursor:
+			return None, 0
+		name, _, offset = cursor.rpartition(':')
+		try:
+			return name, int(offset)
+		except ValueError:
+			return None, 0
+
+	@staticmethod
+	def _iter_candidates(mm: mmap.mmap, offset: int, needle: Optional[re.Pattern]):
+		"""Yield (line_start, line_end) for lines at or after *offset* that contain *needle*."""
+		size = len(mm)
+		if needle is None:
+			pos = offset
+			while pos < size:
+				end = mm.find(b'\n', pos)
+				if end == -1:
+					return  # trailing partial line is still being written
+				yield pos, end
+				pos = end + 1
+			return
+
+		pos = offset
+		while pos < size:
+			match = needle.search(mm, pos)
+			if match is None:
+				return
+			line_start = mm.rfind(b'\n', 0, match.start()) + 1
+			line_end = mm.find(b'\n', match.end())
+			if line_end == -1:
+				return
+			yield line_start, line_end
+			pos = line_end + 1
+
+	def search(
+		self,
+		text: Optional[str] = None,
+		device: Optional[str] = None,
+		levels: Optional[list[str]] = None,
+		start: Optional[datetime] = None,
+		end: Optional[datetime] = None,
+		limit: int = 200,
+		cursor: Optional[str] = None,
+		timeout: float = 5.0,
+		cancel_event: Optional[threading.Event] = None,
+	) -> Dict[str, Any]:
+		"""
+		Scan log files and return one page of matching entries, oldest first.
+
+		Args:
+		    text: Case-insensitive free text matched against every string field.
+		    device: Device name that must appear in the message.
+		    levels: Accepted log levels (e.g. ['ERROR', 'WARNING']).
+		    start: Minimum timestamp (naive values are local time).
+		    end: Maximum timestamp (naive values are local time).
+		    limit: Page size.
+		    cursor: 'next_cursor' from the previous page.
+		    timeout: Scan budget in seconds; partial results are returned when exceeded.
+		    cancel_event: Optional event that aborts the scan when set.
+
+		Returns:
+		    Dict with 'results', 'next_cursor', 'timed_out', 'cancelled', 'scanned_bytes'
+		    and 'files'.
+		"""
+		level_set = {level.upper() for level in levels} if levels else None
+		start_utc, end_utc = self._to_utc(start), self._to_utc(end)
+		needle = self._build_needle(text, device, level_set)
+		deadline = time.monotonic() + timeout if timeout and timeout > 0 else None
+
+		files = self.list_files(start_utc, end_utc)
+		cursor_name, cursor_offset = self._parse_cursor(cursor)
+		if cursor_name is not None:
+			names = [f.name for f in files]
+			if cursor_name in names:
+				files = files[names.index(cursor_name) :]
+			else:
+				cursor_offset = 0
+
+		results: list[Dict[str, Any]] = []
+		scanned_bytes = 0
+		timed_out = cancelled = False
+		next_cursor: Optional[str] = None
+
+		for path in files:
+			offset = cursor_offset if path.name == cursor_name else 0
+			try:
+				with open(path, 'rb') as f:
+					if f.seek(0, 2) == 0:
+						continue
+					with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+						checked = 0
+						for line_start, line_end in self._iter_candidates(mm, offset, needle):
+							checked += 1
+							if checked % 256 == 0:
+								if deadline is not None and time.monotonic() > deadline:
+									timed_out = True
+								elif cancel_event is not None and cancel_event.is_set():
+									cancelled = True
+								if timed_out or cancelled:
+									next_cursor = f'{path.name}:{line_start}'
+									break
+							try:
+								entry = json.loads(mm[line_start:line_end])
+							except ValueError:
+								continue
+							if not isinstance(entry, dict):
+								continue
+							if self._matches(entry, text, device, level_set, start_utc, end_utc):
+								entry['_file'] = path.name
+								results.append(entry)
+								if len(results) >= limit:
+									next_cursor = f'{path.name}:{line_end + 1}'
+									break
+						scanned_bytes += (
+							int(next_cursor.rpartition(':')[2]) - offset
+							if next_cursor
+							else len(mm) - offset
+						)
+			except OSError:
+				continue
+			if next_cursor is not None:
+				break
+
+		return {
+			'results': results,
+			'next_cursor': next_cursor,
+			'timed_out': timed_out,
+			'cancelled': cancelled,
+			'scanned_bytes': scanned_bytes,
+			'files': [path.name for path in files],
+		}
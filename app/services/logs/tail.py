@@ -0,0 +1,178 @@
+"""
+Incremental log tailing based on byte-offset cursors.
+
+Instead of re-reading the whole daily log file on every poll, clients keep a
+cursor (inode + byte offset) and only receive the lines appended after it.
+Line counts are cached per file and updated as the file grows, so the total
+line count costs one pass over the new bytes instead of one pass over the file.
+A line longer than one read window is served in window-sized pieces.
+"""
+
+import os
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, Optional
+
+_BLOCK_SIZE = 64 * 1024
+
+
+@dataclass
+class _FileState:
+	inode: int
+	scanned: int = 0  # byte offset up to which line_count is known
+	line_count: int = 0
+
+
+class LogTailer:
+	"""
+	Serve new log lines after a byte offset and keep a cached line count per file.
+	"""
+
+	def __init__(self, max_bytes_per_read: int = 4 * 1024 * 1024):
+		"""
+		Args:
+		    max_bytes_per_read: Upper bound of bytes returned by a single incremental read;
+		        a window without a newline is returned as a truncated line.
+		"""
+		self.max_bytes_per_read = max_bytes_per_read
+		self._states: Dict[str, _FileState] = {}
+		self._lock = Lock()
+
+	# [ CACHE ]
+	def _get_state(self, file_path: str, stat: os.stat_result) -> _FileState:
+		"""Return the cached state for a file, resetting it when the file was rotated."""
+		state = self._states.get(file_path)
+		if state is None or state.inode != stat.st_ino or stat.st_size < state.scanned:
+			state = _FileState(inode=stat.st_ino)
+			self._states[file_path] = state
+		return state
+
+	def _update_line_count(self, file_path: str, state: _FileState, size: int) -> None:
+		"""Count non-empty lines between the last scanned offset and the last complete line."""
+		if size <= state.scanned:
+			return
+		with open(file_path, 'rb') as f:
+			f.seek(state.scanned)
+			remaining = size - state.scanned
+			pending = b''
+			while remaining > 0:
+				chunk = f.read(min(_BLOCK_SIZE, remaining))
+				if not chunk:
+					break
+				remaining -= len(chunk)
+				data = pending + chunk
+				last_nl = data.rfind(b'\n')
+				if last_nl == -1:
+					pending = data
+					continue
+				complete, pending = data[: last_nl + 1], data[last_nl + 1 :]
+				state.line_count += sum(1 for line in complete.split(b'\n') if line.strip())
+				state.scanned += len(complete)
+
+	# [ READ ]
+	@staticmethod
+	def _decode(raw: bytes) -> list[str]:
+		return [
+			line.decode('utf-8', errors='replace').strip()
+			for line in raw.split(b'\n')
+			if line.strip()
+		]
+
+	@staticmethod
+	def _read_tail(file_path: str, size: int, n: Optional[int]) -> tuple[list[str], int]:
+		"""
+		Read the last *n* non-empty complete lines by scanning backwards from the end.
+
+		Returns:
+		    (lines, end_offset) where end_offset points right after the last complete line.
+		"""
+		with open(file_path, 'rb') as f:
+			if n is None:
+				buffer = f.read(size)
+				pos = 0
+			else:
+				buffer = b''
+				pos = size
+				while pos > 0:
+					read_size = min(_BLOCK_SIZE, pos)
+					pos -= read_size
+					f.seek(pos)
+					buffer = f.read(read_size) + buffer
+					# n complete lines + the partial line before them + a possible trailing partial
+					if buffer.count(b'\n') > n + 1:
+						break
+
+		# Ignore a trailing partial line; it will be served once it is complete.
+		last_nl = buffer.rfind(b'\n')
+		if last_nl == -1:
+			return [], pos
+		first = buffer.find(b'\n') + 1 if pos > 0 else 0  # first line may be cut in the middle
+		lines = LogTailer._decode(buffer[first : last_nl + 1])
+		if n is not None:
+			lines = lines[-n:] if n > 0 else []
+		return lines, pos + last_nl + 1
+
+	def read(
+		self,
+		file_path: str,
+		offset: Optional[int] = None,
+		inode: Optional[int] = None,
+		limit: Optional[int] = 500,
+	) -> Dict[str, Any]:
+		"""
+		Return lines appended after a cursor, or the file tail when no valid cursor is given.
+
+		Args:
+		    file_path: Log file to read.
+		    offset: Byte offset returned by the previous call.
+		    inode: Inode returned by the previous call (detects rotation/replacement).
+		    limit: Maximum number of lines for a tail read (None = all lines).
+
+		Returns:
+		    Dict with 'lines', 'offset', 'inode', 'reset', 'total_lines' and 'file_size'.
+		"""
+		try:
+			stat = os.stat(file_path)
+		except FileNotFoundError:
+			return {
+				'lines': [],
+				'offset': 0,
+				'inode': None,
+				'reset': True,
+				'total_lines': 0,
+				'file_size': 0,
+			}
+
+		size = stat.st_size
+		reset = offset is None or inode != stat.st_ino or offset > size or offset < 0
+
+		with self._lock:
+			state = self._get_state(file_path, stat)
+			self._update_line_count(file_path, state, size)
+			total_lines = state.line_count
+
+		if reset:
+			lines, next_offset = self._read_tail(file_path, size, limit)
+		else:
+			lines, next_offset = [], offset
+			if size > offset:
+				with open(file_path, 'rb') as f:
+					f.seek(offset)
+					raw = f.read(min(size - offset, self.max_bytes_per_read))
+				last_nl = raw.rfind(b'\n')
+				if last_nl != -1:
+					lines = self._decode(raw[: last_nl + 1])
+					next_offset = offset + last_nl + 1
+				elif len(raw) >= self.max_bytes_per_read:
+					# the line does not fit in a read: serve this piece, the rest comes next
+					lines = self._decode(raw)
+					next_offset = offset + len(raw)
+
+		return {
+			'lines': lines,
+			'offset': next_offset,
+			'inode': stat.st_ino,
+			'reset': reset,
+			'total_lines': total_lines,
+			'file_size': size,
+		}
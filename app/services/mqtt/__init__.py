@@ -0,0 +1,3 @@
+from .ingest import DECODERS, MqttIngest
+from .publisher import MqttPublisher
+from .common import stable_client_id, topic_matches
@@ -0,0 +1,28 @@
+"""Helpers shared by the MQTT publisher and the ingest listener."""
+
+import hashlib
+import socket
+from typing import Iterable
+
+
+def topic_matches(pattern: str, topic: str) -> bool:
+	"""MQTT topic filter match (``+`` one level, ``#`` the remaining levels)."""
+	pattern_levels = pattern.split('/')
+	topic_levels = topic.split('/')
+	for i, level in enumerate(pattern_levels):
+		if level == '#':
+			return True
+		if i >= len(topic_levels) or (level != '+' and level != topic_levels[i]):
+			return False
+	return len(pattern_levels) == len(topic_levels)
+
+
+def stable_client_id(prefix: str, url: str, topics: Iterable[str]) -> str:
+	"""
+	Client ID that stays the same for the same host and configuration.
+
+	Both clients connect with ``clean_session=False``; a stable ID lets the
+	broker resume the session after a restart instead of leaving it orphaned.
+	"""
+	key = f'{socket.gethostname()}|{url}|{",".join(sorted(topics))}'
+	return f'{prefix}-{hashlib.sha1(key.encode()).hexdigest()[:8]}'
@@ -0,0 +1,297 @@
+"""
+MQTT ingest: subscribe to reader topics and feed the tag pipeline directly.
+
+Each subscription maps a topic to a device and a payload format::
+
+    {'topic': 'readers/{device}/events', 'format': 'r700'}
+    {'topic': 'dock/door1', 'format': 'x714', 'device': 'door_1'}
+
+``{device}`` matches one topic level (subscribed as ``+``) and names the device;
+a fixed ``device`` is used otherwise. Received payloads are queued by the MQTT
+callback and decoded in batches by the ingest task, which yields to the event
+loop between batches. Formats:
+
+- ``r700``: Impinj IoT events (``tagInventory``/``inventoryStatus``), one JSON
+  object, a JSON array or NDJSON lines; handed to ``handle_r700_event``.
+- ``x714``: ``#T+@epc|tid|ant|rssi`` lines (EPC/TID lowercased, as the X714
+  driver does) or JSON ``{event_type, event_data}`` events, like ``/receive/x714``.
+- ``xscan``: JSON ``{event_type, event_data}`` events, like ``/receive/x-scan``.
+- ``tags``: JSON tag objects (``epc``, ``tid``, ``ant``, ``rssi``), like
+  ``/receive/tags``.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from gmqtt import Client
+from gmqtt.mqtt.constants import UNLIMITED_RECONNECTS
+
+from .common import stable_client_id, topic_matches
+
+
+def _json_items(payload: bytes) -> list:
+	"""JSON object, JSON array or NDJSON lines as a list of items."""
+	text = payload.decode('utf-8', errors='replace').strip()
+	if not text:
+		return []
+	try:
+		data = json.loads(text)
+	except json.JSONDecodeError:
+		return [json.loads(line) for line in text.splitlines() if line.strip()]
+	return data if isinstance(data, list) else [data]
+
+
+def decode_r700(payload: bytes, device: Optional[str]) -> list[Dict[str, Any]]:
+	events = [event for event in _json_items(payload) if isinstance(event, dict)]
+	if device is not None:
+		for event in events:
+			event['hostname'] = device
+	return events
+
+
+def decode_x714(payload: bytes, device: Optional[str]) -> list[tuple[str, str, Any]]:
+	if payload.lstrip().startswith(b'#'):
+		events = []
+		for line in payload.decode('utf-8', errors='replace').splitlines():
+			if not line.startswith('#T+@'):
+				continue
+			fields = line[4:].strip().split('|')
+			if len(fields) < 4:
+				continue
+			events.append(
+				(
+					device,
+					'tag',
+					{
+						'epc': fields[0].lower(),
+						'tid': fields[1].lower() or None,
+						'ant': int(fields[2]),
+						'rssi': -abs(int(fields[3])),
+					},
+				)
+			)
+		return events
+	return decode_xscan(payload, device)
+
+
+def decode_xscan(payload: bytes, device: Optional[str]) -> list[tuple[str, str, Any]]:
+	return [
+		(device or item.get('device_name'), item.get('event_type'), item.get('event_data'))
+		for item in _json_items(payload)
+		if isinstance(item, dict)
+	]
+
+
+def decode_tags(payload: bytes, device: Optional[str]) -> list[Dict[str, Any]]:
+	return [item for item in _json_items(payload) if isinstance(item, dict)]
+
+
+DECODERS: Dict[str, Callable[[bytes, Optional[str]], list]] = {
+	'r700': decode_r700,
+	'x714': decode_x714,
+	'xscan': decode_xscan,
+	'tags': decode_tags,
+}
+
+
+class _Subscription:
+	def __init__(self, topic: str, format: str, device: Optional[str] = None, qos: int = 0):
+		if format not in DECODERS:
+			raise ValueError(f'Unknown MQTT ingest format {format!r} (use {", ".join(DECODERS)})')
+		levels = topic.split('/')
+		self.device_level = levels.index('{device}') if '{device}' in levels else None
+		self.filter = '/'.join('+' if level == '{device}' else level for level in levels)
+		self.format = format
+		self.device = device
+		self.qos = qos
+
+	def device_for(self, topic: str) -> Optional[str]:
+		if self.device_level is not None:
+			return topic.split('/')[self.device_level]
+		return self.device
+
+
+class MqttIngest:
+	def __init__(
+		self,
+		url: str,
+		subscriptions: list[Dict[str, Any]],
+		manager: Any,
+		batch_size: int = 500,
+		max_pending: int = 100_000,
+		client_id: Optional[str] = None,
+	):
+		"""
+		Args:
+		    url: Broker URL, ``mqtt://[user:password@]host[:port]`` (``mqtts://`` for TLS).
+		    subscriptions: ``{"topic", "format", "device"?, "qos"?}`` entries.
+		    manager: RfidManager receiving the decoded tags and events.
+		    batch_size: Messages decoded between yields to the event loop.
+		    max_pending: Messages queued before new ones are dropped.
+		    client_id: MQTT client ID; by default derived from the host name, URL and
+		        topics, so the persistent session survives restarts.
+
+		Raises:
+		    ValueError: Unsupported URL scheme or payload format.
+		"""
+		parsed = urlparse(url)
+		if parsed.scheme not in ('mqtt', 'mqtts', 'tcp', 'ssl'):
+			raise ValueError(f'Unsupported MQTT URL scheme: {parsed.scheme}')
+		self.host = parsed.hostname or 'localhost'
+		self.ssl = parsed.scheme in ('mqtts', 'ssl')
+		self.port = parsed.port or (8883 if self.ssl else 1883)
+		self.username = parsed.username
+		self.password = parsed.password
+		self.subscriptions = [_Subscription(**subscription) for subscription in subscriptions]
+		self.manager = manager
+		self.batch_size = batch_size
+		self.max_pending = max_pending
+		self.client_id = client_id or stable_client_id(
+			'x-bridge-ingest', url, (subscription.filter for subscription in self.subscriptions)
+		)
+
+		self._routes: Dict[str, Optional[tuple[_Subscription, Optional[str]]]] = {}
+		self._pending: list[tuple[str, bytes]] = []
+		self._wakeup: Optional[asyncio.Event] = None
+		self._client: Optional[Client] = None
+
+		self.messages = 0
+		self.events = 0
+		self.dropped = 0
+		self.errors = 0
+
+	@property
+	def connected(self) -> bool:
+		return self._client is not None and self._client.is_connected
+
+	# [ MQTT CALLBACKS ]
+	def _on_connect(self, client, flags, rc, properties) -> None:
+		# also runs after reconnects: the broker may not have kept the session
+		for subscription in self.subscriptions:
+			client.subscribe(subscription.filter, qos=subscription.qos)
+
+	def _on_message(self, client, topic, payload, qos, properties) -> int:
+		if len(self._pending) >= self.max_pending:
+			self.dropped += 1
+		else:
+			self._pending.append((topic, payload))
+			if self._wakeup is not None:
+				self._wakeup.set()
+		return 0  # PUBACK success
+
+	# [ DECODING ]
+	def _route(self, topic: str) -> Optional[tuple[_Subscription, Optional[str]]]:
+		route = self._routes.get(topic, False)
+		if route is False:
+			route = next(
+				(
+					(subscription, subscription.device_for(topic))
+					for subscription in self.subscriptions
+					if topic_matches(subscription.filter, topic)
+				),
+				None,
+			)
+			if len(self._routes) < 10_000:  # topics with per-message IDs must not grow this
+				self._routes[topic] = route
+		return route
+
+	def process(self, messages: list[tuple[str, bytes]]) -> int:
+		"""Decode a batch of (topic, payload) messages and feed them to the manager."""
+		manager = self.manager
+		r700_events = []
+		fed = 0
+		for topic, payload in messages:
+			route = self._route(topic)
+			if route is None:
+				continue
+			subscription, device = route
+			try:
+				items = DECODERS[subscription.format](payload, device)
+			except (ValueError, TypeError, IndexError) as e:
+				self.errors += 1
+				logging.warning(
+					'[ MQTT INGEST ] Bad %s payload on %s: %s', subscription.format, topic, e
+				)
+				continue
+			fed += len(items)
+			if subscription.format == 'r700':
+				r700_events.extend(items)  # one handle_r700_event call per batch
+				continue
+			for item in items:
+				try:
+					if subscription.format == 'tags':
+						manager.on_tag(name=device or item.get('device', 'unknown'), tag_data=item)
+					elif subscription.format == 'xscan':
+						name, event_type, event_data = item
+						manager.on_xscan_event(name or 'unknown', event_type, event_data)
+					else:
+						name, event_type, event_data = item
+						manager.on_event(
+							name=name or 'unknown', event_type=event_type, event_data=event_data
+						)
+				except Exception as e:
+					self.errors += 1
+					logging.error('[ MQTT INGEST ] Error handling message on %s: %s', topic, e)
+		if r700_events:
+			try:
+				manager.handle_r700_event(r700_events)
+			except Exception as e:
+				self.errors += 1
+				logging.error(f'[ MQTT INGEST ] Error handling r700 events: {e}')
+		self.messages += len(messages)
+		self.events += fed
+		return fed
+
+	# [ LIFECYCLE ]
+	async def _connect(self) -> None:
+		backoff = 1
+		while True:
+			client = Client(self.client_id, clean_session=False)
+			client.set_config({'reconnect_retries': UNLIMITED_RECONNECTS, 'reconnect_delay': 2})
+			client.on_connect = self._on_connect
+			client.on_message = self._on_message
+			if self.username:
+				client.set_auth_credentials(self.username, self.password)
+			try:
+				await asyncio.wait_for(
+					client.connect(self.host, self.port, ssl=self.ssl, keepalive=30), timeout=10
+				)
+				self._client = client
+				logging.info(f'[ MQTT INGEST ] Connected to {self.host}:{self.port}')
+				return
+			except Exception as e:  # refused, timeout, CONNACK error
+				logging.warning(
+					f'[ MQTT INGEST ] Connection to {self.host}:{self.port} failed: {e}'
+				)
+				await asyncio.sleep(backoff)
+				backoff = min(backoff * 2, 30)
+
+	async def run(self) -> None:
+		"""Connect, subscribe and process received messages until cancelled."""
+		self._wakeup = asyncio.Event()
+		await self._connect()
+		try:
+			while True:
+				await self._wakeup.wait()
+				self._wakeup.clear()
+				while self._pending:
+					batch = self._pending[: self.batch_size]
+					del self._pending[: self.batch_size]
+					self.process(batch)
+					await asyncio.sleep(0)
+		finally:
+			if self._client is not None:
+				await self._client.disconnect()
+
+	def get_stats(self) -> Dict[str, Any]:
+		return {
+			'connected': self.connected,
+			'messages': self.messages,
+			'events': self.events,
+			'pending': len(self._pending),
+			'dropped': self.dropped,
+			'errors': self.errors,
+		}
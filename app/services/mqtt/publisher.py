@@ -0,0 +1,220 @@
+"""
+MQTT publish sink for tags and events.
+
+Items are grouped per topic and sent as one JSON array per publish, over one
+persistent connection. With QoS 1 at most ``max_inflight`` publishes wait for
+their PUBACK at any time (unacknowledged messages are kept by gmqtt and resent
+after a reconnect). While the broker is unreachable, batches stay in a local
+buffer bounded by ``buffer_size`` items; the oldest batches are dropped first.
+
+Topics are templates with ``{prefix}``, ``{device}`` and ``{event_type}``.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from gmqtt import Client
+from gmqtt.mqtt.constants import UNLIMITED_RECONNECTS
+from gmqtt.storage import HeapPersistentStorage
+
+from .common import stable_client_id
+
+
+class _InflightStorage(HeapPersistentStorage):
+	"""gmqtt QoS store that counts unacknowledged publishes and wakes up waiters on PUBACK."""
+
+	def __init__(self):
+		super().__init__()
+		self.acked = asyncio.Event()
+
+	def push_message_nowait(self, mid, raw_package) -> asyncio.Future:
+		# stored synchronously so the in-flight count is exact right after publish()
+		heapq.heappush(self._queue, (time.monotonic(), mid, raw_package))
+		future = asyncio.get_running_loop().create_future()
+		future.set_result(None)
+		return future
+
+	async def remove_message_by_mid(self, mid):
+		await super().remove_message_by_mid(mid)
+		self.acked.set()
+
+	def __len__(self) -> int:
+		return len(self._queue)
+
+
+class MqttPublisher:
+	def __init__(
+		self,
+		url: str,
+		topic_prefix: str = 'xbridge',
+		tag_topic: str = '{prefix}/{device}/tags',
+		event_topic: str = '{prefix}/{device}/events/{event_type}',
+		qos: int = 1,
+		batch_size: int = 500,
+		flush_interval: float = 0.05,
+		max_inflight: int = 100,
+		buffer_size: int = 100_000,
+		client_id: Optional[str] = None,
+	):
+		"""
+		Args:
+		    url: Broker URL, ``mqtt://[user:password@]host[:port]`` (``mqtts://`` for TLS).
+		    topic_prefix: Value of ``{prefix}`` in the topic templates.
+		    tag_topic: Topic template for tags.
+		    event_topic: Topic template for events.
+		    qos: 0 or 1.
+		    batch_size: Items per publish.
+		    flush_interval: Seconds a partial batch waits before it is published.
+		    max_inflight: QoS 1 publishes awaiting PUBACK at any time.
+		    buffer_size: Items kept while disconnected (oldest batches are dropped).
+		    client_id: MQTT client ID; by default derived from the host name, URL and
+		        topic templates, so the persistent session survives restarts.
+		"""
+		parsed = urlparse(url)
+		if parsed.scheme not in ('mqtt', 'mqtts', 'tcp', 'ssl'):
+			raise ValueError(f'Unsupported MQTT URL scheme: {parsed.scheme}')
+		self.host = parsed.hostname or 'localhost'
+		self.ssl = parsed.scheme in ('mqtts', 'ssl')
+		self.port = parsed.port or (8883 if self.ssl else 1883)
+		self.username = parsed.username
+		self.password = parsed.password
+		self.topic_prefix = topic_prefix
+		self.tag_topic = tag_topic
+		self.event_topic = event_topic
+		self.qos = 1 if qos else 0
+		self.batch_size = batch_size
+		self.flush_interval = flush_interval
+		self.max_inflight = max_inflight
+		self.buffer_size = buffer_size
+		self.client_id = client_id or stable_client_id(
+			'x-bridge', url, (topic_prefix, tag_topic, event_topic)
+		)
+
+		self._batches: Dict[str, list] = {}  # topic -> items of the batch being filled
+		self._opened: Dict[str, float] = {}  # topic -> monotonic time of its first item
+		self._ready: deque = deque()  # (topic, items) waiting to be published
+		self._ready_items = 0
+		self._wakeup: Optional[asyncio.Event] = None
+		self._client: Optional[Client] = None
+		self._storage: Optional[_InflightStorage] = None
+
+		self.published = 0
+		self.publishes = 0
+		self.dropped = 0
+
+	@property
+	def connected(self) -> bool:
+		return self._client is not None and self._client.is_connected
+
+	# [ QUEUEING ]
+	async def publish_tag(self, tag: Dict[str, Any]) -> None:
+		device = tag.get('device') or 'unknown'
+		self._add(self.tag_topic.format(prefix=self.topic_prefix, device=device), tag)
+
+	async def publish_event(self, device: str, event_type: str, event_data: Any) -> None:
+		topic = self.event_topic.format(
+			prefix=self.topic_prefix, device=device, event_type=event_type
+		)
+		self._add(topic, {'device': device, 'event_type': event_type, 'event_data': event_data})
+
+	def _add(self, topic: str, item: Any) -> None:
+		batch = self._batches.get(topic)
+		if batch is None:
+			batch = self._batches[topic] = []
+			self._opened[topic] = time.monotonic()
+		batch.append(item)
+		if len(batch) >= self.batch_size:
+			self._seal(topic)
+			if self._wakeup is not None:
+				self._wakeup.set()
+
+	def _seal(self, topic: str) -> None:
+		items = self._batches.pop(topic)
+		self._opened.pop(topic, None)
+		self._ready.append((topic, items))
+		self._ready_items += len(items)
+		while self._ready_items > self.buffer_size and len(self._ready) > 1:
+			_, old = self._ready.popleft()
+			self._ready_items -= len(old)
+			self.dropped += len(old)
+
+	def _seal_expired(self) -> None:
+		now = time.monotonic()
+		for topic, opened in list(self._opened.items()):
+			if now - opened >= self.flush_interval:
+				self._seal(topic)
+
+	# [ CONNECTION ]
+	async def _connect(self) -> None:
+		backoff = 1
+		while True:
+			self._storage = _InflightStorage()
+			client = Client(self.client_id, clean_session=False, persistent_storage=self._storage)
+			client.set_config({'reconnect_retries': UNLIMITED_RECONNECTS, 'reconnect_delay': 2})
+			if self.username:
+				client.set_auth_credentials(self.username, self.password)
+			try:
+				await asyncio.wait_for(
+					client.connect(self.host, self.port, ssl=self.ssl, keepalive=30), timeout=10
+				)
+				self._client = client
+				logging.info(f'[ MQTT ] Connected to {self.host}:{self.port}')
+				return
+			except Exception as e:  # refused, timeout, CONNACK error
+				logging.warning(f'[ MQTT ] Connection to {self.host}:{self.port} failed: {e}')
+				await asyncio.sleep(backoff)
+				backoff = min(backoff * 2, 30)
+
+	async def _send_ready(self) -> None:
+		while self._ready and self.connected:
+			if self.qos and len(self._storage) >= self.max_inflight:
+				self._storage.acked.clear()
+				try:
+					await asyncio.wait_for(self._storage.acked.wait(), timeout=1)
+				except asyncio.TimeoutError:
+					pass
+				continue
+			topic, items = self._ready.popleft()
+			self._ready_items -= len(items)
+			self._client.publish(topic, json.dumps(items, default=str), qos=self.qos)
+			self.publishes += 1
+			self.published += len(items)
+
+	async def run(self) -> None:
+		"""Connect and publish batches until cancelled."""
+		self._wakeup = asyncio.Event()
+		await self._connect()
+		try:
+			while True:
+				try:
+					await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+				except asyncio.TimeoutError:
+					pass
+				self._wakeup.clear()
+				self._seal_expired()
+				await self._send_ready()
+		finally:
+			if self._client is not None:
+				for topic in list(self._batches):
+					self._seal(topic)
+				try:
+					await asyncio.wait_for(self._send_ready(), timeout=5)
+				except asyncio.TimeoutError:
+					logging.warning(f'[ MQTT ] {self._ready_items} items not published on shutdown')
+				await self._client.disconnect()
+
+	def get_stats(self) -> Dict[str, Any]:
+		return {
+			'connected': self.connected,
+			'published': self.published,
+			'publishes': self.publishes,
+			'buffered': self._ready_items + sum(len(batch) for batch in self._batches.values()),
+			'inflight': len(self._storage) if self._storage is not None else 0,
+			'dropped': self.dropped,
+		}
@@ -0,0 +1,2 @@
+from ._main import PrintRun, PrintService
+from .template import ZplTemplate, compile_template
@@ -0,0 +1,243 @@
+"""
+Print jobs for SATO/ZPL printers.
+
+A print job renders one label at a time from a cached template and streams it
+to the printer with flow control: the next label is only sent when the
+printer reports it is ready, and a label is only counted as printed when the
+printer confirms it (``print_success``). When the printer drops the
+connection the job pauses, waits for the reconnect and re-sends the label
+that was not confirmed, so a run resumes where it stopped (at-least-once: a
+label printed right before the disconnect may be printed again).
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from smartx_rfid.devices import DeviceManager
+
+from app.services.jobs import Job, job_manager
+from app.services.rfid import metrics
+from .template import ZplTemplate, compile_template
+
+LABEL_STATUSES = ('pending', 'sent', 'printed', 'error')
+
+
+class PrintRun:
+	"""State of one print job: the template, the label variables and the status of every label."""
+
+	def __init__(self, device: str, template: ZplTemplate, labels: list[Dict[str, Any]]):
+		self.device = device
+		self.template = template
+		self.labels = labels
+		self.status: list[Dict[str, Any]] = [
+			{'index': i, 'status': 'pending', 'attempts': 0, 'error': None}
+			for i in range(len(labels))
+		]
+		self.state = 'waiting'  # waiting, printing, paused (printer offline), finished
+		self.resent = 0
+		self.printed = 0
+		self.started_at: Optional[float] = None
+		self.finished_at: Optional[float] = None
+
+	@property
+	def labels_per_minute(self) -> Optional[float]:
+		if self.started_at is None:
+			return None
+		elapsed = (self.finished_at or time.monotonic()) - self.started_at
+		return round(self.printed * 60 / elapsed, 1) if elapsed > 0 else None
+
+	def get_labels(
+		self, status: Optional[str] = None, offset: int = 0, limit: int = 500
+	) -> Dict[str, Any]:
+		items = self.status if status is None else [s for s in self.status if s['status'] == status]
+		counts = {name: 0 for name in LABEL_STATUSES}
+		for item in self.status:
+			counts[item['status']] += 1
+		return {
+			'device': self.device,
+			'state': self.state,
+			'resent': self.resent,
+			'labels_per_minute': self.labels_per_minute,
+			'counts': counts,
+			'total': len(items),
+			'labels': items[offset : offset + limit],
+		}
+
+
+class PrintService:
+	def __init__(self, devices: DeviceManager, max_runs: int = 20):
+		"""
+		Args:
+		    devices: Device manager that owns the printers.
+		    max_runs: Finished runs kept for the label status API.
+		"""
+		self.devices = devices
+		self.max_runs = max_runs
+		self.runs: 'OrderedDict[str, PrintRun]' = OrderedDict()
+		self._waiters: Dict[str, asyncio.Future] = {}
+
+	def is_busy(self, device: str) -> bool:
+		"""True if a print job is running on *device*."""
+		return any(run.device == device and run.state != 'finished' for run in self.runs.values())
+
+	# [ DEVICE EVENTS ]
+	def on_event(self, name: str, event_type: str, event_data: Any) -> None:
+		"""Resolve the label waiting for a print confirmation on printer *name*."""
+		if event_type not in ('print_success', 'print_error'):
+			return
+		waiter = self._waiters.get(name)
+		if waiter is not None and not waiter.done():
+			waiter.set_result((event_type == 'print_success', event_data))
+
+	# [ FLOW CONTROL ]
+	def _printer(self, device: str):
+		printer = self.devices.get_device(device)
+		if printer is None:
+			raise RuntimeError(f"Device '{device}' not found")
+		return printer
+
+	async def _wait_ready(self, run: PrintRun, poll: float = 0.05) -> None:
+		"""Wait until the printer is connected and ready for the next label."""
+		while True:
+			printer = self._printer(run.device)
+			if getattr(printer, 'is_connected', False) and getattr(printer, 'can_print', True):
+				run.state = 'printing'
+				return
+			if not getattr(printer, 'is_connected', False):
+				if run.state != 'paused':
+					logging.warning(f'[ PRINT ] {run.device} offline, job paused')
+				run.state = 'paused'
+			await asyncio.sleep(poll)
+
+	async def _wait_result(
+		self, run: PrintRun, waiter: asyncio.Future, timeout: float, poll: float = 0.25
+	) -> tuple[Optional[bool], Any]:
+		"""
+		Wait for the printer confirmation.
+
+		Returns:
+		    (True, id) printed, (False, id) printer error, (None, reason) disconnected or timed out
+		"""
+		deadline = time.monotonic() + timeout
+		while True:
+			remaining = deadline - time.monotonic()
+			if remaining <= 0:
+				return None, 'timeout'
+			try:
+				return await asyncio.wait_for(asyncio.shield(waiter), min(poll, remaining))
+			except asyncio.TimeoutError:
+				pass
+			if not getattr(self._printer(run.device), 'is_connected', False):
+				return None, 'disconnected'
+
+	# [ JOB ]
+	def create_job(
+		self,
+		device: str,
+		template: str,
+		labels: list[Dict[str, Any]],
+		label_timeout: float = 30.0,
+		retries: int = 1,
+	) -> Job:
+		"""
+		Validate and start a print job.
+
+		Args:
+		    device: Printer name.
+		    template: ZPL template with ``{variable}`` placeholders.
+		    labels: Variables for each label, in print order.
+		    label_timeout: Seconds to wait for a confirmation before re-sending a label.
+		    retries: Extra attempts for a label after a printer error or timeout.
+
+		Returns:
+		    The submitted Job (poll it through the jobs API)
+
+		Raises:
+		    ValueError: Unknown printer, printer busy, invalid template or missing variables.
+		"""
+		printer = self.devices.get_device(device)
+		if printer is None or getattr(printer, 'device_type', '').lower() != 'printer':
+			raise ValueError(f"Device '{device}' not found or not a printer")
+		if self.is_busy(device):
+			raise ValueError(f"A print job is already running on '{device}'")
+		compiled = compile_template(template)
+		for index, values in enumerate(labels):
+			missing = compiled.missing(values)
+			if missing:
+				raise ValueError(f'Label {index} is missing variables: {sorted(missing)}')
+
+		run = PrintRun(device=device, template=compiled, labels=labels)
+		job = job_manager.submit(
+			kind='print',
+			total=len(labels),
+			params={'device': device, 'label_timeout': label_timeout, 'retries': retries},
+			runner=lambda job: self.run_job(job, run, label_timeout=label_timeout, retries=retries),
+		)
+		self.runs[job.id] = run
+		while len(self.runs) > self.max_runs:
+			self.runs.popitem(last=False)
+		return job
+
+	async def run_job(
+		self, job: Job, run: PrintRun, label_timeout: float = 30.0, retries: int = 1
+	) -> None:
+		"""
+		Print every label of *run*, updating *job* as labels are confirmed.
+
+		Args:
+		    job: Job used for progress, rate (labels per second) and errors.
+		    run: Labels to print.
+		    label_timeout: Seconds to wait for a confirmation before re-sending the label.
+		    retries: Extra attempts for a label after a printer error or timeout.
+		"""
+		job.add_device(run.device, len(run.labels))
+		loop = asyncio.get_running_loop()
+		run.started_at = time.monotonic()
+
+		try:
+			for index, values in enumerate(run.labels):
+				label = run.status[index]
+				zpl = run.template.render(values)
+				while True:
+					await self._wait_ready(run)
+					waiter = loop.create_future()
+					self._waiters[run.device] = waiter
+					success, zpl_id = self.devices.print(run.device, zpl)
+					if not success:
+						await asyncio.sleep(0.1)  # printer became busy or offline; wait again
+						continue
+
+					label['status'] = 'sent'
+					label['attempts'] += 1
+					printed, detail = await self._wait_result(run, waiter, label_timeout)
+					if printed:
+						label['status'] = 'printed'
+						label['error'] = None
+						run.printed += 1
+						job.record(run.device, index, True)
+						metrics.LABELS_PRINTED.labels(device=run.device, result='printed').inc()
+						break
+					if detail == 'disconnected':
+						# resume: send the unconfirmed label again after the reconnect
+						label['status'] = 'pending'
+						run.resent += 1
+						continue
+					label['error'] = 'printer error' if printed is False else str(detail)
+					if label['attempts'] > retries:
+						label['status'] = 'error'
+						job.record(run.device, index, False, label['error'])
+						metrics.LABELS_PRINTED.labels(device=run.device, result='error').inc()
+						break
+					label['status'] = 'pending'
+					run.resent += 1
+		finally:
+			self._waiters.pop(run.device, None)
+			run.state = 'finished'
+			run.finished_at = time.monotonic()
+			logging.info(
+				f'[ PRINT ] {run.device} job {job.id}: {run.printed}/{len(run.labels)} printed, '
+				f'{run.labels_per_minute} labels/min'
+			)
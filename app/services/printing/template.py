@@ -0,0 +1,55 @@
+"""
+ZPL templates with per-label variables.
+
+Templates use ``{name}`` placeholders (the same format as
+``params_zpl_example``). A template is parsed once into static chunks and
+variable names; rendering a label only joins the cached chunks with the label
+values, so a 5,000 label run does not re-parse the ZPL for every label.
+"""
+
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Mapping
+
+
+class ZplTemplate:
+	def __init__(self, source: str):
+		"""
+		Args:
+		    source: ZPL with ``{variable}`` placeholders (use ``{{`` / ``}}`` for literal braces).
+
+		Raises:
+		    ValueError: If the template has format specs, conversions or positional fields.
+		"""
+		self.source = source
+		self._chunks: list[str] = []
+		self._fields: list[str] = []
+		text = ''  # escaped braces split the literal text in several parts
+		for literal, field, spec, conversion in Formatter().parse(source):
+			text += literal
+			if field is None:
+				continue
+			if not field or field.isdigit() or spec or conversion:
+				raise ValueError(f'Unsupported placeholder {{{field}}} in ZPL template')
+			self._chunks.append(text)
+			self._fields.append(field)
+			text = ''
+		self._chunks.append(text)
+		self.variables: frozenset[str] = frozenset(self._fields)
+
+	def missing(self, values: Mapping[str, Any]) -> set[str]:
+		"""Variables of the template that are not in *values*."""
+		return set(self.variables - values.keys())
+
+	def render(self, values: Mapping[str, Any]) -> str:
+		parts = [self._chunks[0]]
+		for field, chunk in zip(self._fields, self._chunks[1:]):
+			parts.append(str(values[field]))
+			parts.append(chunk)
+		return ''.join(parts)
+
+
+@lru_cache(maxsize=32)
+def compile_template(source: str) -> ZplTemplate:
+	"""Return the parsed template for *source*, reusing it across jobs."""
+	return ZplTemplate(source)
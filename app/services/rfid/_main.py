@@ -2,16 +2,45 @@ import logging
 from smartx_rfid.devices import DeviceManager
 from smartx_rfid.utils import TagList
 from .integration import Integration
-from app.core import settings
+from app.core import CAPTURES_PATH, STATE_PATH, settings
 from .controller import Controller
+from app.services.printing import PrintService
+from .snapshot import TagSnapshot
+from .recorder import TrafficRecorder
+from .line_ingest import LineIngestServer
+from .tag_filter import TagFilter
+from .product_master import ProductMaster
+from app.services.mqtt import MqttIngest
+from app.services.diagnostics import admission_controller
+from . import metrics
+
+
+def _r700_tag(tag_data: dict, epc, ant, rssi) -> dict:
+	return {'epc': epc, 'tid': tag_data.get('tidHex'), 'ant': ant, 'rssi': rssi}
 
 
 class RfidManager:
 	def __init__(self, devices_path: str, example_path: str = ''):
 		logging.info('Initializing RfidManager')
 
-		# TAGS
-		self.tags = TagList(unique_identifier='tid', prefix=settings.TAG_PREFIX)
+		# TAGS (TAG_PREFIX is applied by the pre-ingest filter, before TagList.add)
+		self.tags = TagList(unique_identifier='tid')
+		try:
+			self.tag_filter = TagFilter.from_settings(
+				settings.TAG_FILTER, tag_prefix=settings.TAG_PREFIX
+			)
+		except (TypeError, ValueError) as e:
+			logging.error(f'Error compiling TAG_FILTER, only TAG_PREFIX is applied: {e}')
+			self.tag_filter = TagFilter.from_settings(None, tag_prefix=settings.TAG_PREFIX)
+
+		# PRODUCT MASTER (tag enrichment, index loaded by the watch_product_master task)
+		self.product_master: ProductMaster | None = None
+		if settings.PRODUCT_MASTER_PATH is not None:
+			self.product_master = ProductMaster(
+				source=settings.PRODUCT_MASTER_PATH,
+				index_dir=STATE_PATH,
+				table=settings.PRODUCT_MASTER_TABLE,
+			)
 
 		# connect to devices
 		self.devices = DeviceManager(
@@ -21,27 +50,98 @@ class RfidManager:
 		# INTEGRATION
 		self.integration = Integration()
 
+		# PRINT JOBS
+		self.printing = PrintService(devices=self.devices)
+
 		# CONTROLLER
 		self.controller = Controller(
 			devices=self.devices, tags=self.tags, integration=self.integration
 		)
 
+		# WARM RESTART (tags read before the restart are not reported as new again)
+		self.snapshot = TagSnapshot(
+			path=STATE_PATH, tags=self.tags, write_list=self.controller.write_list
+		)
+		if settings.TAG_SNAPSHOT_INTERVAL is not None:
+			max_age = settings.CLEAR_OLD_TAGS_INTERVAL
+			self.snapshot.restore(max_age=max_age if max_age and max_age > 0 else None)
+
+		# TRAFFIC CAPTURE (off until started from the API)
+		self.recorder = TrafficRecorder(
+			path=CAPTURES_PATH,
+			segment_bytes=settings.RECORDER_SEGMENT_MB * 1024 * 1024,
+			segment_seconds=settings.RECORDER_SEGMENT_SECONDS,
+			max_segments=settings.RECORDER_MAX_SEGMENTS,
+		)
+
+		# MQTT INGEST (readers publishing to a broker)
+		self.mqtt_ingest: MqttIngest | None = None
+		if settings.MQTT_INGEST_URL is not None and settings.MQTT_INGEST_TOPICS:
+			try:
+				self.mqtt_ingest = MqttIngest(
+					url=settings.MQTT_INGEST_URL,
+					subscriptions=settings.MQTT_INGEST_TOPICS,
+					manager=self,
+				)
+			except (TypeError, ValueError) as e:
+				logging.error(f'Error setting up MQTT ingest: {e}')
+
+		# LINE-PROTOCOL INGEST (raw TCP/UDP push sources)
+		self.line_ingest = LineIngestServer(
+			manager=self,
+			host=settings.LINE_INGEST_HOST,
+			tcp_port=settings.LINE_INGEST_TCP_PORT,
+			udp_port=settings.LINE_INGEST_UDP_PORT,
+		)
+
+		# METRICS (read at scrape time)
+		metrics.TAGLIST_SIZE.set_function(lambda: len(self.tags))
+		metrics.dispatcher_collector.source = lambda: self.controller.dispatcher
+		metrics.dispatcher_collector.index_source = lambda: self.controller.dispatch_index
+		metrics.line_ingest_collector.source = lambda: self.line_ingest
+		metrics.tag_filter_collector.source = lambda: self.tag_filter
+
+		# ADMISSION (read/ui requests are shed while tag work is backed up)
+		admission_controller.queue_source = lambda: self.controller.lanes.queued('tag')
+
 		logging.info(f"{'='*20} RfidManager initialized {'='*20}")
 
+	def single_process_features(self) -> list[str]:
+		"""Enabled features that every server worker would run again (see app.core.server)."""
+		features = []
+		if self.devices.get_devices():
+			features.append('devices')
+		if self.line_ingest.enabled:
+			features.append('line ingest')
+		if self.mqtt_ingest is not None:
+			features.append('MQTT ingest')
+		if settings.TAG_SNAPSHOT_INTERVAL is not None:
+			features.append('tag snapshots')
+		return features
+
 	def handle_r700_event(self, events: list):
+		tag_filter = self.tag_filter
+		recorder = self.recorder
 		for event in events:
 			event_type = event.get('eventType')
 			device = event.get('hostname', 'unknown')
 			if event_type == 'tagInventory':
 				tag_data = event.get('tagInventoryEvent')
 				if tag_data is not None:
-					current_tag = {
-						'epc': tag_data.get('epcHex'),
-						'tid': tag_data.get('tidHex'),
-						'ant': tag_data.get('antennaPort'),
-						'rssi': int(tag_data.get('peakRssiCdbm', 0) / 100),
-					}
-					self.on_tag(name=device, tag_data=current_tag)
+					epc = tag_data.get('epcHex')
+					ant = tag_data.get('antennaPort')
+					rssi = int(tag_data.get('peakRssiCdbm', 0) / 100)
+					current_tag = None
+					if recorder.active:
+						# captured before the filter: a capture holds every read received
+						current_tag = _r700_tag(tag_data, epc, ant, rssi)
+						recorder.record(device, 'tag', current_tag)
+					# otherwise filtered before the tag dict is built
+					if tag_filter is not None and not tag_filter.accepts(device, epc, ant, rssi):
+						continue
+					if current_tag is None:
+						current_tag = _r700_tag(tag_data, epc, ant, rssi)
+					self._add_tag(name=device, tag_data=current_tag)
 			elif event_type == 'inventoryStatus':
 				event_data = event.get('inventoryStatusEvent')
 				if event_data is not None:
@@ -56,7 +156,13 @@ class RfidManager:
 		if event_type == 'tag':
 			self.on_tag(name=name, tag_data=event_data)
 		else:
-			if event_type == 'reading':
+			if self.recorder.active:
+				self.recorder.record(name, event_type, event_data)
+			if event_type == 'connection':
+				metrics.observe_connection(device=name, connected=bool(event_data))
+			elif event_type in ('print_success', 'print_error'):
+				self.printing.on_event(name=name, event_type=event_type, event_data=event_data)
+			elif event_type == 'reading':
 				self.controller.on_start(name=name) if event_data else self.controller.on_stop(
 					name=name
 				)
@@ -64,7 +170,21 @@ class RfidManager:
 			self.controller.on_event(name=name, event_type=event_type, event_data=event_data)
 
 	def on_tag(self, name: str, tag_data: dict):
+		if self.recorder.active:
+			self.recorder.record(name, 'tag', tag_data)
+		tag_filter = self.tag_filter
+		if tag_filter is not None and not tag_filter.accepts(
+			name, tag_data.get('epc'), tag_data.get('ant'), tag_data.get('rssi')
+		):
+			return False, None
+		return self._add_tag(name=name, tag_data=tag_data)
+
+	def _add_tag(self, name: str, tag_data: dict):
 		new_tag, tag = self.tags.add(tag_data, device=name)
+		if tag is not None and self.product_master is not None:
+			self.product_master.enrich(tag)
+		if tag is not None:
+			metrics.observe_tag(device=name, antenna=tag_data.get('ant'), new_tag=new_tag)
 
 		# NEW TAG
 		if new_tag:
@@ -79,7 +199,7 @@ class RfidManager:
 	def on_xscan_event(self, device_name: str, event_type: str, event_data):
 		# inventory event with tags
 		logging.info(
-			f'Received X-SCAN event from device {device_name}: {event_type} - {event_data}'
+			'Received X-SCAN event from device %s: %s - %s', device_name, event_type, event_data
 		)
 		if event_type == 'inventory':
 			for tag in event_data.get('tags', []):
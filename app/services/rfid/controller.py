@@ -8,11 +8,15 @@ from smartx_rfid.utils import TagList
 from smartx_rfid.dispatcher import EventDispatcher
 from app.core import DISPATCHER_PATH, EXAMPLES_DISPATCHER_PATH
 from .integration import Integration
-import asyncio
+from .dispatch_index import DispatchIndex
+from .sql_dispatch import SqlBatchDispatcher
+from .write_scheduler import WriteScheduler
+from .write_rules import build_transform
+from .lanes import CONTROL, LANES, TAG, PriorityLanes
+from . import metrics
 from app.core import settings
 import logging
 from app.services.license import license_manager
-from smartx_rfid.schemas.tag import WriteTagValidator
 
 
 class Controller:
@@ -23,21 +27,55 @@ class Controller:
 		self.dispatcher = EventDispatcher(
 			dispatches_path=DISPATCHER_PATH,
 			example_path=EXAMPLES_DISPATCHER_PATH,
+			sql=SqlBatchDispatcher(
+				batch_size=settings.SQL_BATCH_SIZE,
+				flush_interval_seconds=settings.SQL_FLUSH_INTERVAL,
+			),
+		)
+		self.dispatch_index = DispatchIndex(self.dispatcher)
+		self.lanes = PriorityLanes(
+			tag_concurrency=settings.TAG_LANE_LIMIT,
+			control_concurrency=settings.CONTROL_LANE_LIMIT,
+			tag_queue_limit=settings.TAG_LANE_QUEUE_LIMIT,
 		)
+		for lane in LANES:
+			metrics.LANE_QUEUED.labels(lane=lane).set_function(
+				lambda lane=lane: self.lanes.queued(lane)
+			)
 		self.write_list: dict = {}
+		self.write_scheduler = WriteScheduler(
+			devices=devices,
+			write_list=self.write_list,
+			on_confirmed=self.remove_from_write_list,
+			concurrency=settings.WRITE_CONCURRENCY_PER_DEVICE,
+			batch_size=settings.WRITE_BATCH_SIZE,
+			retry_interval=settings.WRITE_RETRY_INTERVAL,
+		)
 
 	# [ EVENTS ]
 	def on_event(self, name: str, event_type: str, event_data):
-		logging.info(f'[ EVENT ] {name} - {event_type}: {event_data}')
+		logging.info('[ EVENT ] %s - %s: %s', name, event_type, event_data)
 		if not license_manager.validate_license():
 			return
-		asyncio.create_task(
+		self.lanes.submit(
+			CONTROL,
+			name,
 			self.integration.on_event_integration(
 				name=name, event_type=event_type, event_data=event_data
-			)
+			),
 		)
-		asyncio.create_task(
-			self.dispatcher.add_async(name=name, event_type=event_type, data=event_data)
+		self.dispatch(name=name, event_type=event_type, data=event_data)
+
+	def dispatch(self, name: str, event_type: str, data):
+		if not self.dispatch_index.wants(event_type):
+			return
+		self.lanes.submit(
+			TAG if event_type == 'tag' else CONTROL,
+			name,
+			metrics.timed(
+				'dispatcher', self.dispatcher.add_async(name=name, event_type=event_type, data=data)
+			),
+			kind='dispatcher',
 		)
 
 	# [ Reading Events ]
@@ -45,6 +83,8 @@ class Controller:
 		logging.info(f'[ START ] {name}')
 		if not license_manager.validate_license():
 			return
+		# hand off the reads of the previous session before the start event and the clear
+		self.lanes.release(name)
 		self.tags.remove_tags_by_device(device=name)
 
 	def on_stop(self, name: str):
@@ -52,19 +92,19 @@ class Controller:
 
 	# [ Tag Events ]
 	def on_new_tag(self, name: str, tag: dict):
-		logging.info(f'[ TAG ] {name} - {tag}')
+		logging.info('[ TAG ] %s - %s', name, tag)
 		if not license_manager.validate_license():
 			return
-		asyncio.create_task(self.integration.on_tag_integration(tag=tag))
-		asyncio.create_task(self.dispatcher.add_async(name=name, event_type='tag', data=tag))
+		metrics.create_tracked_task('integration', self.integration.on_tag_integration(tag=tag))
+		self.dispatch(name=name, event_type='tag', data=tag)
 
 	def on_existing_tag(self, name: str, tag: dict):
-		asyncio.create_task(self.check_target(tag))
+		self.write_scheduler.on_tag(device=name, tag=tag)
 		if settings.ALWAYS_SEND:
 			if not license_manager.validate_license():
 				return
-			asyncio.create_task(self.integration.on_tag_integration(tag=tag))
-			asyncio.create_task(self.dispatcher.add_async(name=name, event_type='tag', data=tag))
+			metrics.create_tracked_task('integration', self.integration.on_tag_integration(tag=tag))
+			self.dispatch(name=name, event_type='tag', data=tag)
 
 	# [ WRITE LIST ]
 	def create_write_list_prefix(self, epcs: list, prefix: str):
@@ -77,19 +117,110 @@ class Controller:
 				logging.error(f'Epc: {epc} not in tags, skipping...')
 		return self.write_list
 
+	def create_write_list(
+		self,
+		rule: dict,
+		epcs: list[str] | None = None,
+		selector: dict | None = None,
+		replace: bool = False,
+	) -> dict:
+		"""
+		Add many tags to the write list at once.
+
+		Tags are resolved against one snapshot of the tag list, targets are computed with
+		a transform rule and a single 'write_list_created' event is emitted.
+
+		Args:
+		    rule: Transform rule (see write_rules.build_transform)
+		    epcs: EPCs to add (alternative to selector)
+		    selector: Dict with optional 'device', 'gtin' and EPC 'prefix' filters
+		    replace: Clear the current write list first
+
+		Returns:
+		    dict with 'created', 'not_found', 'errors', 'write_list_size' and 'targets'
+		"""
+		transform = build_transform(rule)
+		snapshot = self.tags.get_all()
+		not_found: list[str] = []
+
+		if epcs is not None:
+			by_epc = {str(tag.get('epc')).lower(): tag for tag in snapshot}
+			matched = []
+			for epc in epcs:
+				tag = by_epc.get(epc.lower())
+				if tag is None:
+					not_found.append(epc)
+				else:
+					matched.append(tag)
+		else:
+			selector = selector or {}
+			device, gtin = selector.get('device'), selector.get('gtin')
+			prefix = (selector.get('prefix') or '').lower()
+			matched = [
+				tag
+				for tag in snapshot
+				if (device is None or tag.get('device') == device)
+				and (gtin is None or tag.get('gtin') == gtin)
+				and str(tag.get('epc')).lower().startswith(prefix)
+			]
+
+		targets: dict[str, str] = {}
+		errors: list[dict] = []
+		for index, tag in enumerate(matched):
+			tid, epc = tag.get('tid'), tag.get('epc')
+			if not tid:
+				errors.append({'epc': epc, 'error': 'Tag has no TID'})
+				continue
+			try:
+				targets[tid] = transform(str(epc), index)
+			except Exception as e:
+				errors.append({'epc': epc, 'error': str(e)})
+
+		if replace:
+			self.write_list.clear()
+			self.write_scheduler.discard()
+		self.write_list.update({tid: {'target': target} for tid, target in targets.items()})
+		for tag in matched:
+			target = targets.get(tag.get('tid'))
+			if target is not None:
+				tag['target'] = target
+
+		summary = {
+			'created': len(targets),
+			'not_found': not_found,
+			'errors': errors,
+			'write_list_size': len(self.write_list),
+		}
+		logging.info(
+			f'Write list created: {len(targets)} tags, {len(not_found)} not found, '
+			f'{len(errors)} errors (rule={rule.get("type")})'
+		)
+		self.on_event(
+			name='write_list',
+			event_type='write_list_created',
+			event_data={
+				**summary,
+				'not_found': len(not_found),
+				'errors': len(errors),
+				'rule': rule,
+			},
+		)
+		return {**summary, 'targets': targets}
+
 	def add_to_write_list(self, tag: dict, target: str):
 		self.write_list[tag.get('tid')] = {
 			'target': target,
 		}
 		tag['target'] = target
-		logging.info(f"Added tag {tag.get('tid')} to write list with target {target}")
+		logging.info('Added tag %s to write list with target %s', tag.get('tid'), target)
 		self.on_event(name='write_list', event_type='add_to_write_list', event_data=tag)
 
 	def remove_from_write_list(self, tag: dict):
 		tid = tag.get('tid')
 		if tid in self.write_list:
 			del self.write_list[tid]
-			logging.info(f'Removed tag {tid} from write list')
+			self.write_scheduler.discard(tid)
+			logging.info('Removed tag %s from write list', tid)
 			self.on_event(name='write_list', event_type='remove_from_write_list', event_data=tag)
 			if not self.write_list:
 				logging.info('Write list is now empty')
@@ -99,24 +230,6 @@ class Controller:
 
 	def clear_write_list(self):
 		self.write_list.clear()
+		self.write_scheduler.discard()
 		logging.info('Cleared write list')
 		self.on_event(name='write_list', event_type='write_list_cleared', event_data={})
-
-	async def check_target(self, tag: dict):
-		target = tag.get('target')
-		if not target:
-			return
-		if tag.get('epc') == tag.get('target'):
-			logging.info(f"Tag {tag.get('tid')} already has target EPC, removing from write list")
-			tag['target'] = None
-			self.remove_from_write_list(tag)
-			return
-		await self.devices.write_epc(
-			device_name=tag.get('device'),
-			write_tag=WriteTagValidator(
-				target_identifier='tid',
-				target_value=tag.get('tid'),
-				new_epc=tag.get('target'),
-				password='00000000',
-			),
-		)
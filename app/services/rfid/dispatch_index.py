@@ -0,0 +1,48 @@
+"""
+Event-type index in front of the EventDispatcher.
+
+EventDispatcher compiles every dispatch file (filters and templates become
+callables) and routes each event through a per-``on_event`` table, but only
+after the event was queued: every tag still costs a task, a queue slot and a
+worker pass, even when no dispatch listens to ``tag``. The index reads the
+compiled plans once per reload and lets the Controller skip events no dispatch
+can match before any of that work is done.
+"""
+
+from smartx_rfid.dispatcher import EventDispatcher
+
+
+class DispatchIndex:
+	def __init__(self, dispatcher: EventDispatcher):
+		self.dispatcher = dispatcher
+		self.skipped = 0
+		self._compiled = None
+		self._event_types: frozenset[str] = frozenset()
+		self._catch_all = False
+
+	def _build(self, compiled: list) -> None:
+		self._compiled = compiled
+		self._event_types = frozenset(
+			plan.event_type_static for plan in compiled if plan.event_type_static is not None
+		)
+		# a dynamic on_event (a placeholder or empty) can match any event type
+		self._catch_all = any(plan.event_type_static is None for plan in compiled)
+
+	def wants(self, event_type: str) -> bool:
+		"""False if no loaded dispatch can match *event_type*."""
+		if not self.dispatcher._started:
+			return True  # the first event starts the dispatcher and loads the dispatch files
+		compiled = self.dispatcher._compiled
+		if compiled is not self._compiled:  # replaced on every reload_dispatches()
+			self._build(compiled)
+		if self._catch_all or event_type in self._event_types:
+			return True
+		self.skipped += 1
+		return False
+
+	def get_stats(self) -> dict:
+		return {
+			'indexed_event_types': sorted(self._event_types),
+			'catch_all': self._catch_all,
+			'events_skipped': self.skipped,
+		}
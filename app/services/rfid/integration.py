@@ -10,6 +10,8 @@ from typing import Any
 
 from app.models import Base
 from app.services.license import license_manager
+from app.services.mqtt import MqttPublisher
+from . import metrics
 
 
 class Integration:
@@ -17,20 +19,31 @@ class Integration:
 		self.db_manager: DatabaseManager | None = None
 		self.webhook_manager: WebhookManager | None = None
 		self.webhook_xtrack: WebhookXtrack | None = None
+		self.mqtt_publisher: MqttPublisher | None = None
 		self.indicator: Indicator | None = Indicator() if settings.BEEP else None
 		self.setup_integration()
 
-	async def _run_integration_tasks(self, context: str, tasks: list):
-		"""Run integration tasks without letting one failure abort the others."""
+	async def _run_integration_tasks(self, context: str, tasks: dict):
+		"""
+		Run integration tasks without letting one failure abort the others.
+
+		Args:
+		    context: Log prefix (a constant, so the rate limits match it)
+		    tasks: Awaitables keyed by integration target (used as the latency metric label)
+		"""
 		if not tasks or not license_manager.validate_license():
 			return
 
-		logging.info(f'[{context}] Executing {len(tasks)} tasks concurrently')
-		results = await asyncio.gather(*tasks, return_exceptions=True)
+		logging.info(context + ' Executing %d tasks concurrently', len(tasks))
+		results = await asyncio.gather(
+			*(metrics.timed(target, task) for target, task in tasks.items()),
+			return_exceptions=True,
+		)
 		for result in results:
 			if isinstance(result, Exception):
 				logging.error(
-					f'[{context}] Task failed: {result}',
+					context + ' Task failed: %s',
+					result,
 					exc_info=(type(result), result, result.__traceback__),
 				)
 
@@ -39,6 +52,7 @@ class Integration:
 		self.load_database()
 		self.load_webhook()
 		self.load_webhook_xtrack()
+		self.load_mqtt()
 
 	def load_database(self):
 		self.db_manager = None
@@ -86,6 +100,27 @@ class Integration:
 			logging.error(f'Error setting up Webhook Xtrack Integration: {e}')
 			return False
 
+	def load_mqtt(self):
+		self.mqtt_publisher = None
+		try:
+			if settings.MQTT_URL is not None:
+				logging.info('Setting up MQTT Integration')
+				self.mqtt_publisher = MqttPublisher(
+					url=settings.MQTT_URL,
+					topic_prefix=settings.MQTT_TOPIC_PREFIX,
+					qos=settings.MQTT_QOS,
+					batch_size=settings.MQTT_BATCH_SIZE,
+					max_inflight=settings.MQTT_MAX_INFLIGHT,
+					buffer_size=settings.MQTT_BUFFER_SIZE,
+				)
+				return True
+			else:
+				logging.warning('MQTT_URL not set. Skipping MQTT Integration setup.')
+				return False
+		except Exception as e:
+			logging.error(f'Error setting up MQTT Integration: {e}')
+			return False
+
 	# [ EVENT ]
 	async def on_event_integration(self, name: str, event_type: str, event_data: Any):
 		"""
@@ -96,30 +131,32 @@ class Integration:
 		    event_type: Type of event
 		    event_data: Data of the event
 		"""
-		tasks = []
+		tasks = {}
 
 		# DATABASE INTEGRATION
 		if self.db_manager is not None:
 			logging.info('[ EVENT INTEGRATION ] DATABASE')
-			tasks.append(
-				asyncio.to_thread(
-					self._event_database_integration,
-					name=name,
-					event_type=event_type,
-					event_data=event_data,
-				)
+			tasks['database'] = asyncio.to_thread(
+				self._event_database_integration,
+				name=name,
+				event_type=event_type,
+				event_data=event_data,
 			)
 
 		# WEBHOOK INTEGRATION
 		if self.webhook_manager is not None:
 			logging.info('[ EVENT INTEGRATION ] WEBHOOK')
-			tasks.append(
-				self.webhook_manager.post_event(
-					device=name, event_type=event_type, event_data=event_data
-				)
+			tasks['webhook'] = self.webhook_manager.post_event(
+				device=name, event_type=event_type, event_data=event_data
 			)
 
-		await self._run_integration_tasks('EVENT INTEGRATION', tasks)
+		# MQTT INTEGRATION (queued, published in batches by the MQTT task)
+		if self.mqtt_publisher is not None:
+			tasks['mqtt'] = self.mqtt_publisher.publish_event(
+				device=name, event_type=event_type, event_data=event_data
+			)
+
+		await self._run_integration_tasks('[ EVENT INTEGRATION ]', tasks)
 
 	def _event_database_integration(self, name: str, event_type: str, event_data: dict):
 		"""Save event to database."""
@@ -142,33 +179,35 @@ class Integration:
 		    device: Device name
 		    tag_data: Data of the read tag
 		"""
-		tasks = []
+		tasks = {}
 
 		# DATABASE INTEGRATION
 		if self.db_manager is not None:
 			logging.info('[ TAG INTEGRATION ] DATABASE')
-			tasks.append(asyncio.to_thread(self._tag_database_integration, data=tag))
+			tasks['database'] = asyncio.to_thread(self._tag_database_integration, data=tag)
 
 		# WEBHOOK INTEGRATION
 		if self.webhook_manager is not None:
 			logging.info('[ TAG INTEGRATION ] WEBHOOK')
-			tasks.append(
-				self.webhook_manager.post_event(
-					device=tag.get('device'), event_type='tag', event_data=tag
-				)
+			tasks['webhook'] = self.webhook_manager.post_event(
+				device=tag.get('device'), event_type='tag', event_data=tag
 			)
 
 		# XTRACK INTEGRATION
 		if self.webhook_xtrack is not None:
 			logging.info('[ TAG INTEGRATION ] XTRACK')
-			tasks.append(self.webhook_xtrack.post(tag))
+			tasks['xtrack'] = self.webhook_xtrack.post(tag)
+
+		# MQTT INTEGRATION (queued, published in batches by the MQTT task)
+		if self.mqtt_publisher is not None:
+			tasks['mqtt'] = self.mqtt_publisher.publish_tag(tag)
 
 		# Beep
 		if settings.BEEP and self.indicator is not None:
 			logging.info('[ TAG INTEGRATION ] BEEP')
-			tasks.append(self.indicator.beep())
+			tasks['beep'] = self.indicator.beep()
 
-		await self._run_integration_tasks('TAG INTEGRATION', tasks)
+		await self._run_integration_tasks('[ TAG INTEGRATION ]', tasks)
 
 	def _tag_database_integration(self, data: dict):
 		"""Save tag to database."""
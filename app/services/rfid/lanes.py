@@ -0,0 +1,177 @@
+"""
+Priority lanes for the work the pipeline starts per tag read and device event.
+
+Integration calls and dispatches used to be started as soon as they were
+created, so the integration/dispatch work of a device event (reading start or
+stop, connection, GPI-triggered reads) landed behind thousands of tag tasks
+during a burst. Work now goes through two lanes:
+
+- ``control``: device events. Items of one device run one at a time in
+  submission order (a stop never overtakes its start); different devices run
+  concurrently up to ``control_concurrency``.
+- ``tag``: tag read dispatches, started in submission order (so per device as
+  well) with at most ``tag_concurrency`` running, and only while no control
+  item is waiting to start. At most ``tag_queue_limit`` items wait; newer
+  items are dropped (and counted) past that.
+
+Only quick work belongs in the tag lane: one slow item holds a slot that every
+device's reads share. When a device starts a new reading, ``release`` starts
+its queued tag items right away so they are handed off before the start is
+handled, instead of being reported after the tags were cleared.
+
+Items are coroutines and start as tasks once their lane lets them. The time
+each item spent queued is recorded per lane (``rfid_lane_wait_seconds``).
+Coroutines still queued at shutdown are closed by ``close``.
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Any, Coroutine, Deque, Dict
+
+from . import metrics
+
+CONTROL = 'control'
+TAG = 'tag'
+LANES = (CONTROL, TAG)
+
+
+class PriorityLanes:
+	def __init__(
+		self,
+		tag_concurrency: int = 64,
+		control_concurrency: int = 16,
+		tag_queue_limit: int = 10_000,
+	):
+		"""
+		Args:
+		    tag_concurrency: Tag items running at the same time.
+		    control_concurrency: Control items running at the same time (one per device).
+		    tag_queue_limit: Tag items waiting to start; newer ones are dropped past it.
+		"""
+		self.limits = {CONTROL: control_concurrency, TAG: tag_concurrency}
+		self.tag_queue_limit = tag_queue_limit
+		self.running = dict.fromkeys(LANES, 0)
+		self.started = dict.fromkeys(LANES, 0)
+		self.dropped = dict.fromkeys(LANES, 0)
+		self.max_wait = dict.fromkeys(LANES, 0.0)
+
+		# control: per-device FIFOs, devices with queued work in round-robin order
+		self._control_queues: Dict[str, Deque[tuple]] = {}
+		self._control_ready: Deque[str] = deque()
+		self._control_busy: set[str] = set()
+		self._control_queued = 0
+		self._tag_queue: Deque[tuple] = deque()
+
+	def submit(self, lane: str, device: str, coro: Coroutine, kind: str = 'integration') -> None:
+		"""
+		Queue a coroutine in a lane and start whatever the lanes allow.
+
+		Args:
+		    lane: ``control`` or ``tag``.
+		    device: Device the work belongs to (ordering key).
+		    coro: Work to run.
+		    kind: ``rfid_pending_tasks`` label of the task running it.
+		"""
+		item = (device, coro, kind, time.perf_counter())
+		if lane == CONTROL:
+			queue = self._control_queues.get(device)
+			if queue is None:
+				queue = self._control_queues[device] = deque()
+				if device not in self._control_busy:
+					self._control_ready.append(device)
+			queue.append(item)
+			self._control_queued += 1
+		else:
+			if len(self._tag_queue) >= self.tag_queue_limit:
+				coro.close()
+				self.dropped[TAG] += 1
+				if self.dropped[TAG] == 1 or self.dropped[TAG] % 1000 == 0:
+					logging.warning(
+						f'[ LANES ] Tag queue full ({self.tag_queue_limit}), '
+						f'{self.dropped[TAG]} tag items dropped'
+					)
+				return
+			self._tag_queue.append(item)
+		self._pump()
+
+	def queued(self, lane: str) -> int:
+		return self._control_queued if lane == CONTROL else len(self._tag_queue)
+
+	def release(self, device: str) -> int:
+		"""
+		Start the queued tag items of a device now, ignoring the tag limit.
+
+		Args:
+		    device: Device whose tag items are started.
+
+		Returns:
+		    int: Items started.
+		"""
+		items = [item for item in self._tag_queue if item[0] == device]
+		if not items:
+			return 0
+		self._tag_queue = deque(item for item in self._tag_queue if item[0] != device)
+		for item in items:
+			self._start(TAG, item)
+		return len(items)
+
+	def close(self) -> None:
+		"""Close the coroutines that are still queued (shutdown)."""
+		for queue in (*self._control_queues.values(), self._tag_queue):
+			for _, coro, _, _ in queue:
+				coro.close()
+		self._control_queues.clear()
+		self._control_ready.clear()
+		self._control_queued = 0
+		self._tag_queue.clear()
+
+	# [ SCHEDULING ]
+	def _pump(self) -> None:
+		while self._control_ready and self.running[CONTROL] < self.limits[CONTROL]:
+			device = self._control_ready.popleft()
+			queue = self._control_queues[device]
+			item = queue.popleft()
+			if not queue:
+				del self._control_queues[device]
+			self._control_queued -= 1
+			self._control_busy.add(device)
+			self._start(CONTROL, item)
+		if self._control_ready:
+			return  # tag work waits for every startable control item
+		while self._tag_queue and self.running[TAG] < self.limits[TAG]:
+			self._start(TAG, self._tag_queue.popleft())
+
+	def _start(self, lane: str, item: tuple) -> None:
+		device, coro, kind, queued_at = item
+		wait = time.perf_counter() - queued_at
+		metrics.observe_lane_wait(lane, wait)
+		if wait > self.max_wait[lane]:
+			self.max_wait[lane] = wait
+		self.running[lane] += 1
+		self.started[lane] += 1
+		task = metrics.create_tracked_task(kind, coro)
+		task.add_done_callback(lambda task: self._done(lane, device, task))
+
+	def _done(self, lane: str, device: str, task) -> None:
+		self.running[lane] -= 1
+		if lane == CONTROL:
+			self._control_busy.discard(device)
+			if device in self._control_queues:
+				self._control_ready.append(device)
+		if not task.cancelled() and task.exception() is not None:
+			logging.error(f'[ LANES ] {lane} work for {device} failed: {task.exception()}')
+		self._pump()
+
+	def get_stats(self) -> Dict[str, Any]:
+		return {
+			lane: {
+				'queued': self.queued(lane),
+				'running': self.running[lane],
+				'started': self.started[lane],
+				'dropped': self.dropped[lane],
+				'max_wait': self.max_wait[lane],
+				'limit': self.limits[lane],
+			}
+			for lane in LANES
+		}
@@ -0,0 +1,250 @@
+"""
+Line-protocol ingest: raw TCP/UDP listeners for high-rate tag push sources.
+
+One tag record per line, either NDJSON or CSV::
+
+    {"device": "portal_1", "epc": "3034...", "tid": "e280...", "ant": 1, "rssi": -55}
+    portal_1,3034...,e280...,1,-55
+
+CSV fields after ``epc`` are optional (``device,epc`` is a valid record, an
+empty ``tid`` is sent as None) and a record without a device uses
+``default_device``. TCP connections are persistent: partial lines are kept
+until the rest arrives. A UDP datagram carries one or more complete lines.
+
+Parsed records are queued and handed to ``RfidManager.on_tag`` in batches once
+per event loop iteration, however many connections they arrived on. When the
+queue is full, TCP connections stop reading until it drains and UDP datagrams
+are dropped.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional
+
+
+def parse_line(line: bytes) -> Optional[tuple[Optional[str], Dict[str, Any]]]:
+	"""
+	Parse one NDJSON or CSV record.
+
+	Returns:
+	    (device, tag_data), or None for a blank line.
+
+	Raises:
+	    ValueError: Malformed record.
+	"""
+	line = line.strip()
+	if not line:
+		return None
+	if line[0] == 0x7B:  # '{'
+		tag = json.loads(line)
+		if not isinstance(tag, dict):
+			raise ValueError('record is not a JSON object')
+		return tag.pop('device', None), tag
+	fields = line.decode().split(',')
+	if len(fields) < 2 or not fields[1]:
+		raise ValueError('expected device,epc[,tid,ant,rssi]')
+	tag = {'epc': fields[1]}
+	if len(fields) > 2:
+		tag['tid'] = fields[2] or None
+	if len(fields) > 3 and fields[3]:
+		tag['ant'] = int(fields[3])
+	if len(fields) > 4 and fields[4]:
+		tag['rssi'] = int(fields[4])
+	return fields[0] or None, tag
+
+
+class _TcpProtocol(asyncio.Protocol):
+	def __init__(self, server: 'LineIngestServer'):
+		self.server = server
+		self.transport: Optional[asyncio.Transport] = None
+		self.buffer = b''
+
+	def connection_made(self, transport) -> None:
+		self.transport = transport
+		self.server.connections_total += 1
+		self.server._connections.add(self)
+
+	def connection_lost(self, exc) -> None:
+		self.server._connections.discard(self)
+		self.server._paused.discard(self)
+
+	def data_received(self, data: bytes) -> None:
+		server = self.server
+		server.tcp_bytes += len(data)
+		if self.buffer:
+			data = self.buffer + data
+		end = data.rfind(b'\n')
+		if end < 0:
+			self.buffer = data
+		else:
+			self.buffer = data[end + 1 :]
+			server.feed(data[:end].split(b'\n'))
+		if len(self.buffer) > server.max_line:
+			server.errors += 1
+			self.buffer = b''
+		if len(server._pending) >= server.max_pending:
+			self.transport.pause_reading()
+			server._paused.add(self)
+
+	def eof_received(self) -> None:
+		if self.buffer:
+			self.server.feed([self.buffer])
+			self.buffer = b''
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+	def __init__(self, server: 'LineIngestServer'):
+		self.server = server
+
+	def datagram_received(self, data: bytes, addr) -> None:
+		server = self.server
+		server.udp_bytes += len(data)
+		server.datagrams += 1
+		if len(server._pending) >= server.max_pending:
+			server.dropped += 1
+			return
+		server.feed(data.split(b'\n'))
+
+
+class LineIngestServer:
+	def __init__(
+		self,
+		manager: Any,
+		host: str = '0.0.0.0',
+		tcp_port: Optional[int] = None,
+		udp_port: Optional[int] = None,
+		default_device: str = 'line_ingest',
+		batch_size: int = 1000,
+		max_pending: int = 100_000,
+		max_line: int = 64 * 1024,
+	):
+		"""
+		Args:
+		    manager: RfidManager receiving the tags.
+		    host: Listen address for both listeners.
+		    tcp_port: TCP port (None: no TCP listener, 0: any free port).
+		    udp_port: UDP port (None: no UDP listener, 0: any free port).
+		    default_device: Device name for records without one.
+		    batch_size: Records handed to the manager between yields to the event loop.
+		    max_pending: Parsed records queued before TCP reads pause and UDP datagrams drop.
+		    max_line: Longest accepted line; longer partial lines are discarded.
+		"""
+		self.manager = manager
+		self.host = host
+		self.tcp_port = tcp_port
+		self.udp_port = udp_port
+		self.default_device = default_device
+		self.batch_size = batch_size
+		self.max_pending = max_pending
+		self.max_line = max_line
+
+		self._tcp_server: Optional[asyncio.AbstractServer] = None
+		self._udp_transport: Optional[asyncio.DatagramTransport] = None
+		self._connections: set[_TcpProtocol] = set()
+		self._paused: set[_TcpProtocol] = set()
+		self._pending: list[tuple[Optional[str], Dict[str, Any]]] = []
+		self._flush_handle: Optional[asyncio.Handle] = None
+
+		self.connections_total = 0
+		self.tcp_bytes = 0
+		self.udp_bytes = 0
+		self.datagrams = 0
+		self.records = 0
+		self.errors = 0
+		self.dropped = 0
+
+	@property
+	def enabled(self) -> bool:
+		return self.tcp_port is not None or self.udp_port is not None
+
+	# [ PARSING ]
+	def feed(self, lines: list[bytes]) -> None:
+		"""Parse complete lines into the pending queue and schedule a flush."""
+		pending = self._pending
+		for line in lines:
+			try:
+				record = parse_line(line)
+			except (ValueError, UnicodeDecodeError) as e:
+				self.errors += 1
+				logging.debug('[ LINE INGEST ] Bad record %r: %s', line[:80], e)
+				continue
+			if record is not None:
+				pending.append(record)
+		if pending and self._flush_handle is None:
+			self._flush_handle = asyncio.get_running_loop().call_soon(self._flush)
+
+	def _flush(self) -> None:
+		self._flush_handle = None
+		batch = self._pending[: self.batch_size]
+		del self._pending[: self.batch_size]
+		on_tag = self.manager.on_tag
+		default_device = self.default_device
+		for device, tag in batch:
+			try:
+				on_tag(name=device or default_device, tag_data=tag)
+			except Exception as e:
+				self.errors += 1
+				logging.error(f'[ LINE INGEST ] Error handling tag from {device}: {e}')
+		self.records += len(batch)
+		if self._pending:
+			self._flush_handle = asyncio.get_running_loop().call_soon(self._flush)
+		elif self._paused:
+			for protocol in self._paused:
+				protocol.transport.resume_reading()
+			self._paused.clear()
+
+	# [ LIFECYCLE ]
+	async def start(self) -> None:
+		loop = asyncio.get_running_loop()
+		if self.tcp_port is not None:
+			self._tcp_server = await loop.create_server(
+				lambda: _TcpProtocol(self), self.host, self.tcp_port, backlog=1024
+			)
+			self.tcp_port = self._tcp_server.sockets[0].getsockname()[1]
+			logging.info(f'[ LINE INGEST ] TCP listening on {self.host}:{self.tcp_port}')
+		if self.udp_port is not None:
+			self._udp_transport, _ = await loop.create_datagram_endpoint(
+				lambda: _UdpProtocol(self), local_addr=(self.host, self.udp_port)
+			)
+			self.udp_port = self._udp_transport.get_extra_info('sockname')[1]
+			logging.info(f'[ LINE INGEST ] UDP listening on {self.host}:{self.udp_port}')
+
+	async def stop(self) -> None:
+		if self._tcp_server is not None:
+			self._tcp_server.close()
+			for protocol in list(self._connections):
+				protocol.transport.close()
+			await self._tcp_server.wait_closed()
+			self._tcp_server = None
+		if self._udp_transport is not None:
+			self._udp_transport.close()
+			self._udp_transport = None
+		while self._pending:
+			self._flush()  # keep what was already received
+		if self._flush_handle is not None:
+			self._flush_handle.cancel()
+			self._flush_handle = None
+
+	async def run(self) -> None:
+		"""Serve until cancelled."""
+		await self.start()
+		try:
+			await asyncio.Future()
+		finally:
+			await self.stop()
+
+	def get_stats(self) -> Dict[str, Any]:
+		return {
+			'tcp_port': self.tcp_port,
+			'udp_port': self.udp_port,
+			'connections': len(self._connections),
+			'connections_total': self.connections_total,
+			'tcp_bytes': self.tcp_bytes,
+			'udp_bytes': self.udp_bytes,
+			'datagrams': self.datagrams,
+			'records': self.records,
+			'pending': len(self._pending),
+			'errors': self.errors,
+			'dropped': self.dropped,
+		}
@@ -0,0 +1,232 @@
+"""
+Prometheus metrics for the RFID pipeline.
+
+The metrics are registered in the default registry, so they are served by the
+``/metrics`` endpoint exposed by ``prometheus_fastapi_instrumentator`` next to
+the HTTP metrics.
+
+Hot paths (one call per tag read) go through small caches of labelled children
+so a read costs a dict lookup and a counter increment. Values that already
+exist elsewhere (TagList size, dispatcher queue and counters) are read at
+scrape time instead of being updated on every change.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Optional
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+TAG_READS = Counter(
+	'rfid_tag_reads',
+	'Tag reads accepted into the TagList (kind: new or reread)',
+	['device', 'antenna', 'kind'],
+)
+TAGLIST_SIZE = Gauge('rfid_taglist_size', 'Number of tags currently held in the TagList')
+INTEGRATION_LATENCY = Histogram(
+	'rfid_integration_latency_seconds',
+	'Latency of each integration target call',
+	['target', 'result'],
+	buckets=LATENCY_BUCKETS,
+)
+PENDING_TASKS = Gauge(
+	'rfid_pending_tasks', 'Background tasks created by the RFID pipeline not yet finished', ['kind']
+)
+DEVICE_CONNECTIONS = Counter(
+	'rfid_device_connections',
+	'Device connections (kind: connect for the first one, reconnect afterwards)',
+	['device', 'kind'],
+)
+DEVICE_DISCONNECTIONS = Counter('rfid_device_disconnections', 'Device disconnections', ['device'])
+WRITE_ATTEMPTS = Counter(
+	'rfid_write_attempts', 'EPC writes issued by the write scheduler', ['device']
+)
+WRITE_RESULTS = Counter(
+	'rfid_write_results',
+	'Write-list outcomes (ok/error: command result, confirmed: target EPC read back)',
+	['device', 'result'],
+)
+LABELS_PRINTED = Counter(
+	'rfid_labels_printed',
+	'Labels finished by print jobs (result: printed or error)',
+	['device', 'result'],
+)
+LANE_WAIT = Histogram(
+	'rfid_lane_wait_seconds',
+	'Time work spent queued in a priority lane before starting',
+	['lane'],
+	buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+LANE_QUEUED = Gauge('rfid_lane_queued', 'Work waiting in a priority lane', ['lane'])
+
+_tag_children: Dict[tuple, Any] = {}
+_lane_children: Dict[str, Any] = {}
+_connected_devices: set[str] = set()
+
+
+# [ TAGS ]
+def observe_tag(device: str, antenna: Any, new_tag: bool) -> None:
+	"""Count one accepted tag read."""
+	key = (device, antenna, new_tag)
+	child = _tag_children.get(key)
+	if child is None:
+		child = TAG_READS.labels(
+			device=str(device), antenna=str(antenna), kind='new' if new_tag else 'reread'
+		)
+		_tag_children[key] = child
+	child.inc()
+
+
+# [ DEVICES ]
+def observe_connection(device: str, connected: bool) -> None:
+	"""Count connect, reconnect and disconnect transitions of a device."""
+	if not connected:
+		DEVICE_DISCONNECTIONS.labels(device=device).inc()
+		return
+	kind = 'reconnect' if device in _connected_devices else 'connect'
+	_connected_devices.add(device)
+	DEVICE_CONNECTIONS.labels(device=device, kind=kind).inc()
+
+
+# [ TASKS ]
+def observe_lane_wait(lane: str, seconds: float) -> None:
+	child = _lane_children.get(lane)
+	if child is None:
+		child = _lane_children[lane] = LANE_WAIT.labels(lane=lane)
+	child.observe(seconds)
+
+
+def create_tracked_task(kind: str, coro: Coroutine) -> asyncio.Task:
+	"""Create a task and keep ``rfid_pending_tasks{kind}`` up to date until it finishes."""
+	gauge = PENDING_TASKS.labels(kind=kind)
+	gauge.inc()
+	task = asyncio.create_task(coro)
+	task.add_done_callback(lambda _: gauge.dec())
+	return task
+
+
+async def timed(target: str, awaitable: Awaitable) -> Any:
+	"""Await *awaitable* and record its latency under ``target``."""
+	start = time.perf_counter()
+	result = 'error'
+	try:
+		value = await awaitable
+		result = 'ok'
+		return value
+	finally:
+		INTEGRATION_LATENCY.labels(target=target, result=result).observe(
+			time.perf_counter() - start
+		)
+
+
+# [ SCRAPE-TIME VALUES ]
+class DispatcherCollector(Collector):
+	"""Expose EventDispatcher statistics, read from ``get_stats()`` at scrape time."""
+
+	_COUNTERS = (
+		'events_received',
+		'events_queued',
+		'events_dropped',
+		'events_processed',
+		'dispatches_attempted',
+		'dispatches_succeeded',
+		'dispatches_failed',
+	)
+
+	def __init__(self):
+		self.source: Optional[Callable[[], Any]] = None
+		self.index_source: Optional[Callable[[], Any]] = None
+
+	def collect(self):
+		index = self.index_source() if self.index_source is not None else None
+		if index is not None:
+			yield CounterMetricFamily(
+				'rfid_dispatcher_events_skipped',
+				'Events not queued because no dispatch listens to their event type',
+				index.skipped,
+			)
+		dispatcher = self.source() if self.source is not None else None
+		if dispatcher is None:
+			return
+		try:
+			stats = dispatcher.get_stats()
+		except Exception:
+			return
+		yield GaugeMetricFamily(
+			'rfid_dispatcher_queue_size',
+			'Events waiting in the dispatcher queue',
+			value=stats.get('queue_size', 0),
+		)
+		for name in self._COUNTERS:
+			if name in stats:
+				yield CounterMetricFamily(
+					f'rfid_dispatcher_{name}', f'Dispatcher {name.replace("_", " ")}', stats[name]
+				)
+
+
+dispatcher_collector = DispatcherCollector()
+REGISTRY.register(dispatcher_collector)
+
+
+class LineIngestCollector(Collector):
+	"""Expose the TCP/UDP line-protocol listener counters at scrape time."""
+
+	def __init__(self):
+		self.source: Optional[Callable[[], Any]] = None
+
+	def collect(self):
+		server = self.source() if self.source is not None else None
+		if server is None or not server.enabled:
+			return
+		stats = server.get_stats()
+		yield GaugeMetricFamily(
+			'rfid_line_ingest_connections', 'Open TCP connections', value=stats['connections']
+		)
+		bytes_received = CounterMetricFamily(
+			'rfid_line_ingest_bytes', 'Bytes received by protocol', labels=['protocol']
+		)
+		bytes_received.add_metric(['tcp'], stats['tcp_bytes'])
+		bytes_received.add_metric(['udp'], stats['udp_bytes'])
+		yield bytes_received
+		for name, documentation in (
+			('connections_total', 'TCP connections accepted'),
+			('records', 'Tag records handed to the RFID manager'),
+			('errors', 'Malformed records and oversized lines'),
+			('dropped', 'UDP datagrams dropped while the queue was full'),
+		):
+			yield CounterMetricFamily(f'rfid_line_ingest_{name}', documentation, stats[name])
+
+
+line_ingest_collector = LineIngestCollector()
+REGISTRY.register(line_ingest_collector)
+
+
+class TagFilterCollector(Collector):
+	"""Expose the pre-ingest filter counters at scrape time."""
+
+	def __init__(self):
+		self.source: Optional[Callable[[], Any]] = None
+
+	def collect(self):
+		tag_filter = self.source() if self.source is not None else None
+		if tag_filter is None:
+			return
+		yield CounterMetricFamily(
+			'rfid_tag_filter_accepted',
+			'Tag reads passed by the pre-ingest filter',
+			tag_filter.accepted,
+		)
+		drops = CounterMetricFamily(
+			'rfid_tag_filter_dropped', 'Tag reads dropped by the pre-ingest filter', labels=['rule']
+		)
+		for rule, count in tag_filter.drops.items():
+			drops.add_metric([rule], count)
+		yield drops
+
+
+tag_filter_collector = TagFilterCollector()
+REGISTRY.register(tag_filter_collector)
@@ -0,0 +1,416 @@
+"""
+Product master lookup: enrich tags with SKU, description, ... before integration.
+
+The product master is a CSV file (header row) or an SQLite database (table
+``products`` by default). Each row is keyed by a ``gtin`` column (GTIN-14,
+compared with the GTIN decoded by the TagList) and/or an ``epc_prefix`` column
+(up to 16 hex characters); every other column is a field added to the tag::
+
+    gtin,epc_prefix,sku,description
+    07891234567895,,SKU-001,Blue shirt M
+    ,3034aabb,SKU-PALLET,Pallet label
+
+Columns named like a tag field the TagList or the write list maintains
+(``epc``, ``timestamp``, ``count``, ...) are added as ``product_<column>``, so a
+product never overwrites the read state of a tag.
+
+The rows are compiled once into an index file and memory-mapped, so millions of
+products cost page cache rather than Python objects. The index is an
+open-addressing hash table of ``(key, kind | record offset)`` uint64 pairs
+followed by the records; a lookup hashes the GTIN (then each configured prefix
+length, longest first) and probes a few slots: O(1) per tag. Index files are
+named after the source mtime and size, so a restart reuses the index while the
+source is unchanged and a rebuild never replaces a file that is still mapped.
+They are written in native byte order and not meant to be copied between
+machines.
+
+``reload_if_changed`` rebuilds the index in a worker thread when the source
+changes and swaps it in on the event loop; lookups keep using the previous
+index until then.
+"""
+
+import asyncio
+import csv
+import glob
+import json
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+import tempfile
+import time
+from array import array
+from typing import Any, Dict, Iterator, Optional
+
+_MAGIC = b'XBPMIDX2'  # version 2: reserved columns renamed (older indexes are rebuilt)
+_HEADER = struct.Struct('<8sqqqqi')  # magic, mtime_ns, size, slots, entries, meta length
+_RECORD = struct.Struct('<I')
+_GOLDEN = 0x9E3779B97F4A7C15
+_U64 = 0xFFFFFFFFFFFFFFFF
+_GTIN = 0  # key kind; EPC prefixes use their length (1-16) as the kind
+_KEY_COLUMNS = ('gtin', 'epc_prefix')
+# tag fields set by TagList.add and the write list; product columns never replace them
+_RESERVED_FIELDS = frozenset(
+	{
+		'timestamp',
+		'first_seen',
+		'device',
+		'epc',
+		'tid',
+		'ant',
+		'rssi',
+		'protected',
+		'epc_len',
+		'gtin',
+		'chip',
+		'count',
+		'target',
+	}
+)
+_SEPARATOR = '\x1f'
+
+
+def _slot(key: int, kind: int, shift: int) -> int:
+	return (((key ^ (kind << 56)) * _GOLDEN) & _U64) >> shift
+
+
+def _read_rows(source: str, table: str) -> tuple[list[str], Iterator[tuple]]:
+	"""Column names (lowercase) and row values of a CSV file or SQLite table."""
+	if source.lower().endswith(('.db', '.sqlite', '.sqlite3')):
+		connection = sqlite3.connect(f'file:{source}?mode=ro', uri=True)
+		if not table.replace('_', '').isalnum():
+			raise ValueError(f'Invalid product master table name: {table}')
+		cursor = connection.execute(f'SELECT * FROM "{table}"')  # noqa: S608
+		columns = [column[0].lower() for column in cursor.description]
+
+		def sqlite_rows():
+			try:
+				yield from cursor
+			finally:
+				connection.close()
+
+		return columns, sqlite_rows()
+
+	file = open(source, newline='', encoding='utf-8-sig')
+	reader = csv.reader(file)
+	columns = [column.strip().lower() for column in next(reader, [])]
+
+	def csv_rows():
+		try:
+			yield from reader
+		finally:
+			file.close()
+
+	return columns, csv_rows()
+
+
+def build_index(source: str, index_path: str, table: str = 'products') -> Dict[str, Any]:
+	"""
+	Compile the product master into an index file (written atomically).
+
+	Args:
+	    source: CSV file or SQLite database (.db, .sqlite, .sqlite3).
+	    index_path: Index file to write.
+	    table: SQLite table name.
+
+	Returns:
+	    dict with 'entries', 'skipped' and 'fields'.
+
+	Raises:
+	    ValueError: No gtin/epc_prefix column.
+	    OSError, csv.Error, sqlite3.Error: Source could not be read.
+	"""
+	stat = os.stat(source)
+	columns, rows = _read_rows(source, table)
+	key_columns = [columns.index(name) if name in columns else None for name in _KEY_COLUMNS]
+	if key_columns == [None, None]:
+		raise ValueError('Product master needs a gtin and/or epc_prefix column')
+	field_columns = [i for i, name in enumerate(columns) if name not in _KEY_COLUMNS]
+	fields = [
+		f'product_{columns[i]}' if columns[i] in _RESERVED_FIELDS else columns[i]
+		for i in field_columns
+	]
+	renamed = [columns[i] for i in field_columns if columns[i] in _RESERVED_FIELDS]
+	if renamed:
+		logging.warning(
+			'[ PRODUCT MASTER ] Columns %s are tag fields, added as product_<column>',
+			', '.join(renamed),
+		)
+	gtin_column, prefix_column = key_columns
+
+	directory = os.path.dirname(os.path.abspath(index_path))
+	os.makedirs(directory, exist_ok=True)
+	keys = array('Q')
+	metas = array('Q')
+	prefix_lengths: set[int] = set()
+	skipped = 0
+	with tempfile.TemporaryFile(dir=directory) as blob:
+		offset = 0
+		for row in rows:
+			entry_keys = []
+			try:
+				gtin = row[gtin_column] if gtin_column is not None else None
+				if gtin not in (None, ''):
+					entry_keys.append((_GTIN, int(str(gtin).strip())))
+				prefix = row[prefix_column] if prefix_column is not None else None
+				if prefix not in (None, ''):
+					prefix = str(prefix).strip()
+					if not 0 < len(prefix) <= 16:
+						raise ValueError(prefix)
+					entry_keys.append((len(prefix), int(prefix, 16)))
+			except (ValueError, IndexError):
+				skipped += 1
+				continue
+			if not entry_keys:
+				skipped += 1
+				continue
+			values = [
+				'' if i >= len(row) or row[i] is None else str(row[i]).replace(_SEPARATOR, ' ')
+				for i in field_columns
+			]
+			record = _SEPARATOR.join(values).encode()
+			blob.write(_RECORD.pack(len(record)))
+			blob.write(record)
+			for kind, key in entry_keys:
+				if kind != _GTIN:
+					prefix_lengths.add(kind)
+				keys.append(key & _U64)
+				metas.append((offset + 1) << 8 | kind)
+			offset += _RECORD.size + len(record)
+
+		bits = max(1, (len(keys) * 2 - 1).bit_length())  # load factor <= 0.5
+		shift = 64 - bits
+		mask = (1 << bits) - 1
+		slots = array('Q', bytes(16 << bits))
+		entries = 0
+		for key, meta in zip(keys, metas):
+			kind = meta & 0xFF
+			i = _slot(key, kind, shift)
+			while slots[2 * i + 1] and not (
+				slots[2 * i] == key and slots[2 * i + 1] & 0xFF == kind
+			):
+				i = (i + 1) & mask
+			if not slots[2 * i + 1]:
+				entries += 1
+			slots[2 * i] = key
+			slots[2 * i + 1] = meta  # a later row replaces an earlier one with the same key
+
+		meta = json.dumps(
+			{'fields': fields, 'prefix_lengths': sorted(prefix_lengths, reverse=True)}
+		).encode()
+		meta += b' ' * (-(len(meta) + _HEADER.size) % 8)  # keep the slots 8-byte aligned
+		tmp_path = f'{index_path}.tmp'
+		with open(tmp_path, 'wb') as f:
+			f.write(
+				_HEADER.pack(_MAGIC, stat.st_mtime_ns, stat.st_size, 1 << bits, entries, len(meta))
+			)
+			f.write(meta)
+			slots.tofile(f)
+			blob.seek(0)
+			while chunk := blob.read(1 << 20):
+				f.write(chunk)
+		os.replace(tmp_path, index_path)
+	return {'entries': entries, 'skipped': skipped, 'fields': fields}
+
+
+class ProductIndex:
+	"""Read-only view of an index file."""
+
+	def __init__(self, path: str, cache_size: int = 65536):
+		"""
+		Raises:
+		    ValueError: Not an index file.
+		    OSError: File could not be opened.
+		"""
+		self.path = path
+		self._file = open(path, 'rb')
+		try:
+			self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		except ValueError:  # empty file
+			self._file.close()
+			raise
+		if self._mm.size() < _HEADER.size or self._mm[:8] != _MAGIC:
+			self.close()
+			raise ValueError(f'{path} is not a product master index')
+		magic, self.source_mtime_ns, self.source_size, n_slots, self.entries, meta_length = (
+			_HEADER.unpack_from(self._mm)
+		)
+		meta = json.loads(self._mm[_HEADER.size : _HEADER.size + meta_length])
+		self.fields: list[str] = meta['fields']
+		self.prefix_lengths: list[int] = meta['prefix_lengths']
+		slots_start = _HEADER.size + meta_length
+		self._blob_start = slots_start + n_slots * 16
+		self._view = memoryview(self._mm)
+		self._slots = self._view[slots_start : self._blob_start].cast('Q')
+		self._shift = 64 - (n_slots.bit_length() - 1)
+		self._mask = n_slots - 1
+		self._cache: Dict[int, Dict[str, Any]] = {}
+		self._cache_size = cache_size
+
+	def close(self) -> None:
+		for view in ('_slots', '_view'):
+			if hasattr(self, view):
+				getattr(self, view).release()
+		self._mm.close()
+		self._file.close()
+
+	def _find(self, kind: int, key: int) -> int:
+		"""Record offset + 1 for the key, 0 if absent."""
+		slots = self._slots
+		i = _slot(key, kind, self._shift)
+		while True:
+			meta = slots[2 * i + 1]
+			if not meta:
+				return 0
+			if slots[2 * i] == key and meta & 0xFF == kind:
+				return meta >> 8
+			i = (i + 1) & self._mask
+
+	def _record(self, offset: int) -> Dict[str, Any]:
+		record = self._cache.get(offset)
+		if record is None:
+			start = self._blob_start + offset
+			(length,) = _RECORD.unpack_from(self._mm, start)
+			values = self._mm[start + _RECORD.size : start + _RECORD.size + length].decode()
+			record = dict(zip(self.fields, (value or None for value in values.split(_SEPARATOR))))
+			if len(self._cache) >= self._cache_size:
+				self._cache.clear()
+			self._cache[offset] = record
+		return record
+
+	def lookup(self, gtin: Optional[str] = None, epc: Optional[str] = None) -> Optional[Dict]:
+		"""Fields of the product for a GTIN, else for the longest matching EPC prefix."""
+		if gtin:
+			try:
+				found = self._find(_GTIN, int(gtin))
+			except ValueError:
+				found = 0
+			if found:
+				return self._record(found - 1)
+		if epc:
+			for length in self.prefix_lengths:
+				if len(epc) < length:
+					continue
+				try:
+					found = self._find(length, int(epc[:length], 16))
+				except ValueError:
+					return None
+				if found:
+					return self._record(found - 1)
+		return None
+
+
+class ProductMaster:
+	def __init__(self, source: str, index_dir: str, table: str = 'products'):
+		"""
+		Args:
+		    source: CSV file or SQLite database with the products.
+		    index_dir: Directory for the compiled index files.
+		    table: SQLite table name.
+		"""
+		self.source = source
+		self.index_dir = index_dir
+		self.table = table
+		self.index: Optional[ProductIndex] = None
+		self._empty: Dict[str, None] = {}
+		self._signature: Optional[tuple[int, int]] = None
+		self.loaded_at: Optional[float] = None
+		self.hits = 0
+		self.misses = 0
+		self.reloads = 0
+		self.errors = 0
+
+	def signature(self) -> Optional[tuple[int, int]]:
+		try:
+			stat = os.stat(self.source)
+		except OSError:
+			return None
+		return stat.st_mtime_ns, stat.st_size
+
+	def _index_file(self, signature: tuple[int, int]) -> str:
+		return os.path.join(self.index_dir, f'product_master-{signature[0]}-{signature[1]}.idx')
+
+	def _open(self, signature: tuple[int, int]) -> ProductIndex:
+		"""Open the index of the current source, building it first if needed (worker thread)."""
+		path = self._index_file(signature)
+		try:
+			index = ProductIndex(path)
+			if (index.source_mtime_ns, index.source_size) == signature:
+				return index
+			index.close()
+		except (OSError, ValueError):
+			pass
+		start = time.perf_counter()
+		stats = build_index(self.source, path, self.table)
+		logging.info(
+			f'[ PRODUCT MASTER ] Indexed {stats["entries"]} keys from {self.source} '
+			f'({stats["skipped"]} rows skipped) in {time.perf_counter() - start:.1f}s'
+		)
+		return ProductIndex(path)
+
+	def _remove_stale(self, current: str) -> None:
+		for path in glob.glob(os.path.join(self.index_dir, 'product_master-*.idx')):
+			if path != current:
+				try:
+					os.remove(path)
+				except OSError:
+					pass
+
+	async def reload_if_changed(self) -> bool:
+		"""Load the index when the source changed since the last load."""
+		signature = self.signature()
+		if signature is None:
+			if self._signature is None:
+				logging.warning(f'[ PRODUCT MASTER ] {self.source} not found')
+				self._signature = (0, 0)
+			return False
+		if signature == self._signature:
+			return False
+		self._signature = signature  # a broken file is not retried until it changes again
+		try:
+			index = await asyncio.to_thread(self._open, signature)
+		except (OSError, ValueError, UnicodeDecodeError, csv.Error, sqlite3.Error) as e:
+			self.errors += 1
+			logging.error(f'[ PRODUCT MASTER ] Error loading {self.source}: {e}')
+			return False
+		previous, self.index = self.index, index
+		self._empty = dict.fromkeys(index.fields)
+		self.loaded_at = time.time()
+		self.reloads += 1
+		if previous is not None:
+			previous.close()
+		self._remove_stale(index.path)
+		return True
+
+	def enrich(self, tag: Dict[str, Any]) -> None:
+		"""Add the product fields to the tag (None when the product is unknown)."""
+		index = self.index
+		if index is None:
+			return
+		record = index.lookup(tag.get('gtin'), tag.get('epc'))
+		if record is None:
+			self.misses += 1
+			tag.update(self._empty)
+		else:
+			self.hits += 1
+			tag.update(record)
+
+	def close(self) -> None:
+		if self.index is not None:
+			self.index.close()
+			self.index = None
+
+	def get_stats(self) -> Dict[str, Any]:
+		index = self.index
+		return {
+			'source': self.source,
+			'loaded': index is not None,
+			'loaded_at': self.loaded_at,
+			'entries': index.entries if index is not None else 0,
+			'fields': index.fields if index is not None else [],
+			'hits': self.hits,
+			'misses': self.misses,
+			'reloads': self.reloads,
+			'errors': self.errors,
+		}
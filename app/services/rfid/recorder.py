@@ -0,0 +1,244 @@
+"""
+Device traffic recorder for capture and offline replay.
+
+While recording, every event entering ``RfidManager`` (device callbacks and the
+``/receive/*`` routes) is queued in memory as one NDJSON record::
+
+    {"t": seconds since the capture started (monotonic), "device": name,
+     "event_type": "tag", "data": {...}}
+
+A background task flushes the queue: each flush is compressed into one gzip
+member and appended to the current segment with a single write (a segment is a
+valid multi-member ``.ndjson.gz`` file). Segments rotate by size and age and
+only the newest ``max_segments`` of a capture are kept.
+
+A capture is a directory of segments. ``replay_capture`` feeds it back through
+``on_event``/``on_tag`` with the recorded timing scaled by ``speed`` (0 = as
+fast as possible), and the reader emulator accepts it as ``--replay``.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from emulator.capture import SEGMENT_PREFIX, SEGMENT_SUFFIX, list_segments, read_segment
+
+
+class TrafficRecorder:
+	def __init__(
+		self,
+		path: str,
+		segment_bytes: int = 16 * 1024 * 1024,
+		segment_seconds: float = 300.0,
+		max_segments: int = 50,
+		max_pending: int = 200_000,
+	):
+		"""
+		Args:
+		    path: Directory holding one sub-directory per capture.
+		    segment_bytes: Rotate the segment after this many compressed bytes.
+		    segment_seconds: Rotate the segment after this many seconds.
+		    max_segments: Segments kept per capture (oldest are deleted).
+		    max_pending: Records queued between flushes before new ones are dropped.
+		"""
+		self.path = path
+		self.segment_bytes = segment_bytes
+		self.segment_seconds = segment_seconds
+		self.max_segments = max_segments
+		self.max_pending = max_pending
+
+		self.active = False
+		self.capture: Optional[str] = None
+		self._origin = 0.0
+		self._pending: list[tuple] = []
+		self._flush_lock = asyncio.Lock()
+		self._segment: Optional[str] = None
+		self._segment_index = 0
+		self._segment_opened = 0.0
+
+		self.recorded = 0
+		self.dropped = 0
+		self.written_bytes = 0
+
+	# [ RECORDING ]
+	def start(self, name: Optional[str] = None) -> str:
+		"""Start a new capture and return its name."""
+		if self.active:
+			return self.capture
+		self.capture = name or f'capture_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+		os.makedirs(os.path.join(self.path, self.capture), exist_ok=True)
+		self._origin = time.monotonic()
+		self._segment = None
+		self._segment_index = 0
+		self.recorded = self.dropped = self.written_bytes = 0
+		self.active = True
+		logging.info(f'[ RECORDER ] Capture {self.capture} started')
+		return self.capture
+
+	def stop(self) -> None:
+		"""Stop recording; queued records are still written by the next flush."""
+		if self.active:
+			self.active = False
+			logging.info(f'[ RECORDER ] Capture {self.capture} stopped ({self.recorded} records)')
+
+	def record(self, device: str, event_type: str, data: Any) -> None:
+		if len(self._pending) >= self.max_pending:
+			self.dropped += 1
+			return
+		self._pending.append((time.monotonic() - self._origin, device, event_type, data))
+		self.recorded += 1
+
+	# [ WRITING ]
+	async def flush(self) -> int:
+		"""Write the queued records as one compressed batch. Returns the records written."""
+		async with self._flush_lock:
+			if not self._pending:
+				return 0
+			pending, self._pending = self._pending, []
+			capture = self.capture
+			try:
+				await asyncio.to_thread(self._write_batch, capture, pending)
+			except OSError as e:
+				self.dropped += len(pending)
+				logging.error(f'[ RECORDER ] Error writing {len(pending)} records: {e}')
+				return 0
+			return len(pending)
+
+	def _write_batch(self, capture: str, pending: list[tuple]) -> None:
+		lines = [
+			json.dumps(
+				{'t': round(t, 6), 'device': device, 'event_type': event_type, 'data': data},
+				default=str,
+			)
+			for t, device, event_type, data in pending
+		]
+		blob = gzip.compress(('\n'.join(lines) + '\n').encode(), compresslevel=6)
+		segment = self._current_segment(capture)
+		with open(segment, 'ab') as f:
+			f.write(blob)
+		self.written_bytes += len(blob)
+
+	def _current_segment(self, capture: str) -> str:
+		directory = os.path.join(self.path, capture)
+		if self._segment is not None and os.path.dirname(self._segment) == directory:
+			too_big = os.path.getsize(self._segment) >= self.segment_bytes
+			too_old = time.monotonic() - self._segment_opened >= self.segment_seconds
+			if not (too_big or too_old):
+				return self._segment
+		self._segment_index += 1
+		self._segment = os.path.join(
+			directory, f'{SEGMENT_PREFIX}{self._segment_index:05d}{SEGMENT_SUFFIX}'
+		)
+		self._segment_opened = time.monotonic()
+		# the new segment is not on disk yet: keep max_segments - 1 older ones
+		for old in list_segments(directory)[: -(self.max_segments - 1) or None]:
+			os.remove(old)
+		return self._segment
+
+	# [ CAPTURES ]
+	def capture_path(self, capture: str) -> str:
+		"""Path of a capture by name; raises ValueError for unknown or unsafe names."""
+		name = os.path.basename(capture)
+		path = os.path.join(self.path, name)
+		if name in ('', '.', '..') or not os.path.isdir(path):
+			raise ValueError(f'Capture {capture} not found')
+		return path
+
+	def list_captures(self) -> list[Dict[str, Any]]:
+		if not os.path.isdir(self.path):
+			return []
+		captures = []
+		for name in sorted(os.listdir(self.path)):
+			directory = os.path.join(self.path, name)
+			if not os.path.isdir(directory):
+				continue
+			segments = list_segments(directory)
+			captures.append(
+				{
+					'name': name,
+					'segments': len(segments),
+					'bytes': sum(os.path.getsize(segment) for segment in segments),
+					'recording': self.active and name == self.capture,
+				}
+			)
+		return captures
+
+	def delete_capture(self, capture: str) -> None:
+		if self.active and os.path.basename(capture) == self.capture:
+			raise ValueError('Cannot delete the capture being recorded')
+		shutil.rmtree(self.capture_path(capture))
+
+	def get_status(self) -> Dict[str, Any]:
+		return {
+			'recording': self.active,
+			'capture': self.capture,
+			'elapsed': round(time.monotonic() - self._origin, 3) if self.active else None,
+			'recorded': self.recorded,
+			'pending': len(self._pending),
+			'dropped': self.dropped,
+			'written_bytes': self.written_bytes,
+		}
+
+
+async def replay_capture(
+	capture_path: str,
+	on_event: Callable[..., Any],
+	on_tag: Callable[..., Any],
+	speed: float = 1.0,
+	max_batch: int = 1000,
+	on_progress: Optional[Callable[[int, int], None]] = None,
+) -> int:
+	"""
+	Feed a capture back through the RfidManager callbacks.
+
+	Args:
+	    capture_path: Capture directory (or a single segment file).
+	    on_event: ``on_event(name, event_type, event_data)``.
+	    on_tag: ``on_tag(name, tag_data)``.
+	    speed: Time scale (1 = recorded pace, 10 = ten times faster); 0 replays as fast as possible.
+	    max_batch: Events processed between yields to the event loop at full speed.
+	    on_progress: Called with (events replayed, events loaded so far) after each batch.
+
+	Returns:
+	    Number of events replayed
+	"""
+	start = time.monotonic()
+	origin = None
+	replayed = loaded = 0
+	for segment in list_segments(capture_path):
+		records = await asyncio.to_thread(read_segment, segment)  # decode off the loop
+		loaded += len(records)
+		since_yield = 0
+		for record in records:
+			t = record.get('t', 0)
+			if origin is None:
+				origin = t
+			if speed > 0:
+				delay = (t - origin) / speed - (time.monotonic() - start)
+				if delay > 0:
+					if on_progress is not None:
+						on_progress(replayed, loaded)
+					await asyncio.sleep(delay)
+					since_yield = 0
+			device = record.get('device', 'unknown')
+			event_type = record.get('event_type')
+			if event_type == 'tag':
+				on_tag(name=device, tag_data=record.get('data'))
+			else:
+				on_event(name=device, event_type=event_type, event_data=record.get('data'))
+			replayed += 1
+			since_yield += 1
+			if since_yield >= max_batch:
+				if on_progress is not None:
+					on_progress(replayed, loaded)
+				await asyncio.sleep(0)
+				since_yield = 0
+	if on_progress is not None:
+		on_progress(replayed, loaded)
+	return replayed
@@ -0,0 +1,241 @@
+"""
+Tag state snapshots for warm restarts.
+
+The TagList and the write list are saved under ``STATE_PATH`` so a restart
+(restart_application, crash or upgrade) does not report every tag in the field
+as new again.
+
+Storage is two files of framed, zlib-compressed JSON records
+(``length | crc32 | payload``):
+
+- ``tags.base``: the full state, replaced atomically (temp file + os.replace);
+- ``tags.delta``: records appended every interval with only the tags read since
+  the previous record, the removed tags and the write list when it changed.
+
+Every ``compact_every`` deltas the full state is written to a new base and the
+delta file is truncated. A record cut short by a crash fails its CRC and is
+ignored, and deltas older than the base (crash between the two steps of a
+compaction) are skipped using the record sequence number.
+"""
+
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+from smartx_rfid.utils import TagList
+
+_HEADER = struct.Struct('>II')
+_TIME_FIELDS = ('timestamp', 'first_seen')
+
+
+def _encode(record: Dict[str, Any]) -> bytes:
+	payload = zlib.compress(json.dumps(record, separators=(',', ':'), default=str).encode(), 1)
+	return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _read_frames(path: str) -> Iterator[Dict[str, Any]]:
+	"""Records of *path*, stopping at the first truncated or corrupted frame."""
+	try:
+		with open(path, 'rb') as f:
+			data = f.read()
+	except FileNotFoundError:
+		return
+	offset = 0
+	while offset + _HEADER.size <= len(data):
+		length, crc = _HEADER.unpack_from(data, offset)
+		payload = data[offset + _HEADER.size : offset + _HEADER.size + length]
+		if len(payload) < length or zlib.crc32(payload) != crc:
+			logging.warning(f'[ SNAPSHOT ] Ignoring corrupted record at byte {offset} of {path}')
+			return
+		yield json.loads(zlib.decompress(payload))
+		offset += _HEADER.size + length
+
+
+def _dump_tag(tag: Dict[str, Any]) -> Dict[str, Any]:
+	dumped = dict(tag)
+	for field in _TIME_FIELDS:
+		value = dumped.get(field)
+		if isinstance(value, datetime):
+			dumped[field] = value.timestamp()
+	return dumped
+
+
+def _load_tag(tag: Dict[str, Any]) -> Dict[str, Any]:
+	for field in _TIME_FIELDS:
+		value = tag.get(field)
+		if isinstance(value, (int, float)):
+			tag[field] = datetime.fromtimestamp(value)
+	return tag
+
+
+class TagSnapshot:
+	def __init__(self, path: str, tags: TagList, write_list: dict, compact_every: int = 60):
+		"""
+		Args:
+		    path: Directory for the snapshot files.
+		    tags: TagList to save and restore.
+		    write_list: Controller write list (TID -> target), updated in place on restore.
+		    compact_every: Delta records written before the base is rewritten.
+		"""
+		self.path = path
+		self.tags = tags
+		self.write_list = write_list
+		self.compact_every = max(1, compact_every)
+		self.base_path = os.path.join(path, 'tags.base')
+		self.delta_path = os.path.join(path, 'tags.delta')
+
+		self._seq = 0
+		self._deltas = 0
+		self._since: Optional[datetime] = None
+		self._keys: set[str] = set()
+		self._write_list: dict = {}
+		self._force_full = False  # a record failed to write: the next one is a full record
+
+	# [ RESTORE ]
+	def restore(self, max_age: Optional[float] = None) -> Dict[str, int]:
+		"""
+		Load the saved state into the TagList and the write list.
+
+		Args:
+		    max_age: Skip tags not read in the last *max_age* seconds (None keeps all).
+
+		Returns:
+		    Number of tags restored and skipped, and write list entries restored
+		"""
+		tags: Dict[str, Dict[str, Any]] = {}
+		write_list: dict = {}
+		base_seq = -1
+		for record in _read_frames(self.base_path):
+			tags = record.get('tags', {})
+			write_list = record.get('write_list', {})
+			base_seq = record.get('seq', 0)
+			self._seq = base_seq
+		for record in _read_frames(self.delta_path):
+			if record.get('seq', 0) <= base_seq:
+				continue
+			tags.update(record.get('tags', {}))
+			for key in record.get('removed', []):
+				tags.pop(key, None)
+			if record.get('write_list') is not None:
+				write_list = record['write_list']
+			self._seq = max(self._seq, record.get('seq', 0))
+
+		cutoff = time.time() - max_age if max_age else None
+		restored = skipped = 0
+		with self.tags._lock:  # TagList has no bulk insert; fill its table and index directly
+			for key, tag in tags.items():
+				if cutoff is not None and (tag.get('timestamp') or 0) < cutoff:
+					skipped += 1
+					continue
+				if key in self.tags._tags:
+					continue
+				self.tags._tags[key] = _load_tag(tag)
+				self.tags._index_add(key, self.tags._tags[key])
+				restored += 1
+		for tid, entry in write_list.items():
+			self.write_list.setdefault(tid, entry)
+
+		# the restored state is what is on disk: the next record only holds new changes
+		self._since = datetime.now()
+		self._keys = {tag[self.tags.unique_identifier] for tag in self.tags.get_all()}
+		self._write_list = dict(self.write_list)
+		result = {'tags': restored, 'skipped': skipped, 'write_list': len(write_list)}
+		if restored or write_list:
+			logging.info(f'[ SNAPSHOT ] Restored {result}')
+		return result
+
+	# [ SAVE ]
+	def capture(self, full: bool = False) -> Optional[Dict[str, Any]]:
+		"""
+		Build the next record from the current state (call on the event loop thread).
+
+		Returns:
+		    A full record when compaction is due (or *full*), a delta record, or None
+		    when nothing changed
+		"""
+		now = datetime.now()
+		identifier = self.tags.unique_identifier
+		all_tags = self.tags.get_all()
+		keys = {tag[identifier] for tag in all_tags}
+		write_list_changed = self.write_list != self._write_list
+		full = (
+			full
+			or self._force_full
+			or self._deltas >= self.compact_every
+			or not os.path.exists(self.base_path)
+		)
+
+		if full:
+			changed = all_tags
+			removed: list[str] = []
+		else:
+			since = self._since
+			changed = [tag for tag in all_tags if since is None or tag['timestamp'] > since]
+			removed = list(self._keys - keys)
+			if not changed and not removed and not write_list_changed:
+				return None
+
+		self._seq += 1
+		record: Dict[str, Any] = {
+			'seq': self._seq,
+			'full': full,
+			'tags': {tag[identifier]: _dump_tag(tag) for tag in changed},
+		}
+		if full or write_list_changed:
+			record['write_list'] = dict(self.write_list)
+		if removed:
+			record['removed'] = removed
+
+		self._since = now
+		self._keys = keys
+		self._write_list = dict(self.write_list)
+		self._deltas = 0 if full else self._deltas + 1
+		self._force_full = False
+		return record
+
+	def write(self, record: Dict[str, Any]) -> None:
+		"""
+		Persist a record from ``capture`` (blocking; run it in a thread).
+
+		``capture`` has already moved past the changes in the record, so when
+		the write fails the next ``capture`` returns a full record instead of a
+		delta that would leave them out.
+
+		Raises:
+		    OSError: The record could not be written.
+		"""
+		try:
+			self._write(record)
+		except OSError:
+			self._force_full = True
+			raise
+
+	def _write(self, record: Dict[str, Any]) -> None:
+		os.makedirs(self.path, exist_ok=True)
+		frame = _encode(record)
+		if record['full']:
+			tmp_path = f'{self.base_path}.tmp'
+			with open(tmp_path, 'wb') as f:
+				f.write(frame)
+				f.flush()
+				os.fsync(f.fileno())
+			os.replace(tmp_path, self.base_path)
+			open(self.delta_path, 'wb').close()
+			return
+		with open(self.delta_path, 'ab') as f:
+			f.write(frame)
+			f.flush()
+			os.fsync(f.fileno())
+
+	def save(self, full: bool = False) -> bool:
+		"""Capture and write in one call (shutdown path). Returns True if a record was written."""
+		record = self.capture(full=full)
+		if record is None:
+			return False
+		self.write(record)
+		return True
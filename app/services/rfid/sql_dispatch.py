@@ -0,0 +1,181 @@
+"""
+SQL dispatch batching tuned for tag streams.
+
+``smartx_rfid``'s SqlDispatcher already groups rows per (connection string,
+query) and runs them with one ``executemany``, keeps one engine per connection
+string and caches the compiled statements. This subclass changes how batches
+are flushed:
+
+- Flush windows start with the first row of a batch. The base loop only
+  flushes when the queue has been idle for the whole interval, so a steady
+  stream below ``batch_size`` rows held its rows until the batch was full.
+- Batches of different connections/queries are sent concurrently (one in flight
+  per key, so rows of a key are still written in order). A slow database no
+  longer delays the others.
+- Backpressure is kept: at most ``max_batches_per_key`` batches of a key exist
+  at once (one sending, the others waiting for it). When a key is at the cap
+  the intake loop waits, the bounded queue fills up and ``enqueue`` blocks or
+  times out as with the base loop, so a slow or down database cannot grow
+  memory without limit.
+- Engines are created the same way everywhere. SQLite gets no pool arguments
+  (the base ``ensure_engine`` passed them). SQL Server over ODBC gets
+  ``fast_executemany``, without which pyodbc sends one round-trip per row.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from smartx_rfid.dispatcher.main import _STOP, SqlDispatcher
+
+
+class _KeyState:
+	"""Batches of one key that are sending or waiting to send."""
+
+	__slots__ = ('lock', 'in_flight', 'released')
+
+	def __init__(self):
+		self.lock = asyncio.Lock()
+		self.in_flight = 0
+		self.released = asyncio.Event()
+
+
+class SqlBatchDispatcher(SqlDispatcher):
+	def __init__(
+		self,
+		batch_size: int = 1000,
+		flush_interval_seconds: float = 0.1,
+		queue_max_size: int = 10_000,
+		max_batches_per_key: int = 2,
+	):
+		"""
+		Args:
+		    batch_size: Rows per executemany.
+		    flush_interval_seconds: Max time a row waits for its batch to fill.
+		    queue_max_size: Rows queued before ``enqueue`` blocks.
+		    max_batches_per_key: Batches of one key sending or waiting at once.
+		"""
+		super().__init__(
+			batch_size=batch_size,
+			flush_interval_seconds=flush_interval_seconds,
+			queue_max_size=queue_max_size,
+		)
+		self._opened: dict[Any, float] = {}  # batch key -> monotonic time of its first row
+		self.max_batches_per_key = max(1, max_batches_per_key)
+		self._keys: dict[Any, _KeyState] = {}  # only keys with batches in flight
+		self._sending: set[asyncio.Task] = set()
+		self.batches_sent = 0
+		self.rows_sent = 0
+		self.backpressure_waits = 0
+
+	# [ ENGINES ]
+	def ensure_engine(self, connection_string: str) -> None:
+		if connection_string not in self._engines:
+			self._create_engine(connection_string)
+
+	def _create_engine(self, connection_string: str):
+		kwargs: dict[str, Any] = {'pool_pre_ping': True}
+		if not connection_string.startswith('sqlite'):
+			kwargs.update({'pool_size': 20, 'max_overflow': 30, 'pool_recycle': 1800})
+		if connection_string.startswith('mssql+aioodbc'):
+			kwargs['fast_executemany'] = True
+		engine = create_async_engine(connection_string, **kwargs)
+		self._engines[connection_string] = engine
+		logging.info(f'[ SQL DISPATCH ] Engine created for {engine.url.render_as_string()}')
+		return engine
+
+	# [ BATCHING ]
+	def _time_to_next_flush(self) -> float:
+		if not self._opened:
+			return self.flush_interval_seconds
+		oldest = min(self._opened.values())
+		return max(0.0, oldest + self.flush_interval_seconds - time.monotonic())
+
+	async def _flush_expired(self) -> None:
+		now = time.monotonic()
+		for key, opened in list(self._opened.items()):
+			if now - opened >= self.flush_interval_seconds:
+				await self._start_flush(key)
+
+	async def _start_flush(self, key) -> None:
+		self._opened.pop(key, None)
+		batch = self._batches.pop(key, None)
+		if not batch:
+			return
+		while True:
+			state = self._keys.get(key)
+			if state is None:
+				state = self._keys[key] = _KeyState()
+			if state.in_flight < self.max_batches_per_key:
+				break
+			self.backpressure_waits += 1
+			state.released.clear()
+			await state.released.wait()  # the intake loop stops reading the queue meanwhile
+		state.in_flight += 1
+		task = asyncio.create_task(self._send(key, state, batch))
+		self._sending.add(task)
+		task.add_done_callback(self._sending.discard)
+
+	async def _loop(self) -> None:
+		while True:
+			try:
+				item = await asyncio.wait_for(self._queue.get(), timeout=self._time_to_next_flush())
+			except asyncio.TimeoutError:
+				await self._flush_expired()
+				continue
+
+			if item is _STOP:
+				self._queue.task_done()
+				await self._flush_all()
+				return
+
+			batch = self._batches.setdefault(item.key, [])
+			if not batch:
+				self._opened[item.key] = time.monotonic()
+			batch.append(item)
+			if len(batch) >= self.batch_size:
+				await self._start_flush(item.key)
+			else:
+				await self._flush_expired()
+
+	async def _flush_all(self) -> None:
+		for key in list(self._batches):
+			await self._start_flush(key)
+		if self._sending:
+			await asyncio.gather(*list(self._sending), return_exceptions=True)
+
+	async def _flush(self, key) -> None:
+		await self._start_flush(key)
+		if self._sending:
+			await asyncio.gather(*list(self._sending), return_exceptions=True)
+
+	async def _send(self, key, state: _KeyState, batch: list) -> None:
+		params_list = [item.params for item in batch]
+		try:
+			async with state.lock:  # one batch in flight per key keeps rows in order
+				start = time.monotonic()
+				try:
+					await self._run_with_retry(
+						lambda: self._execute_many(key.connection_string, key.query, params_list),
+						retry_attempts=key.retry_attempts,
+						backoff_seconds=key.backoff_seconds,
+					)
+					self.batches_sent += 1
+					self.rows_sent += len(params_list)
+					logging.info(
+						f'[ SQL DISPATCH ] {len(params_list)} rows in '
+						f'{time.monotonic() - start:.4f}s | {key.query!r}'
+					)
+				except Exception as e:
+					logging.error(
+						f'[ SQL DISPATCH ] Batch of {len(params_list)} rows failed: {e} | {key.query!r}'
+					)
+		finally:
+			state.in_flight -= 1
+			state.released.set()
+			if state.in_flight == 0 and self._keys.get(key) is state:
+				del self._keys[key]  # templated keys must not accumulate
+			for _ in batch:
+				self._queue.task_done()
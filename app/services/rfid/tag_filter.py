@@ -0,0 +1,252 @@
+"""
+Pre-ingest tag filter: drop stray reads before they reach the TagList.
+
+Built from the ``TAG_FILTER`` setting (plus ``TAG_PREFIX``)::
+
+    {
+        'prefixes': ['3034', 'e200'],  # EPC must start with one of these
+        'exclude_prefixes': ['3034ff'],  # EPC must not start with any of these
+        'rssi_floor': {'default': -75, '1': -60},  # or one number for every antenna
+        'devices': ['portal_1', 'portal_2'],  # device allow-list
+        'antennas': {'portal_1': [1, 2]},  # or a list for every device
+        'epc_regex': '^3034[0-9a-f]{20}$',
+    }
+
+Only the configured rules are compiled into the predicate, cheapest first:
+device, antenna, RSSI, prefixes, regex. Prefix sets are tries walked once over
+the EPC, so the cost depends on the prefix length rather than the number of
+prefixes. Matching is case-insensitive and allocates nothing.
+
+Every drop is counted under the rule that rejected the read. Reads without an
+RSSI pass the RSSI floor; reads without an EPC fail prefix and regex rules.
+The filter runs before the tag validator, so when antenna or RSSI rules are
+configured ``ant`` and ``rssi`` are converted to int the way the validator
+does ("1", -55.0, "-55"); reads where that fails are dropped as ``invalid``.
+Dropped reads never reach the traffic recorder, metrics or integrations.
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, Optional
+
+_END = ''  # key marking the end of a prefix (never an EPC character)
+
+
+class PrefixTrie:
+	"""Set of prefixes, matched case-insensitively in one walk over the value."""
+
+	def __init__(self, prefixes: Iterable[str] = ()):
+		self.root: Dict[str, dict] = {}
+		self.size = 0
+		for prefix in prefixes:
+			self.add(prefix)
+
+	def add(self, prefix: str) -> None:
+		node = self.root
+		for char in prefix.lower():
+			child = node.get(char)
+			if child is None:
+				child = node[char] = {}
+				node[char.upper()] = child  # same node for both cases
+			node = child
+		if _END not in node:
+			node[_END] = {}
+			self.size += 1
+
+	def match(self, value: str) -> bool:
+		"""True if ``value`` starts with one of the prefixes."""
+		node = self.root
+		if _END in node:
+			return True
+		for char in value:
+			node = node.get(char)
+			if node is None:
+				return False
+			if _END in node:
+				return True
+		return False
+
+	def __len__(self) -> int:
+		return self.size
+
+
+def _to_int(value: Any) -> Optional[int]:
+	"""Convert an antenna/RSSI value like TagSchema does; raises ValueError/TypeError."""
+	if value is None or (isinstance(value, int) and not isinstance(value, bool)):
+		return value
+	if isinstance(value, float):
+		return int(value)
+	if isinstance(value, str):
+		value = value.strip()
+		return int(float(value)) if value else None
+	raise TypeError(f'not a number: {value!r}')
+
+
+def _as_list(value: Any, name: str) -> list:
+	if isinstance(value, str):
+		return [value]
+	if not isinstance(value, (list, tuple)):
+		raise ValueError(f'TAG_FILTER {name} must be a string or a list')
+	return list(value)
+
+
+class TagFilter:
+	def __init__(
+		self,
+		prefixes: Optional[Iterable[str]] = None,
+		exclude_prefixes: Optional[Iterable[str]] = None,
+		rssi_floor: float | Dict[str, float] | None = None,
+		devices: Optional[Iterable[str]] = None,
+		antennas: list[int] | Dict[str, list[int]] | None = None,
+		epc_regex: Optional[str] = None,
+		tag_prefix: str | list[str] | None = None,
+	):
+		"""
+		Args:
+		    prefixes: EPC prefixes; a read must match one.
+		    exclude_prefixes: EPC prefixes; a read matching one is dropped.
+		    rssi_floor: Minimum RSSI (dBm), one number or per antenna ({"1": -60, "default": -75}).
+		    devices: Device allow-list.
+		    antennas: Antenna allow-list for every device, or per device ({"portal_1": [1, 2]}).
+		    epc_regex: Pattern the EPC must match from its first character (case-insensitive).
+		    tag_prefix: The ``TAG_PREFIX`` setting, applied like ``prefixes``.
+
+		Raises:
+		    ValueError: Invalid rule value or regex.
+		"""
+		checks: list[tuple[str, Callable[[str, Any, Any, Any], bool]]] = []
+
+		if devices is not None:
+			allowed_devices = frozenset(_as_list(devices, 'devices'))
+			checks.append(('device', lambda device, epc, ant, rssi: device in allowed_devices))
+
+		if antennas is not None:
+			if isinstance(antennas, dict):
+				per_device = {
+					device: frozenset(int(ant) for ant in ants) for device, ants in antennas.items()
+				}
+				checks.append(
+					(
+						'antenna',
+						lambda device, epc, ant, rssi: (
+							device not in per_device or ant in per_device[device]
+						),
+					)
+				)
+			else:
+				allowed_antennas = frozenset(int(ant) for ant in _as_list(antennas, 'antennas'))
+				checks.append(('antenna', lambda device, epc, ant, rssi: ant in allowed_antennas))
+
+		if rssi_floor is not None:
+			if isinstance(rssi_floor, dict):
+				floors = {
+					int(ant): float(floor) for ant, floor in rssi_floor.items() if ant != 'default'
+				}
+				default_floor = rssi_floor.get('default')
+				default_floor = float('-inf') if default_floor is None else float(default_floor)
+				checks.append(
+					(
+						'rssi',
+						lambda device, epc, ant, rssi: (
+							rssi is None or rssi >= floors.get(ant, default_floor)
+						),
+					)
+				)
+			elif isinstance(rssi_floor, (int, float)) and not isinstance(rssi_floor, bool):
+				floor = float(rssi_floor)
+				checks.append(
+					('rssi', lambda device, epc, ant, rssi: rssi is None or rssi >= floor)
+				)
+			else:
+				raise ValueError('TAG_FILTER rssi_floor must be a number or a dict')
+
+		for name, values, keep in (
+			('tag_prefix', tag_prefix, True),
+			('prefix', prefixes, True),
+			('exclude_prefix', exclude_prefixes, False),
+		):
+			if values is None:
+				continue
+			trie = PrefixTrie(_as_list(values, name))
+			if keep:
+				checks.append(
+					(name, lambda device, epc, ant, rssi, t=trie: epc is not None and t.match(epc))
+				)
+			else:
+				checks.append(
+					(name, lambda device, epc, ant, rssi, t=trie: epc is None or not t.match(epc))
+				)
+
+		if epc_regex is not None:
+			try:
+				pattern = re.compile(epc_regex, re.IGNORECASE)
+			except re.error as e:
+				raise ValueError(f'TAG_FILTER epc_regex is invalid: {e}') from e
+			checks.append(
+				(
+					'epc_regex',
+					lambda device, epc, ant, rssi: epc is not None
+					and pattern.match(epc) is not None,
+				)
+			)
+
+		self._checks = tuple(checks)
+		self.rules = [name for name, _ in checks]
+		self.drops: Dict[str, int] = {name: 0 for name in self.rules}
+		self._convert = antennas is not None or rssi_floor is not None
+		if self._convert:
+			self.drops['invalid'] = 0
+		self.accepted = 0
+
+	@classmethod
+	def from_settings(
+		cls, config: Optional[Dict[str, Any]], tag_prefix: str | list[str] | None = None
+	) -> Optional['TagFilter']:
+		"""
+		Build the filter from ``TAG_FILTER`` and ``TAG_PREFIX``.
+
+		Returns:
+		    The filter, or None when no rule is configured.
+
+		Raises:
+		    ValueError: Unknown rule or invalid rule value.
+		"""
+		config = dict(config or {})
+		unknown = set(config) - {
+			'prefixes',
+			'exclude_prefixes',
+			'rssi_floor',
+			'devices',
+			'antennas',
+			'epc_regex',
+		}
+		if unknown:
+			raise ValueError(f'Unknown TAG_FILTER rules: {", ".join(sorted(unknown))}')
+		if not tag_prefix:
+			tag_prefix = None
+		if tag_prefix is None and not any(value is not None for value in config.values()):
+			return None
+		return cls(tag_prefix=tag_prefix, **config)
+
+	def accepts(self, device: str, epc: Optional[str], ant: Any, rssi: Any) -> bool:
+		"""Run the compiled rules; a rejected read is counted under its rule."""
+		if self._convert:
+			try:
+				ant = _to_int(ant)
+				rssi = _to_int(rssi)
+			except (TypeError, ValueError):
+				self.drops['invalid'] += 1
+				return False
+		for name, check in self._checks:
+			if not check(device, epc, ant, rssi):
+				self.drops[name] += 1
+				return False
+		self.accepted += 1
+		return True
+
+	def get_stats(self) -> Dict[str, Any]:
+		return {
+			'rules': self.rules,
+			'accepted': self.accepted,
+			'dropped': dict(self.drops),
+			'dropped_total': sum(self.drops.values()),
+		}
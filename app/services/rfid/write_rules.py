@@ -0,0 +1,90 @@
+"""
+EPC transformation rules for bulk write-list creation.
+
+A rule turns the current EPC of a tag (and its position in the request) into
+the target EPC:
+
+- ``prefix``: replace the first characters with a fixed hex prefix
+  (same behaviour as ``create_write_list_prefix``);
+- ``sgtin``: re-serialize as SGTIN-96, keeping the decoded GTIN (or using a
+  given one) with sequential serial numbers;
+- ``counter``: a hex prefix followed by a zero-padded hex counter, padded to
+  the length of the current EPC.
+"""
+
+from typing import Callable
+
+from pyepc import SGTIN
+
+Transform = Callable[[str, int], str]
+
+
+def prefix_rule(prefix: str) -> Transform:
+	prefix = prefix.lower()
+
+	def transform(epc: str, index: int) -> str:
+		return f'{prefix}{epc[len(prefix):]}'
+
+	return transform
+
+
+def sgtin_rule(
+	start_serial: int = 1,
+	step: int = 1,
+	gtin: str | None = None,
+	company_prefix_len: int = 7,
+) -> Transform:
+	template = (
+		SGTIN.from_sgtin(gtin=gtin, serial_number='0', company_prefix_len=company_prefix_len)
+		if gtin
+		else None
+	)
+
+	def transform(epc: str, index: int) -> str:
+		source = template or SGTIN.decode(epc)  # raises for non-SGTIN EPCs
+		serial = str(start_serial + index * step)
+		return (
+			SGTIN(source.company_prefix, source.indicator, source.item_ref, serial).encode().lower()
+		)
+
+	return transform
+
+
+def counter_rule(prefix: str = '', start: int = 1, step: int = 1) -> Transform:
+	prefix = prefix.lower()
+
+	def transform(epc: str, index: int) -> str:
+		width = max(len(epc) - len(prefix), 1)
+		value = format(start + index * step, 'x')
+		if len(value) > width:
+			raise ValueError(f'Counter {value} does not fit in {width} hex characters')
+		return f'{prefix}{value.zfill(width)}'
+
+	return transform
+
+
+def build_transform(rule: dict) -> Transform:
+	"""
+	Build a transform from a rule description.
+
+	Args:
+	    rule: Dict with 'type' ('prefix', 'sgtin' or 'counter') and the rule parameters.
+
+	Returns:
+	    Function (current_epc, index) -> target_epc
+	"""
+	rule_type = rule.get('type')
+	if rule_type == 'prefix':
+		return prefix_rule(rule['prefix'])
+	if rule_type == 'sgtin':
+		return sgtin_rule(
+			start_serial=rule.get('start', 1),
+			step=rule.get('step', 1),
+			gtin=rule.get('gtin'),
+			company_prefix_len=rule.get('company_prefix_len', 7),
+		)
+	if rule_type == 'counter':
+		return counter_rule(
+			prefix=rule.get('prefix') or '', start=rule.get('start', 1), step=rule.get('step', 1)
+		)
+	raise ValueError(f'Unknown write rule type: {rule_type!r}')
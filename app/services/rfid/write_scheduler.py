@@ -0,0 +1,176 @@
+"""
+Write-list scheduler.
+
+Re-reads of tags that are in the write list are turned into EPC writes here.
+The scheduler replaces the former per-read ``check_target`` task:
+
+- nothing is scheduled while the write list is empty (one dict check per read);
+- the target is looked up by TID in the write list;
+- a TID has at most one write in flight, and is not retried before
+  ``retry_interval`` even if the tag is read again in the meantime;
+- each device has one worker that drains its pending writes in batches, with
+  at most ``concurrency`` writes in flight on that reader;
+- a write is confirmed when the tag is read back with the target EPC, which
+  is what the encoded-per-minute figure counts.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from smartx_rfid.devices import DeviceManager
+from smartx_rfid.schemas.tag import WriteTagValidator
+
+from . import metrics
+
+
+class WriteScheduler:
+	def __init__(
+		self,
+		devices: DeviceManager,
+		write_list: Dict[str, dict],
+		on_confirmed: Callable[[dict], Any],
+		concurrency: int = 2,
+		batch_size: int = 32,
+		retry_interval: float = 0.5,
+		password: str = '00000000',
+	):
+		"""
+		Args:
+		    devices: Device manager used to send the writes.
+		    write_list: Shared write list (TID -> {'target': EPC}).
+		    on_confirmed: Called with the tag when it is read back with its target EPC.
+		    concurrency: Writes in flight per device.
+		    batch_size: Writes taken from a device queue per batch.
+		    retry_interval: Minimum seconds between two writes of the same TID.
+		    password: Access password used for the writes.
+		"""
+		self.devices = devices
+		self.write_list = write_list
+		self.on_confirmed = on_confirmed
+		self.concurrency = max(1, concurrency)
+		self.batch_size = max(1, batch_size)
+		self.retry_interval = retry_interval
+		self.password = password
+
+		self._pending: Dict[str, Dict[str, str]] = {}  # device -> {tid: target}
+		self._workers: Dict[str, asyncio.Task] = {}
+		self._in_flight: set[str] = set()
+		self._last_attempt: Dict[str, float] = {}
+		self._confirmed_times: deque = deque()
+		self.stats = {'scheduled': 0, 'attempts': 0, 'ok': 0, 'errors': 0, 'confirmed': 0}
+
+	# [ READ PATH ]
+	def on_tag(self, device: str, tag: dict) -> None:
+		"""Check a tag read against the write list and schedule a write if needed."""
+		if not self.write_list:
+			return
+		tid = tag.get('tid')
+		entry = self.write_list.get(tid)
+		if entry is None:
+			return
+		target = entry.get('target')
+		if not target:
+			return
+
+		if tag.get('epc') == target:
+			self._confirm(device, tid, tag)
+			return
+
+		if tid in self._in_flight:
+			return
+		last = self._last_attempt.get(tid)
+		if last is not None and time.monotonic() - last < self.retry_interval:
+			return
+		pending = self._pending.setdefault(device, {})
+		if tid in pending:
+			return
+		pending[tid] = target
+		self.stats['scheduled'] += 1
+		self._ensure_worker(device)
+
+	def _confirm(self, device: str, tid: str, tag: dict) -> None:
+		logging.info('Tag %s already has target EPC, removing from write list', tid)
+		metrics.WRITE_RESULTS.labels(device=str(device), result='confirmed').inc()
+		self.stats['confirmed'] += 1
+		self._confirmed_times.append(time.monotonic())
+		self.encoded_per_minute()  # drop timestamps older than the window
+		self._last_attempt.pop(tid, None)
+		tag['target'] = None
+		self.on_confirmed(tag)
+
+	# [ WORKERS ]
+	def _ensure_worker(self, device: str) -> None:
+		worker = self._workers.get(device)
+		if worker is None or worker.done():
+			self._workers[device] = metrics.create_tracked_task('write', self._run_device(device))
+
+	async def _run_device(self, device: str) -> None:
+		semaphore = asyncio.Semaphore(self.concurrency)
+		pending = self._pending.setdefault(device, {})
+		while pending:
+			batch = []
+			for tid in list(pending)[: self.batch_size]:
+				target = pending.pop(tid)
+				if self.write_list.get(tid, {}).get('target') != target:
+					continue  # removed or retargeted while waiting
+				self._in_flight.add(tid)
+				batch.append((tid, target))
+			await asyncio.gather(*(self._write(device, semaphore, *item) for item in batch))
+
+	async def _write(self, device: str, semaphore: asyncio.Semaphore, tid: str, target: str):
+		async with semaphore:
+			metrics.WRITE_ATTEMPTS.labels(device=device).inc()
+			self.stats['attempts'] += 1
+			try:
+				success, msg = await self.devices.write_epc(
+					device_name=device,
+					write_tag=WriteTagValidator(
+						target_identifier='tid',
+						target_value=tid,
+						new_epc=target,
+						password=self.password,
+					),
+				)
+			except Exception as e:
+				success, msg = False, str(e)
+			finally:
+				self._in_flight.discard(tid)
+				self._last_attempt[tid] = time.monotonic()
+		if success:
+			self.stats['ok'] += 1
+		else:
+			self.stats['errors'] += 1
+			logging.warning('Write %s -> %s on %s failed: %s', tid, target, device, msg)
+		metrics.WRITE_RESULTS.labels(device=device, result='ok' if success else 'error').inc()
+
+	# [ LIST CHANGES ]
+	def discard(self, tid: Optional[str] = None) -> None:
+		"""Forget pending writes for *tid* (or for every TID when None)."""
+		if tid is None:
+			for pending in self._pending.values():
+				pending.clear()
+			self._last_attempt.clear()
+			return
+		for pending in self._pending.values():
+			pending.pop(tid, None)
+		self._last_attempt.pop(tid, None)
+
+	# [ STATS ]
+	def encoded_per_minute(self) -> int:
+		"""Tags confirmed with their target EPC during the last 60 seconds."""
+		limit = time.monotonic() - 60
+		while self._confirmed_times and self._confirmed_times[0] < limit:
+			self._confirmed_times.popleft()
+		return len(self._confirmed_times)
+
+	def get_stats(self) -> Dict[str, Any]:
+		return {
+			**self.stats,
+			'write_list_size': len(self.write_list),
+			'pending': sum(len(pending) for pending in self._pending.values()),
+			'in_flight': len(self._in_flight),
+			'encoded_per_minute': self.encoded_per_minute(),
+		}
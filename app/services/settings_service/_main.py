@@ -3,16 +3,36 @@ import os
 from pathlib import Path
 
 from app.core import settings
-from app.core import EXAMPLE_PATH, FILES_PATH
+from app.core import DEVICES_PATH, DISPATCHER_PATH, EXAMPLE_PATH, FILES_PATH
 import asyncio
+import logging
 from typing import Any, Dict, Union
 from smartx_rfid.utils import delayed_function
+from app.services import rfid_manager
 from app.services.tray import tray_manager
+from .reload import ConfigReloader
+
+# Folders applied by hot reload; any other change in FILES_PATH needs a restart
+HOT_RELOAD_DIRS = (Path(DEVICES_PATH).name, Path(DISPATCHER_PATH).name)
 
 
 class SettingsService:
 	def __init__(self):
 		self.has_changes: bool = False
+		self.reloader = ConfigReloader(devices_path=DEVICES_PATH, dispatchers_path=DISPATCHER_PATH)
+
+	async def hot_reload(self) -> Dict[str, Any]:
+		"""Reconnect changed devices and rebuild dispatchers without restarting (tags are kept)."""
+		return await self.reloader.reload(
+			devices=rfid_manager.devices, dispatcher=rfid_manager.controller.dispatcher
+		)
+
+	async def _hot_reload_or_restart(self):
+		try:
+			await self.hot_reload()
+		except Exception as e:
+			logging.error(f'Hot reload failed, restarting application: {e}')
+			await delayed_function(tray_manager.restart_application, 1)
 
 	def update_settings(self, data: dict):
 		settings.load(data)
@@ -83,12 +103,23 @@ class SettingsService:
 
 		return result
 
-	def import_config(self, data: dict, purge: bool = True) -> tuple[bool, str | None]:
+	def _restart_scope(self) -> Dict[str, Any]:
+		"""Backup content outside the hot-reloadable folders."""
+		backup = self.backup_config()
+		return {key: value for key, value in backup.items() if key not in HOT_RELOAD_DIRS}
+
+	def import_config(
+		self, data: dict, purge: bool = True, hot_reload: bool = True
+	) -> tuple[bool, str | None]:
 		"""Write backup `data` into `FILES_PATH` recursively.
 
 		If `purge` is True (default), delete all existing `.json` files under
 		`FILES_PATH` before writing the incoming data. Returns (True, None)
 		on success or (False, error_message) on failure.
+
+		If only device and dispatcher files changed and `hot_reload` is True,
+		the changes are applied in place (see ConfigReloader); otherwise the
+		application is restarted.
 		"""
 		try:
 
@@ -113,6 +144,8 @@ class SettingsService:
 			if not isinstance(data, dict):
 				return False, 'Invalid data for import: expected dict'
 
+			before = self._restart_scope()
+
 			# purge existing json files if requested
 			if purge and root.exists() and root.is_dir():
 				for existing in root.rglob('*.json'):
@@ -124,8 +157,11 @@ class SettingsService:
 
 			_write_node(data, root)
 
-			# mark changes and reload if necessary
-			asyncio.create_task(delayed_function(tray_manager.restart_application, 1))
+			# apply in place when possible, restart otherwise
+			if hot_reload and self._restart_scope() == before:
+				asyncio.create_task(self._hot_reload_or_restart())
+			else:
+				asyncio.create_task(delayed_function(tray_manager.restart_application, 1))
 
 			return True, None
 		except Exception as e:
@@ -0,0 +1,125 @@
+"""
+Hot reload of device and dispatcher configurations.
+
+The reloader keeps the last applied content of ``devices/*.json`` and
+``dispatchers/*.json``. A reload compares it with the files on disk and only
+touches what changed: changed or new devices are reloaded one by one (the other
+readers stay connected), removed devices are shut down, and the dispatcher
+routing is rebuilt only when a dispatcher file changed. The TagList, write list
+and running jobs are not affected.
+"""
+
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from smartx_rfid.devices import DeviceManager
+from smartx_rfid.dispatcher import EventDispatcher
+
+
+def read_json_dir(path: str) -> Dict[str, Any]:
+	"""Content of every ``*.json`` file in *path*, by name without extension (raw text if invalid)."""
+	content: Dict[str, Any] = {}
+	root = Path(path)
+	if not root.is_dir():
+		return content
+	for file in root.glob('*.json'):
+		try:
+			text = file.read_text(encoding='utf-8')
+		except OSError:
+			continue
+		try:
+			content[file.stem] = json.loads(text)
+		except ValueError:
+			content[file.stem] = text
+	return content
+
+
+def diff_configs(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, list[str]]:
+	"""Names added, changed and removed between two ``read_json_dir`` results."""
+	return {
+		'added': sorted(new.keys() - old.keys()),
+		'changed': sorted(name for name in new.keys() & old.keys() if new[name] != old[name]),
+		'removed': sorted(old.keys() - new.keys()),
+	}
+
+
+def dir_signature(path: str) -> frozenset:
+	"""Cheap change marker for the watcher: (name, mtime, size) of every JSON file."""
+	root = Path(path)
+	if not root.is_dir():
+		return frozenset()
+	signature = set()
+	for file in root.glob('*.json'):
+		try:
+			stat = file.stat()
+		except OSError:
+			continue
+		signature.add((file.name, stat.st_mtime_ns, stat.st_size))
+	return frozenset(signature)
+
+
+class ConfigReloader:
+	def __init__(self, devices_path: str, dispatchers_path: str):
+		"""
+		Args:
+		    devices_path: Directory with the device JSON files.
+		    dispatchers_path: Directory with the dispatcher JSON files.
+		"""
+		self.devices_path = devices_path
+		self.dispatchers_path = dispatchers_path
+		# content loaded at startup is the baseline for the first reload
+		self._devices = read_json_dir(devices_path)
+		self._dispatchers = read_json_dir(dispatchers_path)
+		self._lock = asyncio.Lock()
+		self.last_result: Optional[Dict[str, Any]] = None
+
+	def signature(self) -> tuple:
+		return dir_signature(self.devices_path), dir_signature(self.dispatchers_path)
+
+	async def reload(self, devices: DeviceManager, dispatcher: EventDispatcher) -> Dict[str, Any]:
+		"""
+		Apply the device and dispatcher files that changed since the last reload.
+
+		Returns:
+		    Names added/changed/removed for devices and dispatchers, and the device errors
+		"""
+		async with self._lock:
+			new_devices = await asyncio.to_thread(read_json_dir, self.devices_path)
+			new_dispatchers = await asyncio.to_thread(read_json_dir, self.dispatchers_path)
+			device_diff = diff_configs(self._devices, new_devices)
+			dispatcher_diff = diff_configs(self._dispatchers, new_dispatchers)
+			errors: Dict[str, str] = {}
+
+			for name in device_diff['removed']:
+				device = devices.get_device(name)
+				if device is not None:
+					# the file is already gone, so only the in-memory device is shut down
+					await devices._shutdown_device(device)
+
+			for name in device_diff['added'] + device_diff['changed']:
+				data = new_devices[name]
+				if not isinstance(data, dict):
+					errors[name] = 'Invalid JSON'
+					continue
+				success, error = await devices.update_device_config(name, data)
+				if not success:
+					errors[name] = error
+
+			if any(dispatcher_diff.values()):
+				# unchanged SQL connections keep their pool; only stale engines are disposed
+				await asyncio.to_thread(dispatcher.reload_dispatches)
+
+			# re-read: update_device_config writes the normalised config back to disk
+			self._devices = await asyncio.to_thread(read_json_dir, self.devices_path)
+			self._dispatchers = new_dispatchers
+
+			self.last_result = {
+				'devices': device_diff,
+				'dispatchers': dispatcher_diff,
+				'errors': errors,
+			}
+			logging.info(f'[ CONFIG RELOAD ] {self.last_result}')
+			return self.last_result
@@ -0,0 +1,5 @@
+from ._main import ReaderEmulator
+from .capture import list_segments, read_segment
+from .r700 import R700Emulator, R700WebhookEmulator, inventory_status_event, tag_inventory_event
+from .tags import ReplayTags, SyntheticTags, load_recording
+from .x714 import X714Emulator, X714SerialEmulator, X714TcpEmulator
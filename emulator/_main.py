@@ -0,0 +1,114 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from .r700 import R700Emulator, R700WebhookEmulator
+from .x714 import X714SerialEmulator, X714TcpEmulator
+
+
+class ReaderEmulator:
+	def __init__(self, source_factory: Callable[[], Any], start_reading: bool = False):
+		"""
+		Run many virtual readers in one event loop.
+
+		Args:
+		    source_factory: Returns a new tag source per reader (each reader reads its own field).
+		    start_reading: Readers stream tags before the host asks for it.
+		"""
+		self.source_factory = source_factory
+		self.start_reading = start_reading
+		self.readers: list[Any] = []
+		self._client: Optional[httpx.AsyncClient] = None
+
+	# [ READERS ]
+	def add_x714_tcp(self, count: int, host: str = '127.0.0.1', base_port: int = 0) -> None:
+		for i in range(count):
+			self.readers.append(
+				X714TcpEmulator(
+					name=f'EMU-X714-{len(self.readers) + 1:03d}',
+					source=self.source_factory(),
+					host=host,
+					port=base_port + i if base_port else 0,
+					start_reading=self.start_reading,
+				)
+			)
+
+	def add_x714_serial(self, count: int) -> None:
+		for _ in range(count):
+			self.readers.append(
+				X714SerialEmulator(
+					name=f'EMU-X714-{len(self.readers) + 1:03d}',
+					source=self.source_factory(),
+					start_reading=self.start_reading,
+				)
+			)
+
+	def add_r700(
+		self,
+		count: int,
+		host: str = '127.0.0.1',
+		base_port: int = 0,
+		certfile: Optional[str] = None,
+		keyfile: Optional[str] = None,
+	) -> None:
+		for i in range(count):
+			self.readers.append(
+				R700Emulator(
+					name=f'EMU-R700-{len(self.readers) + 1:03d}',
+					source=self.source_factory(),
+					host=host,
+					port=base_port + i if base_port else 0,
+					certfile=certfile,
+					keyfile=keyfile,
+					start_reading=self.start_reading,
+				)
+			)
+
+	def add_r700_webhook(self, count: int, url: str) -> None:
+		if self._client is None:
+			self._client = httpx.AsyncClient(limits=httpx.Limits(max_connections=max(10, count)))
+		for _ in range(count):
+			self.readers.append(
+				R700WebhookEmulator(
+					name=f'EMU-R700-{len(self.readers) + 1:03d}',
+					url=url,
+					source=self.source_factory(),
+					client=self._client,
+				)
+			)
+
+	# [ LIFECYCLE ]
+	async def start(self) -> None:
+		await asyncio.gather(*(reader.start() for reader in self.readers))
+		logging.info(f'[ EMULATOR ] {len(self.readers)} readers started')
+
+	async def stop(self) -> None:
+		await asyncio.gather(*(reader.stop() for reader in self.readers), return_exceptions=True)
+		if self._client is not None:
+			await self._client.aclose()
+			self._client = None
+
+	def get_stats(self) -> Dict[str, Any]:
+		readers = [reader.get_stats() for reader in self.readers]
+		return {
+			'readers': len(readers),
+			'tags_sent': sum(reader['tags_sent'] for reader in readers),
+			'per_reader': readers,
+		}
+
+	def write_device_configs(self, path: str) -> list[str]:
+		"""Write one device JSON per listening reader (webhook readers need none)."""
+		os.makedirs(path, exist_ok=True)
+		written = []
+		for reader in self.readers:
+			if not hasattr(reader, 'device_config'):
+				continue
+			file_path = os.path.join(path, f'{reader.name}.json')
+			with open(file_path, 'w', encoding='utf-8') as f:
+				json.dump(reader.device_config(), f, indent=4)
+			written.append(file_path)
+		return written
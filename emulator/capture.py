@@ -0,0 +1,42 @@
+"""
+Capture segment format shared by the traffic recorder and the emulator.
+
+A capture is a directory of ``segment-NNNNN.ndjson.gz`` files, each a
+multi-member gzip of NDJSON records. This module only reads the format and
+imports nothing from ``app``, so the emulator can load captures without
+starting the application services.
+"""
+
+import gzip
+import json
+import logging
+import os
+from typing import Any, Dict
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.ndjson.gz'
+
+
+def list_segments(capture_path: str) -> list[str]:
+	"""Segment files of a capture, oldest first (a single file is its own segment)."""
+	if os.path.isfile(capture_path):
+		return [capture_path]
+	return [
+		os.path.join(capture_path, name)
+		for name in sorted(os.listdir(capture_path))
+		if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+	]
+
+
+def read_segment(path: str) -> list[Dict[str, Any]]:
+	opener = gzip.open if path.endswith('.gz') else open
+	records = []
+	try:
+		with opener(path, 'rt', encoding='utf-8') as f:
+			for line in f:
+				if line.strip():
+					records.append(json.loads(line))
+	except EOFError:
+		# last member cut short (power loss while writing): keep what was complete
+		logging.warning(f'[ RECORDER ] Truncated segment {path}')
+	return records
@@ -0,0 +1,263 @@
+"""
+Virtual Impinj R700 readers (IoT device interface).
+
+``R700Emulator`` serves the REST endpoints used by ``smartx_rfid``'s R700
+driver, including the NDJSON ``/data/stream``. The driver always connects with
+``https://`` (certificates are not verified), so the server needs a certificate
+and key to be reachable by a real X-BRIDGE device; over plain HTTP it is still
+usable with any HTTP client.
+
+``R700WebhookEmulator`` pushes the same events to a webhook instead, batched
+the way the reader's HTTP stream output does (``POST /api/v1/receive/r700``).
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from .tags import SyntheticTags
+
+
+def tag_inventory_event(tag: Dict[str, Any], hostname: Optional[str] = None) -> Dict[str, Any]:
+	"""R700 ``tagInventory`` event for a tag dict (RSSI in cdBm, like the reader)."""
+	event = {
+		'eventType': 'tagInventory',
+		'tagInventoryEvent': {
+			'epcHex': tag['epc'],
+			'tidHex': tag.get('tid'),
+			'antennaPort': tag.get('ant', 1),
+			'peakRssiCdbm': int(tag.get('rssi') or 0) * 100,
+		},
+	}
+	if hostname is not None:
+		event['hostname'] = hostname
+	return event
+
+
+def inventory_status_event(running: bool, hostname: Optional[str] = None) -> Dict[str, Any]:
+	event = {
+		'eventType': 'inventoryStatus',
+		'inventoryStatusEvent': {'inventoryStatus': 'running' if running else 'idle'},
+	}
+	if hostname is not None:
+		event['hostname'] = hostname
+	return event
+
+
+class R700Emulator:
+	def __init__(
+		self,
+		name: str,
+		source: Any = None,
+		host: str = '127.0.0.1',
+		port: int = 0,
+		certfile: Optional[str] = None,
+		keyfile: Optional[str] = None,
+		start_reading: bool = False,
+	):
+		"""
+		Args:
+		    name: Serial number reported by ``GET /system``.
+		    source: Tag source (SyntheticTags or ReplayTags).
+		    host: Listen address.
+		    port: Listen port (0 picks a free one).
+		    certfile: TLS certificate, required by the X-BRIDGE R700 driver.
+		    keyfile: TLS key.
+		    start_reading: Stream tags before ``/profiles/inventory/start``.
+		"""
+		self.name = name
+		self.source = source or SyntheticTags()
+		self.host = host
+		self.port = port
+		self.certfile = certfile
+		self.keyfile = keyfile
+		self.reading = start_reading
+		self.tags_sent = 0
+		self.clients = 0
+		self.app = self.create_app()
+		self._streams: set[asyncio.Queue] = set()
+		self._pump: Optional[asyncio.Task] = None
+		self._server: Optional[uvicorn.Server] = None
+		self._serve: Optional[asyncio.Task] = None
+
+	# [ REST API ]
+	def create_app(self) -> FastAPI:
+		app = FastAPI(title=f'R700 emulator {self.name}')
+		no_content = Response(status_code=204)
+
+		@app.put('/api/v1/system/rfid/interface')
+		async def set_interface():
+			return no_content
+
+		@app.get('/api/v1/system/image')
+		async def get_image():
+			return {'primaryFirmware': '8.4.1.240'}
+
+		@app.get('/api/v1/system')
+		async def get_system():
+			return {'serialNumber': self.name, 'productModel': 'R700'}
+
+		@app.get('/api/v1/status')
+		async def get_status():
+			return {'status': 'running' if self.reading else 'idle'}
+
+		@app.post('/api/v1/profiles/inventory/start')
+		async def start_inventory():
+			self.set_reading(True)
+			return no_content
+
+		@app.post('/api/v1/profiles/stop')
+		async def stop_inventory():
+			self.set_reading(False)
+			return no_content
+
+		@app.put('/api/v1/device/gpos')
+		async def set_gpos():
+			return no_content
+
+		@app.post('/api/v1/profiles/inventory/tag-access')
+		async def tag_access(request: Request):
+			await request.body()
+			return no_content
+
+		@app.get('/api/v1/data/stream')
+		async def data_stream():
+			return StreamingResponse(self._stream(), media_type='application/x-ndjson')
+
+		@app.exception_handler(Exception)
+		async def on_error(request: Request, exc: Exception):
+			return JSONResponse(status_code=500, content={'message': str(exc)})
+
+		return app
+
+	def set_reading(self, reading: bool) -> None:
+		if reading != self.reading:
+			self.reading = reading
+			self._broadcast([inventory_status_event(reading)])
+
+	def _broadcast(self, events: list[Dict[str, Any]]) -> bool:
+		if not self._streams:
+			return False
+		chunk = ''.join(json.dumps(event) + '\n' for event in events).encode()
+		for queue in self._streams:
+			if queue.full():  # slow client: drop the oldest chunk
+				queue.get_nowait()
+			queue.put_nowait(chunk)
+		return True
+
+	async def _stream(self):
+		queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+		self._streams.add(queue)
+		self.clients += 1
+		try:
+			while True:
+				yield await queue.get()
+		finally:
+			self._streams.discard(queue)
+
+	# [ LIFECYCLE ]
+	async def _run_pump(self) -> None:
+		async for batch in self.source.batches():
+			if self.reading and self._broadcast([tag_inventory_event(tag) for tag in batch]):
+				self.tags_sent += len(batch)
+
+	async def start(self) -> None:
+		self._pump = asyncio.create_task(self._run_pump())
+		config = uvicorn.Config(
+			self.app,
+			host=self.host,
+			port=self.port,
+			ssl_certfile=self.certfile,
+			ssl_keyfile=self.keyfile,
+			log_level='warning',
+			lifespan='off',
+		)
+		self._server = uvicorn.Server(config)
+		self._serve = asyncio.create_task(self._server.serve())
+		while not self._server.started:
+			if self._serve.done():
+				self._serve.result()  # raise the startup error
+			await asyncio.sleep(0.01)
+		self.port = self._server.servers[0].sockets[0].getsockname()[1]
+
+	async def stop(self) -> None:
+		if self._pump is not None:
+			self._pump.cancel()
+			await asyncio.gather(self._pump, return_exceptions=True)
+		if self._server is not None:
+			self._server.should_exit = True
+			self._server.force_exit = True  # open /data/stream responses never finish
+			await asyncio.gather(self._serve, return_exceptions=True)
+
+	def get_stats(self) -> Dict[str, Any]:
+		return {
+			'name': self.name,
+			'reading': self.reading,
+			'tags_sent': self.tags_sent,
+			'clients': self.clients,
+		}
+
+	def device_config(self) -> Dict[str, Any]:
+		"""Device JSON for config/devices pointing to this reader."""
+		return {'READER': 'R700_IOT', 'IP': f'{self.host}:{self.port}', 'START_READING': True}
+
+
+class R700WebhookEmulator:
+	def __init__(
+		self,
+		name: str,
+		url: str,
+		source: Any = None,
+		timeout: float = 5.0,
+		client: Optional[httpx.AsyncClient] = None,
+	):
+		"""
+		Args:
+		    name: Hostname sent with every event.
+		    url: Webhook URL, e.g. ``http://localhost:8000/api/v1/receive/r700``.
+		    source: Tag source (SyntheticTags or ReplayTags).
+		    timeout: Request timeout in seconds.
+		    client: Shared HTTP client (one connection pool for many readers).
+		"""
+		self.name = name
+		self.url = url
+		self.source = source or SyntheticTags()
+		self.timeout = timeout
+		self.reading = True
+		self.tags_sent = 0
+		self.errors = 0
+		self._client = client
+		self._own_client = client is None
+		self._pump: Optional[asyncio.Task] = None
+
+	async def _run_pump(self) -> None:
+		async for batch in self.source.batches():
+			events = [tag_inventory_event(tag, hostname=self.name) for tag in batch]
+			try:
+				response = await self._client.post(self.url, json=events, timeout=self.timeout)
+				response.raise_for_status()
+				self.tags_sent += len(batch)
+			except httpx.HTTPError as e:
+				self.errors += 1
+				logging.warning(f'[ EMULATOR ] {self.name} - webhook failed: {e}')
+
+	async def start(self) -> None:
+		if self._client is None:
+			self._client = httpx.AsyncClient()
+		self._pump = asyncio.create_task(self._run_pump())
+
+	async def stop(self) -> None:
+		if self._pump is not None:
+			self._pump.cancel()
+			await asyncio.gather(self._pump, return_exceptions=True)
+		if self._own_client and self._client is not None:
+			await self._client.aclose()
+
+	def get_stats(self) -> Dict[str, Any]:
+		return {'name': self.name, 'tags_sent': self.tags_sent, 'errors': self.errors}
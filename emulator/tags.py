@@ -0,0 +1,140 @@
+"""
+Tag sources for the reader emulator.
+
+A source yields batches of tag dicts (``epc``, ``tid``, ``ant``, ``rssi``) at
+its own pace. Readers format the batches in their wire protocol, so one source
+type drives every emulated reader model.
+
+Recorded sessions are NDJSON files (optionally ``.gz``) with one record per
+line: ``{"t": seconds, "device": name, "event_type": "tag", "data": {...}}``,
+or capture directories written by the traffic recorder. Records of other event
+types are ignored.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from .capture import list_segments, read_segment
+
+
+class SyntheticTags:
+	def __init__(
+		self,
+		rate: float = 100.0,
+		population: int = 1000,
+		antennas: int = 4,
+		rssi: tuple[int, int] = (-75, -40),
+		epc_prefix: str = '3034',
+		seed: Optional[int] = None,
+		tick: float = 0.01,
+	):
+		"""
+		Random reads from a fixed tag population (repeated reads, like a real portal).
+
+		Args:
+		    rate: Reads per second.
+		    population: Distinct tags in the field.
+		    antennas: Antenna ports used (1..antennas).
+		    rssi: RSSI range in dBm.
+		    epc_prefix: Hex prefix of the generated EPCs (24 hex characters in total).
+		    seed: Random seed, for reproducible storms.
+		    tick: Seconds between batches.
+		"""
+		self.rate = rate
+		self.antennas = max(1, antennas)
+		self.rssi = rssi
+		self.tick = tick
+		self._random = random.Random(seed)
+		width = 24 - len(epc_prefix)
+		self.population = [
+			(f'{epc_prefix}{i:0{width}x}', f'e2801191{i:016x}') for i in range(max(1, population))
+		]
+
+	async def batches(self) -> AsyncIterator[list[Dict[str, Any]]]:
+		pick = self._random.choice
+		low, high = self.rssi
+		due = 0.0
+		last = time.monotonic()
+		while True:
+			await asyncio.sleep(self.tick)
+			now = time.monotonic()
+			due += (now - last) * self.rate
+			last = now
+			count = int(due)
+			if not count:
+				continue
+			due -= count
+			batch = []
+			for _ in range(count):
+				epc, tid = pick(self.population)
+				batch.append(
+					{
+						'epc': epc,
+						'tid': tid,
+						'ant': self._random.randint(1, self.antennas),
+						'rssi': self._random.randint(low, high),
+					}
+				)
+			yield batch
+
+
+def load_recording(path: str) -> list[Dict[str, Any]]:
+	"""Tag records of a recorded session (NDJSON file or traffic capture directory), by time."""
+	records = [
+		record
+		for segment in list_segments(path)
+		for record in read_segment(segment)
+		if record.get('event_type', 'tag') == 'tag' and isinstance(record.get('data'), dict)
+	]
+	records.sort(key=lambda record: record.get('t', 0))
+	return records
+
+
+class ReplayTags:
+	def __init__(
+		self,
+		records: list[Dict[str, Any]],
+		speed: float = 1.0,
+		loop: bool = False,
+		max_batch: int = 1000,
+	):
+		"""
+		Replay recorded tag reads with their original timing.
+
+		Args:
+		    records: Records from ``load_recording``.
+		    speed: Time scale (2 = twice as fast); 0 replays as fast as possible.
+		    loop: Start again from the beginning at the end of the recording.
+		    max_batch: Maximum reads per batch.
+		"""
+		self.records = records
+		self.speed = speed
+		self.loop = loop
+		self.max_batch = max_batch
+
+	async def batches(self) -> AsyncIterator[list[Dict[str, Any]]]:
+		while True:
+			if not self.records:
+				return
+			start = time.monotonic()
+			origin = self.records[0].get('t', 0)
+			batch: list[Dict[str, Any]] = []
+			for record in self.records:
+				if self.speed > 0:
+					delay = (record.get('t', 0) - origin) / self.speed - (time.monotonic() - start)
+					if delay > 0:
+						if batch:
+							yield batch
+							batch = []
+						await asyncio.sleep(delay)
+				batch.append(record['data'])
+				if len(batch) >= self.max_batch:
+					yield batch
+					batch = []
+					await asyncio.sleep(0)
+			if batch:
+				yield batch
+			if not self.loop:
+				return
@@ -0,0 +1,207 @@
+"""
+Virtual X714 readers (TCP and serial).
+
+The emulator speaks the line protocol of the X714 firmware as used by
+``smartx_rfid``'s X714 driver: commands such as ``#READ:ON``, ``#get_info`` and
+``#CLEAR`` are answered like the reader does, and while reading, tags are sent
+as ``#T+@epc|tid|ant|rssi`` lines. The serial variant exposes a pseudo-terminal
+(POSIX only) whose path goes in the device ``port`` field.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from .tags import SyntheticTags
+
+
+class X714Emulator:
+	def __init__(self, name: str, source: Any, start_reading: bool = False):
+		"""
+		Args:
+		    name: Reader name (answered to ``#get_info``).
+		    source: Tag source (SyntheticTags or ReplayTags).
+		    start_reading: Send tags without waiting for ``#READ:ON``.
+		"""
+		self.name = name
+		self.source = source
+		self.reading = start_reading
+		self.tags_sent = 0
+		self.commands = 0
+		self._pump: Optional[asyncio.Task] = None
+
+	# [ PROTOCOL ]
+	@staticmethod
+	def format_tags(batch: list[Dict[str, Any]]) -> bytes:
+		return ''.join(
+			f"#T+@{tag['epc']}|{tag.get('tid') or ''}|{tag.get('ant', 1)}|{abs(int(tag.get('rssi') or 0))}\n"
+			for tag in batch
+		).encode()
+
+	def handle_command(self, line: str) -> list[str]:
+		"""Apply one command and return the reader answers."""
+		self.commands += 1
+		lower = line.strip().lower()
+		if lower == 'ping':
+			return ['#PONG']
+		if lower.startswith('#read:'):
+			self.reading = lower.endswith('on')
+			return [f"#READ:{'ON' if self.reading else 'OFF'}"]
+		if lower.startswith('#start_reading:'):
+			self.reading = lower.endswith('on')
+			return []
+		if lower == '#get_info':
+			return [f'#NAME:{self.name}']
+		if lower == '#clear':
+			return ['#TAGS_CLEARED']
+		if lower == '#setup_reader':
+			return ['#SETUP_DONE']
+		return []  # settings, GPO and write commands are accepted silently
+
+	# [ TRANSPORT ]
+	def send(self, data: bytes) -> bool:
+		"""Write to the connected host; False when nothing was sent."""
+		raise NotImplementedError
+
+	async def _run_pump(self) -> None:
+		async for batch in self.source.batches():
+			if self.reading and self.send(self.format_tags(batch)):
+				self.tags_sent += len(batch)
+
+	def start_pump(self) -> None:
+		if self._pump is None or self._pump.done():
+			self._pump = asyncio.create_task(self._run_pump())
+
+	async def stop(self) -> None:
+		if self._pump is not None:
+			self._pump.cancel()
+			await asyncio.gather(self._pump, return_exceptions=True)
+
+	def get_stats(self) -> Dict[str, Any]:
+		return {
+			'name': self.name,
+			'reading': self.reading,
+			'tags_sent': self.tags_sent,
+			'commands': self.commands,
+		}
+
+
+class X714TcpEmulator(X714Emulator):
+	def __init__(
+		self,
+		name: str,
+		source: Any = None,
+		host: str = '127.0.0.1',
+		port: int = 0,
+		start_reading: bool = False,
+	):
+		super().__init__(name, source or SyntheticTags(), start_reading)
+		self.host = host
+		self.port = port
+		self._server: Optional[asyncio.AbstractServer] = None
+		self._writers: set[asyncio.StreamWriter] = set()
+
+	async def start(self) -> None:
+		self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+		self.port = self._server.sockets[0].getsockname()[1]
+		self.start_pump()
+
+	async def stop(self) -> None:
+		await super().stop()
+		if self._server is not None:
+			self._server.close()
+			for writer in list(self._writers):
+				writer.close()
+			await self._server.wait_closed()
+
+	def send(self, data: bytes) -> bool:
+		for writer in list(self._writers):
+			# a client that stops reading is dropped instead of buffering without bound
+			if writer.transport.get_write_buffer_size() > 4 * 1024 * 1024:
+				writer.close()
+				self._writers.discard(writer)
+				continue
+			writer.write(data)
+		return bool(self._writers)
+
+	async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+		self._writers.add(writer)
+		try:
+			while line := await reader.readline():
+				answers = self.handle_command(line.decode(errors='ignore'))
+				if answers:
+					writer.write(''.join(f'{answer}\n' for answer in answers).encode())
+		except (ConnectionError, asyncio.IncompleteReadError):
+			pass
+		finally:
+			self._writers.discard(writer)
+			writer.close()
+
+	def device_config(self) -> Dict[str, Any]:
+		"""Device JSON for config/devices pointing to this reader."""
+		return {
+			'READER': 'X714',
+			'CONNECTION_TYPE': 'TCP',
+			'IP': self.host,
+			'TCP_PORT': self.port,
+			'START_READING': True,
+		}
+
+
+class X714SerialEmulator(X714Emulator):
+	"""X714 on a pseudo-terminal; configure the device with ``PORT`` = ``self.path``."""
+
+	def __init__(self, name: str, source: Any = None, start_reading: bool = False):
+		super().__init__(name, source or SyntheticTags(), start_reading)
+		self.path: Optional[str] = None
+		self._master: Optional[int] = None
+		self._slave: Optional[int] = None
+		self._buffer = b''
+
+	async def start(self) -> None:
+		import tty  # POSIX only
+
+		self._master, self._slave = os.openpty()
+		tty.setraw(self._slave)  # no echo or newline translation
+		os.set_blocking(self._master, False)
+		self.path = os.ttyname(self._slave)
+		asyncio.get_running_loop().add_reader(self._master, self._on_readable)
+		self.start_pump()
+
+	async def stop(self) -> None:
+		await super().stop()
+		if self._master is not None:
+			asyncio.get_running_loop().remove_reader(self._master)
+			os.close(self._master)
+			os.close(self._slave)
+			self._master = self._slave = None
+
+	def _on_readable(self) -> None:
+		try:
+			self._buffer += os.read(self._master, 4096)
+		except OSError:
+			return
+		while b'\n' in self._buffer:
+			line, self._buffer = self._buffer.split(b'\n', 1)
+			answers = self.handle_command(line.decode(errors='ignore'))
+			if answers:
+				self.send(''.join(f'{answer}\n' for answer in answers).encode())
+
+	def send(self, data: bytes) -> bool:
+		try:
+			os.write(self._master, data)
+			return True
+		except BlockingIOError:
+			logging.debug(f'{self.name} - serial buffer full, batch dropped')
+			return False
+		except OSError:
+			return False
+
+	def device_config(self) -> Dict[str, Any]:
+		return {
+			'READER': 'X714',
+			'CONNECTION_TYPE': 'SERIAL',
+			'PORT': self.path,
+			'START_READING': True,
+		}
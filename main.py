@@ -19,6 +19,7 @@ import threading
 import webbrowser
 import uvicorn
 from app.core import settings, SWAGGER_PATH
+from app.core.server import server_options
 
 # APP
 from app.core.build_app import create_application
@@ -28,6 +29,7 @@ from smartx_rfid.utils.path import get_frozen_path
 
 # Tray
 from app.services.tray import tray_manager  # noqa: F401
+from app.services import rfid_manager
 
 logging.info('Application starting...')
 
@@ -54,10 +56,26 @@ if __name__ == '__main__':
 		# Delay opening browser to allow server startup
 		threading.Timer(1.0, open_browser).start()
 
-	# Start uvicorn server
+	# Server profile (loop, HTTP parser, keep-alive, backlog, workers)
+	options = server_options(
+		profile=settings.SERVER_PROFILE,
+		workers=settings.SERVER_WORKERS,
+		keep_alive=settings.SERVER_KEEP_ALIVE,
+		backlog=settings.SERVER_BACKLOG,
+		single_process=rfid_manager.single_process_features(),
+	)
+	logging.info(f'Server profile: {settings.SERVER_PROFILE} {options}')
+
+	# Start uvicorn server (worker processes import the app by name)
 	try:
 		uvicorn.run(
-			app, host=host, port=port, access_log=False, log_level='critical', log_config=None
+			'main:app' if options['workers'] > 1 else app,
+			host=host,
+			port=port,
+			access_log=False,
+			log_level='critical',
+			log_config=None,
+			**options,
 		)
 	except SystemExit as e:
 		logging.error(f'Server exited with SystemExit: {e}')
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Admission benchmark: /receive/r700 latency while the read API is hammered.
+
+The server (run in a child process) has the real receive router behind the
+admission middleware and a read endpoint that serializes a large tag list on
+the loop, like /rfid/get_tags with many tags. The client posts one r700 batch
+at a fixed rate and records its latency while a pool of readers polls the read
+endpoint, once with admission control disabled and once with the defaults.
+
+poetry run python scripts/bench_admission.py [--seconds 10] [--readers 16] [--tags 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+
+class CountingManager:
+	tags = 0
+
+	def handle_r700_event(self, events: list) -> None:
+		self.tags += len(events)
+
+
+def serve(port: int, admission: bool, tags: int) -> None:
+	import uvicorn
+	from fastapi import FastAPI
+	from fastapi.responses import JSONResponse
+
+	from app.core.middleware import AdmissionControlMiddleware
+	from app.routers.api.v1 import receive
+	from app.services.diagnostics import admission_controller, loop_stall_detector
+
+	logging.disable(logging.WARNING)
+	if not admission:
+		admission_controller.configure(limits={}, max_lag=None, max_queue=None)
+	receive.rfid_manager = CountingManager()
+	tag_list = [
+		{'epc': f'{i:024x}', 'tid': f'e280{i:020x}', 'ant': 1, 'rssi': -60} for i in range(tags)
+	]
+
+	app = FastAPI()
+	app.include_router(receive.router)
+	app.add_middleware(AdmissionControlMiddleware)
+
+	@app.get('/api/v1/rfid/get_tags')
+	async def get_tags():
+		return JSONResponse(content=tag_list)
+
+	@app.on_event('startup')
+	async def start_detector():
+		loop_stall_detector.start(threshold=0.05)
+
+	uvicorn.run(app, host='127.0.0.1', port=port, log_level='warning')
+
+
+async def run_client(port: int, seconds: float, readers: int, rate: float) -> dict:
+	base = f'http://127.0.0.1:{port}'
+	batch = [
+		{
+			'hostname': 'portal_1',
+			'eventType': 'tagInventory',
+			'tagInventoryEvent': {'epcHex': f'{i:024x}', 'antennaPort': 1, 'peakRssiCdbm': -6000},
+		}
+		for i in range(50)
+	]
+	payload = json.dumps(batch)
+	latencies: list[float] = []
+	reads = {'ok': 0, 'shed': 0}
+	deadline = time.monotonic() + seconds
+
+	async with httpx.AsyncClient(base_url=base, timeout=30) as client:
+		for _ in range(100):
+			try:
+				await client.get('/')
+				break
+			except httpx.TransportError:
+				await asyncio.sleep(0.1)
+
+		async def reader():
+			while time.monotonic() < deadline:
+				response = await client.get('/api/v1/rfid/get_tags')
+				if response.status_code == 503:
+					reads['shed'] += 1
+					await asyncio.sleep(float(response.headers['Retry-After']) / 10)
+				else:
+					reads['ok'] += 1
+
+		async def ingest():
+			while time.monotonic() < deadline:
+				start = time.perf_counter()
+				response = await client.post(
+					'/api/v1/receive/r700',
+					content=payload,
+					headers={'Content-Type': 'application/json'},
+				)
+				response.raise_for_status()
+				latencies.append(time.perf_counter() - start)
+				await asyncio.sleep(1 / rate)
+
+		await asyncio.gather(ingest(), *(reader() for _ in range(readers)))
+
+	latencies.sort()
+	return {
+		'posts': len(latencies),
+		'p50': statistics.median(latencies) * 1000,
+		'p99': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+		'max': latencies[-1] * 1000,
+		**reads,
+	}
+
+
+def main(seconds: float, readers: int, tags: int, rate: float) -> None:
+	context = multiprocessing.get_context('spawn')
+	for i, admission in enumerate((False, True)):
+		port = 18700 + i
+		server = context.Process(target=serve, args=(port, admission, tags), daemon=True)
+		server.start()
+		try:
+			result = asyncio.run(run_client(port, seconds, readers, rate))
+		finally:
+			server.terminate()
+			server.join()
+		label = 'admission on ' if admission else 'admission off'
+		print(
+			f'{label}: ingest p50 {result["p50"]:.1f}ms p99 {result["p99"]:.1f}ms '
+			f'max {result["max"]:.1f}ms ({result["posts"]} posts) | '
+			f'reads served {result["ok"]}, shed {result["shed"]}'
+		)
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument('--seconds', type=float, default=10.0)
+	parser.add_argument('--readers', type=int, default=16, help='concurrent read API clients')
+	parser.add_argument('--tags', type=int, default=20_000, help='tags in the read response')
+	parser.add_argument('--rate', type=float, default=50.0, help='ingest posts per second')
+	args = parser.parse_args()
+	main(args.seconds, args.readers, args.tags, args.rate)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Dispatcher benchmark: 50 dispatch rules against a stream of tag events.
+
+Rules are compiled from JSON like config/dispatchers/*.json (10 listen to
+``tag`` with device/antenna/RSSI filters, 40 to other event types). Outgoing
+HTTP/SQL sends are replaced by counters so only compilation, routing, filter
+evaluation and payload rendering are measured.
+
+poetry run python scripts/bench_dispatch.py [--tags 10000] [--rules 50]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smartx_rfid.dispatcher import EventDispatcher  # noqa: E402
+from smartx_rfid.dispatcher.main import HttpDispatcher, SqlDispatcher  # noqa: E402
+
+from app.services.rfid.dispatch_index import DispatchIndex  # noqa: E402
+
+
+class CountingHttp(HttpDispatcher):
+	sent = 0
+
+	async def enqueue(self, item) -> None:
+		self.sent += 1
+
+
+class CountingSql(SqlDispatcher):
+	sent = 0
+
+	async def enqueue(self, item) -> None:
+		self.sent += 1
+
+
+def write_rules(path: str, rules: int, tag_rules: int) -> None:
+	for i in range(rules):
+		listens_to_tags = i < tag_rules
+		content = {
+			'dispatch_type': 'post',
+			'url': f'http://localhost:5001/rule_{i}',
+			'on_event': 'tag' if listens_to_tags else f'event_{i}',
+			'filters': [
+				{'key': '{name}', 'value': f'portal_{i % 4}', 'operator': 'eq'},
+				{'key': '{data[ant]}', 'value': [1, 2], 'operator': 'in'},
+				{'key': '{data[rssi]}', 'value': -65, 'operator': 'gte'},
+			]
+			if listens_to_tags
+			else [],
+			'body': {'device': '{name}', 'epc': '{data[epc]}', 'ant': '{data[ant]}'},
+		}
+		with open(os.path.join(path, f'rule_{i}.json'), 'w', encoding='utf-8') as f:
+			json.dump(content, f)
+
+
+def make_tags(count: int) -> list[tuple[str, dict]]:
+	return [
+		(
+			f'portal_{i % 4}',
+			{
+				'epc': f'{i:024x}',
+				'tid': f'e280{i:020x}',
+				'ant': i % 4 + 1,
+				'rssi': -40 - i % 40,
+			},
+		)
+		for i in range(count)
+	]
+
+
+async def run_stream(dispatcher, index, events, event_type: str) -> float:
+	start = time.perf_counter()
+	for name, data in events:
+		if index is None or index.wants(event_type):
+			await dispatcher.add_async(name=name, event_type=event_type, data=data)
+	await dispatcher.flush()
+	return time.perf_counter() - start
+
+
+async def main(tags: int, rules: int, tag_rules: int) -> None:
+	logging.disable(logging.INFO)  # per-event "Event enqueued" logs are not what is measured
+	with tempfile.TemporaryDirectory() as path:
+		write_rules(path, rules, tag_rules)
+		http = CountingHttp()
+		dispatcher = EventDispatcher(
+			dispatches_path=path, max_queue_size=tags * 2, http=http, sql=CountingSql()
+		)
+		index = DispatchIndex(dispatcher)
+		events = make_tags(tags)
+
+		start = time.perf_counter()
+		await dispatcher.start()
+		print(f'compiled {rules} rules in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+		await run_stream(dispatcher, index, events[:1000], 'tag')  # warm-up
+		http.sent = 0
+
+		elapsed = await run_stream(dispatcher, index, events, 'tag')
+		rate = tags / elapsed
+		print(
+			f'tag events:      {tags} in {elapsed:.3f}s -> {rate:,.0f}/s '
+			f'({http.sent} dispatches rendered)'
+		)
+
+		for label, use_index in (('without index', None), ('with index', index)):
+			unrouted = await run_stream(dispatcher, use_index, events, 'reading')
+			print(f'unrouted events {label}: {tags / unrouted:,.0f}/s')
+
+		await dispatcher.stop(drain=False)
+		target = 10_000
+		print('PASS' if rate >= target else 'BELOW TARGET', f'(target {target:,}/s)')
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument('--tags', type=int, default=10_000)
+	parser.add_argument('--rules', type=int, default=50)
+	parser.add_argument('--tag-rules', type=int, default=10)
+	args = parser.parse_args()
+	asyncio.run(main(args.tags, args.rules, args.tag_rules))
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Ingest benchmark: tags pushed over HTTP (/receive/r700), MQTT and raw TCP lines.
+
+All paths end in a counting manager, so what is measured is transport, request
+handling and payload decoding. HTTP runs the real receive router under uvicorn
+on localhost; MQTT publishes to a broker (the in-process LocalBroker unless
+--broker is given, which then also counts towards the MQTT time); the line
+protocol sends CSV records over persistent TCP connections.
+
+poetry run python scripts/bench_ingest.py [--tags 50000] [--batch 100] [--broker mqtt://host:1883]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from gmqtt import Client  # noqa: E402
+
+from app.routers.api.v1 import receive  # noqa: E402
+from app.services.mqtt import MqttIngest  # noqa: E402
+from tests.mqtt_broker import LocalBroker  # noqa: E402
+from app.services.rfid.line_ingest import LineIngestServer  # noqa: E402
+
+
+class CountingManager:
+	tags = 0
+
+	def on_tag(self, name: str, tag_data: dict) -> None:
+		self.tags += 1
+
+	def handle_r700_event(self, events: list) -> None:
+		self.tags += sum(1 for event in events if event.get('eventType') == 'tagInventory')
+
+
+def make_batches(tags: int, batch: int) -> list[list[dict]]:
+	events = [
+		{
+			'hostname': 'portal_1',
+			'eventType': 'tagInventory',
+			'tagInventoryEvent': {
+				'epcHex': f'{i:024x}',
+				'tidHex': f'e280{i:020x}',
+				'antennaPort': i % 4 + 1,
+				'peakRssiCdbm': -5000 - i % 3000,
+			},
+		}
+		for i in range(tags)
+	]
+	return [events[i : i + batch] for i in range(0, tags, batch)]
+
+
+async def wait_for(condition, timeout: float = 120.0) -> None:
+	deadline = time.monotonic() + timeout
+	while not condition():
+		if time.monotonic() > deadline:
+			raise TimeoutError('benchmark did not finish')
+		await asyncio.sleep(0.001)
+
+
+async def bench_http(batches, concurrency: int) -> float:
+	manager = CountingManager()
+	receive.rfid_manager = manager
+	app = FastAPI()
+	app.include_router(receive.router)
+	server = uvicorn.Server(
+		uvicorn.Config(app, host='127.0.0.1', port=0, log_level='warning', lifespan='off')
+	)
+	serve = asyncio.create_task(server.serve())
+	await wait_for(lambda: server.started)
+	port = server.servers[0].sockets[0].getsockname()[1]
+	url = f'http://127.0.0.1:{port}/api/v1/receive/r700'
+
+	queue = list(reversed(batches))
+	async with httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency)) as client:
+
+		async def worker():
+			while queue:
+				response = await client.post(url, json=queue.pop())
+				response.raise_for_status()
+
+		start = time.perf_counter()
+		await asyncio.gather(*(worker() for _ in range(concurrency)))
+		elapsed = time.perf_counter() - start
+
+	server.should_exit = True
+	await serve
+	assert manager.tags == sum(len(batch) for batch in batches)
+	return elapsed
+
+
+async def bench_mqtt(batches, broker_url: str | None) -> float:
+	broker = None
+	if broker_url is None:
+		broker = LocalBroker()
+		await broker.start()
+		broker_url = f'mqtt://127.0.0.1:{broker.port}'
+	manager = CountingManager()
+	ingest = MqttIngest(
+		broker_url, [{'topic': 'bench/{device}/events', 'format': 'r700'}], manager=manager
+	)
+	task = asyncio.create_task(ingest.run())
+	await wait_for(lambda: ingest.connected)
+	await asyncio.sleep(0.2)  # SUBACK
+
+	publisher = Client('x-bridge-bench')
+	host, port = broker_url.rsplit('//', 1)[1].split(':')
+	await publisher.connect(host, int(port))
+	payloads = [json.dumps(batch) for batch in batches]
+	total = sum(len(batch) for batch in batches)
+
+	start = time.perf_counter()
+	for payload in payloads:
+		publisher.publish('bench/portal_1/events', payload, qos=0)
+	await wait_for(lambda: manager.tags >= total)
+	elapsed = time.perf_counter() - start
+
+	await publisher.disconnect()
+	task.cancel()
+	await asyncio.gather(task, return_exceptions=True)
+	if broker is not None:
+		await broker.stop()
+	return elapsed
+
+
+async def bench_line(batches, concurrency: int) -> float:
+	manager = CountingManager()
+	server = LineIngestServer(manager, host='127.0.0.1', tcp_port=0)
+	await server.start()
+	writers = [
+		(await asyncio.open_connection('127.0.0.1', server.tcp_port))[1] for _ in range(concurrency)
+	]
+	payloads = [
+		''.join(
+			f"portal_1,{tag['epcHex']},{tag['tidHex']},{tag['antennaPort']},"
+			f"{tag['peakRssiCdbm'] // 100}\n"
+			for tag in (event['tagInventoryEvent'] for event in batch)
+		).encode()
+		for batch in batches
+	]
+	total = sum(len(batch) for batch in batches)
+
+	start = time.perf_counter()
+	for i, payload in enumerate(payloads):
+		writer = writers[i % concurrency]
+		writer.write(payload)
+		await writer.drain()
+	await wait_for(lambda: manager.tags >= total)
+	elapsed = time.perf_counter() - start
+
+	for writer in writers:
+		writer.close()
+	await server.stop()
+	return elapsed
+
+
+async def main(tags: int, batch: int, concurrency: int, broker_url: str | None) -> None:
+	logging.disable(logging.INFO)
+	batches = make_batches(tags, batch)
+	http = await bench_http(batches, concurrency)
+	mqtt = await bench_mqtt(batches, broker_url)
+	line = await bench_line(batches, concurrency)
+	print(f'{tags} tags in batches of {batch}')
+	print(
+		f'HTTP /receive/r700 ({concurrency} connections): {http:.3f}s -> {tags / http:,.0f} tags/s'
+	)
+	print(f'MQTT ingest ({broker_url or "LocalBroker"}):  {mqtt:.3f}s -> {tags / mqtt:,.0f} tags/s')
+	print(
+		f'TCP line protocol ({concurrency} connections): {line:.3f}s -> {tags / line:,.0f} tags/s'
+	)
+	print(f'MQTT / HTTP: {http / mqtt:.2f}x, TCP lines / HTTP: {http / line:.2f}x')
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument('--tags', type=int, default=50_000)
+	parser.add_argument('--batch', type=int, default=100, help='tags per request/message')
+	parser.add_argument('--concurrency', type=int, default=8, help='HTTP/TCP connections')
+	parser.add_argument('--broker', help='external broker URL (default: in-process LocalBroker)')
+	args = parser.parse_args()
+	asyncio.run(main(args.tags, args.batch, args.concurrency, args.broker))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Response encoding benchmark: /rfid/get_tags and /rfid/get_epcs with 50k tags.
+
+Requests go through the real rfid router in-process (httpx ASGI transport, no
+sockets), so what is measured is FastAPI request handling and response
+encoding. The baseline is the previous endpoint, which returned the list and
+let FastAPI run ``jsonable_encoder`` and the stdlib ``json`` module. MessagePack
+is measured when the ``msgpack`` package is installed.
+
+poetry run python scripts/bench_responses.py [--tags 50000] [--requests 10]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from smartx_rfid.utils import TagList  # noqa: E402
+
+from app.core import responses  # noqa: E402
+from app.routers.api.v1 import rfid  # noqa: E402
+
+
+class BenchManager:
+	def __init__(self, tags: int):
+		self.tags = TagList(unique_identifier='tid')
+		for i in range(tags):
+			self.tags.add(
+				{'epc': f'{i:024x}', 'tid': f'e280{i:020x}', 'ant': i % 4 + 1, 'rssi': -60},
+				device=f'portal_{i % 8}',
+			)
+
+
+def baseline_app(manager: BenchManager) -> FastAPI:
+	app = FastAPI()
+
+	@app.get('/api/v1/rfid/get_tags')
+	async def get_tags():
+		return manager.tags.get_all()
+
+	@app.get('/api/v1/rfid/get_epcs')
+	async def get_epcs():
+		return manager.tags.get_epcs()
+
+	return app
+
+
+def router_app() -> FastAPI:
+	app = FastAPI()
+	app.include_router(rfid.router)
+	return app
+
+
+async def measure(app: FastAPI, path: str, requests: int, accept: str) -> tuple[float, int]:
+	transport = httpx.ASGITransport(app=app)
+	async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+		await client.get(path, headers={'Accept': accept})  # warm-up
+		start = time.perf_counter()
+		for _ in range(requests):
+			response = await client.get(path, headers={'Accept': accept})
+			response.raise_for_status()
+		elapsed = (time.perf_counter() - start) / requests
+	return elapsed, len(response.content)
+
+
+async def main(tags: int, requests: int) -> None:
+	logging.disable(logging.WARNING)
+	manager = BenchManager(tags)
+	rfid.rfid_manager = manager
+
+	variants = [
+		('jsonable_encoder + json', baseline_app(manager), 'application/json'),
+		(
+			'orjson' if responses.orjson is not None else 'json (orjson missing)',
+			router_app(),
+			'application/json',
+		),
+	]
+	if responses.msgpack is not None:
+		variants.append(('msgpack', router_app(), 'application/msgpack'))
+	else:
+		print('msgpack is not installed, skipping the MessagePack run')
+
+	print(f'{tags} tags, mean of {requests} requests')
+	for path in ('/api/v1/rfid/get_tags', '/api/v1/rfid/get_epcs'):
+		baseline = None
+		for name, app, accept in variants:
+			elapsed, size = await measure(app, path, requests, accept)
+			baseline = baseline or elapsed
+			print(
+				f'{path:<24} {name:<24} {elapsed * 1000:8.1f} ms  {size / 1e6:6.2f} MB  '
+				f'{baseline / elapsed:5.1f}x'
+			)
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument('--tags', type=int, default=50_000)
+	parser.add_argument('--requests', type=int, default=10)
+	args = parser.parse_args()
+	asyncio.run(main(args.tags, args.requests))
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Server profile benchmark: /receive/tags and /rfid/get_tags requests per second.
+
+Each configuration runs the real receive and rfid routers under uvicorn, with a counting manager behind /receive/tags and a TagList of
+--tags tags behind /rfid/get_tags. The load generator is a minimal HTTP/1.1
+keep-alive client (cheaper than httpx, so the server is what saturates).
+The server runs as a subprocess (``--serve``) so uvicorn can spawn workers.
+Configurations: plain asyncio + h11 (what ``default`` resolves to without
+uvloop/httptools, e.g. on Windows), ``default`` and ``performance``, plus
+``performance`` with --workers processes when more than one is asked for.
+
+poetry run python scripts/bench_server.py [--seconds 5] [--connections 32] [--tags 1000] [--workers 1]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.server import server_options  # noqa: E402
+
+TAGS_ENV = 'BENCH_SERVER_TAGS'
+
+
+class BenchManager:
+	def __init__(self, tags: int):
+		from smartx_rfid.utils import TagList
+
+		self.events = 0
+		self.tags = TagList(unique_identifier='tid')
+		for i in range(tags):
+			self.tags.add(
+				{'epc': f'{i:024x}', 'tid': f'e280{i:020x}', 'ant': 1, 'rssi': -60}, device='bench'
+			)
+
+	def on_event(self, name: str, event_type: str, event_data: dict) -> None:
+		self.events += 1
+
+
+def create_app():
+	from fastapi import FastAPI
+
+	from app.routers.api.v1 import receive, rfid
+
+	logging.disable(logging.WARNING)
+	manager = BenchManager(int(os.environ.get(TAGS_ENV, '1000')))
+	receive.rfid_manager = rfid.rfid_manager = manager
+	app = FastAPI()
+	app.include_router(receive.router)
+	app.include_router(rfid.router)
+	return app
+
+
+def serve(port: int, options: dict) -> None:
+	import uvicorn
+
+	uvicorn.run(
+		'bench_server:create_app',
+		factory=True,
+		host='127.0.0.1',
+		port=port,
+		access_log=False,
+		log_level='critical',
+		log_config=None,
+		**options,
+	)
+
+
+async def load(port: int, request: bytes, seconds: float, connections: int) -> float:
+	"""Send ``request`` over keep-alive connections for ``seconds``; return requests/s."""
+	for _ in range(200):
+		try:
+			_, writer = await asyncio.open_connection('127.0.0.1', port)
+			writer.close()
+			break
+		except OSError:
+			await asyncio.sleep(0.05)
+	await asyncio.sleep(0.5)  # let every worker start accepting
+
+	done = 0
+	deadline = time.perf_counter() + seconds
+
+	async def client():
+		nonlocal done
+		reader, writer = await asyncio.open_connection('127.0.0.1', port)
+		while time.perf_counter() < deadline:
+			writer.write(request)
+			head = await reader.readuntil(b'\r\n\r\n')
+			if not head.startswith(b'HTTP/1.1 200'):
+				raise RuntimeError(head.split(b'\r\n', 1)[0].decode())
+			length = 0
+			for line in head.split(b'\r\n'):
+				if line.lower().startswith(b'content-length:'):
+					length = int(line.split(b':', 1)[1])
+			await reader.readexactly(length)
+			done += 1
+		writer.close()
+
+	start = time.perf_counter()
+	await asyncio.gather(*(client() for _ in range(connections)))
+	return done / (time.perf_counter() - start)
+
+
+def make_requests() -> dict:
+	body = json.dumps(
+		[{'epc': f'{i:024x}', 'tid': f'e280{i:020x}', 'ant': 1, 'rssi': -60} for i in range(20)]
+	).encode()
+	receive_tags = (
+		b'POST /api/v1/receive/tags/bench HTTP/1.1\r\nHost: bench\r\n'
+		b'Content-Type: application/json\r\nContent-Length: %d\r\n\r\n%s' % (len(body), body)
+	)
+	get_tags = b'GET /api/v1/rfid/get_tags HTTP/1.1\r\nHost: bench\r\n\r\n'
+	return {'/receive/tags (20 tags)': receive_tags, '/rfid/get_tags': get_tags}
+
+
+def main(seconds: float, connections: int, tags: int, workers: int) -> None:
+	os.environ[TAGS_ENV] = str(tags)
+	configurations = {
+		'asyncio + h11': {**server_options('default'), 'loop': 'asyncio', 'http': 'h11'},
+		'default': server_options('default'),
+		'performance': server_options('performance'),
+	}
+	if workers > 1:
+		configurations[f'performance, {workers} workers'] = server_options(
+			'performance', workers=workers
+		)
+
+	requests = make_requests()
+	results = {}
+	for i, (name, options) in enumerate(configurations.items()):
+		port = 18800 + i
+		server = subprocess.Popen(
+			[sys.executable, __file__, '--serve', str(port), json.dumps(options)],
+			stdout=subprocess.DEVNULL,
+			stderr=subprocess.DEVNULL,
+		)
+		try:
+			results[name] = {
+				endpoint: asyncio.run(load(port, request, seconds, connections))
+				for endpoint, request in requests.items()
+			}
+		finally:
+			server.terminate()
+			server.wait()
+		print(f'{name}: {options}')
+
+	print(f'\n{connections} keep-alive connections, {seconds:.0f}s per endpoint, {tags} tags')
+	baseline = results['asyncio + h11']
+	for name, result in results.items():
+		print(
+			f'{name:<24}'
+			+ ''.join(
+				f' | {endpoint}: {rate:>8,.0f} req/s ({rate / baseline[endpoint]:.2f}x)'
+				for endpoint, rate in result.items()
+			)
+		)
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument('--seconds', type=float, default=5.0)
+	parser.add_argument('--connections', type=int, default=32)
+	parser.add_argument('--tags', type=int, default=1000, help='tags returned by /rfid/get_tags')
+	parser.add_argument('--workers', type=int, default=1, help='extra run with N workers')
+	parser.add_argument('--serve', nargs=2, metavar=('PORT', 'OPTIONS'), help=argparse.SUPPRESS)
+	args = parser.parse_args()
+	if args.serve:
+		serve(int(args.serve[0]), json.loads(args.serve[1]))
+	else:
+		main(args.seconds, args.connections, args.tags, args.workers)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Local reader emulator: virtual X714 and R700 readers for load and integration tests.
+
+Each reader streams synthetic reads (random reads from a tag population) or a
+recorded session. Listening readers (X714 TCP/serial, R700 REST) can write
+their device JSON with --config-dir so X-BRIDGE connects to them.
+
+poetry run python scripts/emulator.py --x714-tcp 20 --rate 500 --config-dir config/devices
+poetry run python scripts/emulator.py --r700-webhook 10 --url http://localhost:8000/api/v1/receive/r700
+poetry run python scripts/emulator.py --x714-tcp 1 --replay session.ndjson.gz --speed 10
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emulator import ReaderEmulator, ReplayTags, SyntheticTags, load_recording  # noqa: E402
+
+
+async def main(args) -> None:
+	if args.replay:
+		records = load_recording(args.replay)
+		print(f'replaying {len(records)} reads from {args.replay} at speed {args.speed or "max"}')
+
+		def source_factory():
+			return ReplayTags(records, speed=args.speed, loop=args.loop)
+	else:
+
+		def source_factory():
+			return SyntheticTags(rate=args.rate, population=args.population, antennas=args.antennas)
+
+	emulator = ReaderEmulator(source_factory, start_reading=args.start_reading)
+	emulator.add_x714_tcp(args.x714_tcp, host=args.host, base_port=args.base_port)
+	emulator.add_x714_serial(args.x714_serial)
+	emulator.add_r700(
+		args.r700,
+		host=args.host,
+		base_port=args.base_port + args.x714_tcp if args.base_port else 0,
+		certfile=args.cert,
+		keyfile=args.key,
+	)
+	if args.r700_webhook:
+		emulator.add_r700_webhook(args.r700_webhook, args.url)
+	if not emulator.readers:
+		sys.exit('no readers requested')
+
+	await emulator.start()
+	for reader in emulator.readers:
+		if hasattr(reader, 'device_config'):
+			print(f'{reader.name}: {reader.device_config()}')
+	if args.config_dir:
+		files = emulator.write_device_configs(args.config_dir)
+		print(f'{len(files)} device configs written to {args.config_dir}')
+
+	stop = asyncio.Event()
+	loop = asyncio.get_running_loop()
+	for sig in (signal.SIGINT, signal.SIGTERM):
+		try:
+			loop.add_signal_handler(sig, stop.set)
+		except NotImplementedError:  # Windows
+			pass
+
+	last = 0
+	try:
+		while not stop.is_set():
+			try:
+				await asyncio.wait_for(stop.wait(), timeout=args.report)
+			except asyncio.TimeoutError:
+				sent = emulator.get_stats()['tags_sent']
+				print(f'{sent} reads sent ({(sent - last) / args.report:,.0f}/s)')
+				last = sent
+	finally:
+		await emulator.stop()
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+	parser.add_argument('--x714-tcp', type=int, default=0, help='X714 readers over TCP')
+	parser.add_argument('--x714-serial', type=int, default=0, help='X714 readers on a pty')
+	parser.add_argument('--r700', type=int, default=0, help='R700 readers serving the REST API')
+	parser.add_argument('--r700-webhook', type=int, default=0, help='R700 readers posting events')
+	parser.add_argument('--url', default='http://localhost:8000/api/v1/receive/r700')
+	parser.add_argument('--host', default='127.0.0.1')
+	parser.add_argument('--base-port', type=int, default=0, help='first port (0 = random)')
+	parser.add_argument('--cert', help='TLS certificate for the R700 API')
+	parser.add_argument('--key', help='TLS key for the R700 API')
+	parser.add_argument('--rate', type=float, default=100.0, help='reads/s per reader')
+	parser.add_argument('--population', type=int, default=1000, help='distinct tags per reader')
+	parser.add_argument('--antennas', type=int, default=4)
+	parser.add_argument('--replay', help='recorded session (NDJSON, optionally .gz)')
+	parser.add_argument('--speed', type=float, default=1.0, help='replay speed (0 = max)')
+	parser.add_argument('--loop', action='store_true', help='loop the replay')
+	parser.add_argument('--start-reading', action='store_true', help='stream before start cmd')
+	parser.add_argument('--config-dir', help='write device JSONs here')
+	parser.add_argument('--report', type=float, default=5.0, help='stats interval in seconds')
+	args = parser.parse_args()
+	logging.basicConfig(level=logging.WARNING)
+	asyncio.run(main(args))
@@ -0,0 +1,186 @@
+"""
+Minimal in-process MQTT broker for the tests and benchmarks.
+
+Supports what the X-BRIDGE publisher and ingest listener use: MQTT 3.1.1 and
+5.0 CONNECT, PUBLISH with QoS 0/1, SUBSCRIBE/UNSUBSCRIBE with ``+``/``#``
+wildcards, PINGREQ and DISCONNECT. Messages are forwarded to subscribers at
+QoS 0. No retained messages, sessions or authentication: use a real broker
+(Mosquitto, EMQX, ...) anywhere else.
+"""
+
+import asyncio
+import struct
+from typing import Optional
+
+from app.services.mqtt.common import topic_matches
+
+CONNECT, CONNACK, PUBLISH, PUBACK = 1, 2, 3, 4
+SUBSCRIBE, SUBACK, UNSUBSCRIBE, UNSUBACK = 8, 9, 10, 11
+PINGREQ, PINGRESP, DISCONNECT = 12, 13, 14
+MQTT_V5 = 5
+
+
+def encode_varint(value: int) -> bytes:
+	out = bytearray()
+	while True:
+		byte, value = value % 128, value // 128
+		out.append(byte | (0x80 if value else 0))
+		if not value:
+			return bytes(out)
+
+
+def decode_varint(data: bytes, pos: int) -> tuple[int, int]:
+	value = shift = 0
+	while True:
+		byte = data[pos]
+		pos += 1
+		value |= (byte & 0x7F) << shift
+		if not byte & 0x80:
+			return value, pos
+		shift += 7
+
+
+def encode_string(value: str) -> bytes:
+	raw = value.encode()
+	return struct.pack('!H', len(raw)) + raw
+
+
+class _Session:
+	def __init__(self, writer: asyncio.StreamWriter):
+		self.writer = writer
+		self.version = 4
+		self.subscriptions: set[str] = set()
+
+	def send(self, packet_type: int, body: bytes, flags: int = 0) -> None:
+		self.writer.write(bytes([packet_type << 4 | flags]) + encode_varint(len(body)) + body)
+
+	@property
+	def properties(self) -> bytes:
+		return b'\x00' if self.version == MQTT_V5 else b''
+
+
+class LocalBroker:
+	def __init__(self, host: str = '127.0.0.1', port: int = 0):
+		"""
+		Args:
+		    host: Listen address.
+		    port: Listen port (0 picks a free one; read it from ``port`` after start).
+		"""
+		self.host = host
+		self.port = port
+		self.messages: list[tuple[str, bytes, int]] = []  # (topic, payload, qos) received
+		self.hold_acks = False  # keep QoS 1 PUBACKs until release_acks() (in-flight tests)
+		self._held: list[tuple[_Session, int]] = []
+		self._sessions: set[_Session] = set()
+		self._server: Optional[asyncio.AbstractServer] = None
+		self._received = asyncio.Condition()
+
+	async def start(self) -> None:
+		self._server = await asyncio.start_server(self._handle, self.host, self.port)
+		self.port = self._server.sockets[0].getsockname()[1]
+
+	async def stop(self) -> None:
+		if self._server is None:
+			return
+		self._server.close()
+		for session in list(self._sessions):
+			session.writer.close()
+		await self._server.wait_closed()
+		self._server = None
+
+	def release_acks(self) -> None:
+		for session, mid in self._held:
+			session.send(PUBACK, struct.pack('!H', mid))
+		self._held.clear()
+
+	def publish(self, topic: str, payload: bytes) -> None:
+		"""Deliver a message to the matching subscribers (as if a client had published it)."""
+		for session in list(self._sessions):
+			if any(topic_matches(pattern, topic) for pattern in session.subscriptions):
+				session.send(PUBLISH, encode_string(topic) + session.properties + payload)
+
+	async def wait_for_messages(self, count: int, timeout: float = 5.0) -> None:
+		async with self._received:
+			await asyncio.wait_for(
+				self._received.wait_for(lambda: len(self.messages) >= count), timeout
+			)
+
+	# [ PROTOCOL ]
+	async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		session = _Session(writer)
+		self._sessions.add(session)
+		try:
+			while True:
+				header = await reader.readexactly(1)
+				length = shift = 0
+				while True:
+					byte = (await reader.readexactly(1))[0]
+					length |= (byte & 0x7F) << shift
+					shift += 7
+					if not byte & 0x80:
+						break
+				body = await reader.readexactly(length) if length else b''
+				if not await self._on_packet(session, header[0] >> 4, header[0] & 0x0F, body):
+					break
+				await writer.drain()
+		except (asyncio.IncompleteReadError, ConnectionError):
+			pass
+		finally:
+			self._sessions.discard(session)
+			writer.close()
+
+	async def _on_packet(
+		self, session: _Session, packet_type: int, flags: int, body: bytes
+	) -> bool:
+		if packet_type == CONNECT:
+			(name_length,) = struct.unpack_from('!H', body)
+			session.version = body[2 + name_length]
+			session.send(CONNACK, b'\x00\x00' + session.properties)
+		elif packet_type == PUBLISH:
+			qos = (flags >> 1) & 0x03
+			(topic_length,) = struct.unpack_from('!H', body)
+			topic = body[2 : 2 + topic_length].decode()
+			pos = 2 + topic_length
+			mid = None
+			if qos:
+				(mid,) = struct.unpack_from('!H', body, pos)
+				pos += 2
+			if session.version == MQTT_V5:
+				properties_length, pos = decode_varint(body, pos)
+				pos += properties_length
+			payload = body[pos:]
+			async with self._received:
+				self.messages.append((topic, payload, qos))
+				self._received.notify_all()
+			self.publish(topic, payload)
+			if qos == 1:
+				if self.hold_acks:
+					self._held.append((session, mid))
+				else:
+					session.send(PUBACK, struct.pack('!H', mid))
+		elif packet_type in (SUBSCRIBE, UNSUBSCRIBE):
+			(mid,) = struct.unpack_from('!H', body)
+			pos = 2
+			if session.version == MQTT_V5:
+				properties_length, pos = decode_varint(body, pos)
+				pos += properties_length
+			codes = bytearray()
+			while pos < len(body):
+				(topic_length,) = struct.unpack_from('!H', body, pos)
+				topic = body[pos + 2 : pos + 2 + topic_length].decode()
+				pos += 2 + topic_length
+				if packet_type == SUBSCRIBE:
+					pos += 1  # subscription options
+					session.subscriptions.add(topic)
+				else:
+					session.subscriptions.discard(topic)
+				codes.append(0)
+			if packet_type == UNSUBSCRIBE and session.version != MQTT_V5:
+				codes = bytearray()  # 3.1.1 UNSUBACK has no payload
+			ack = SUBACK if packet_type == SUBSCRIBE else UNSUBACK
+			session.send(ack, struct.pack('!H', mid) + session.properties + bytes(codes))
+		elif packet_type == PINGREQ:
+			session.send(PINGRESP, b'')
+		elif packet_type == DISCONNECT:
+			return False
+		return True
@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.middleware import AdmissionControlMiddleware
+from app.services.diagnostics import admission_controller
+from app.services.diagnostics.admission import (
+	CONTROL,
+	INGEST,
+	READ,
+	UI,
+	AdmissionController,
+	classify,
+)
+
+
+def test_classify():
+	assert classify('POST', '/api/v1/receive/r700') == INGEST
+	assert classify('POST', '/api/v1/receive/tags') == INGEST
+	assert classify('GET', '/api/v1/receive/ingest_stats') == READ
+	assert classify('GET', '/api/v1/rfid/get_tags') == READ
+	assert classify('GET', '/metrics') == READ
+	assert classify('POST', '/api/v1/devices/start_inventory') == CONTROL
+	assert classify('DELETE', '/api/v1/rfid/clear_tags') == CONTROL
+	assert classify('GET', '/api/v1/diagnostics/admission') == CONTROL
+	assert classify('GET', '/') == UI
+	assert classify('GET', '/logs/get_content') == UI
+	assert classify('GET', '/static/css/style.css') == UI
+
+
+def test_caps_and_shedding():
+	lag = [0.0]
+	queue = [0]
+	controller = AdmissionController(limits={READ: 2}, max_lag=0.1, max_queue=100)
+	controller.lag_source = lambda: lag[0]
+	controller.queue_source = lambda: queue[0]
+
+	assert controller.admit(READ) is None and controller.admit(READ) is None
+	assert controller.admit(READ) == 'limit'
+	controller.release(READ)
+	assert controller.admit(READ) is None
+
+	lag[0] = 0.5
+	assert controller.admit(UI) == 'lag'
+	assert controller.admit(INGEST) is None and controller.admit(CONTROL) is None
+	lag[0] = 0.0
+	queue[0] = 101
+	assert controller.admit(UI) == 'queue'
+	queue[0] = 100
+	assert controller.admit(UI) is None
+
+	stats = controller.get_stats()['classes']
+	assert stats[READ] == {
+		'limit': 2,
+		'in_flight': 2,
+		'admitted': 3,
+		'rejected': {'limit': 1, 'lag': 0, 'queue': 0},
+	}
+	assert stats[UI]['rejected'] == {'limit': 0, 'lag': 1, 'queue': 1}
+	assert stats[INGEST]['limit'] is None and stats[INGEST]['in_flight'] == 1
+
+	with pytest.raises(ValueError):
+		controller.configure(limits={'pages': 1})
+	with pytest.raises(ValueError):
+		controller.configure(limits={UI: 0})
+
+
+@pytest.mark.asyncio
+async def test_middleware_sheds_reads_but_not_ingest(monkeypatch):
+	monkeypatch.setattr(admission_controller, 'lag_source', lambda: 1.0)
+	release = asyncio.Event()
+
+	async def app(scope, receive, send):
+		await release.wait()
+		await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+		await send({'type': 'http.response.body', 'body': b'ok'})
+
+	middleware = AdmissionControlMiddleware(app)
+
+	async def request(method, path):
+		messages = []
+
+		async def send(message):
+			messages.append(message)
+
+		scope = {'type': 'http', 'method': method, 'path': path, 'headers': []}
+		await middleware(scope, None, send)
+		return messages[0]['status'], dict(messages[0]['headers'])
+
+	shed_status, headers = await request('GET', '/api/v1/rfid/get_tags')
+	assert shed_status == 503 and headers[b'retry-after'] == b'1'
+
+	ingest = asyncio.create_task(request('POST', '/api/v1/receive/r700'))
+	await asyncio.sleep(0)
+	assert admission_controller.in_flight[INGEST] == 1
+	release.set()
+	assert (await ingest)[0] == 200
+	assert admission_controller.in_flight[INGEST] == 0
+
+
+@pytest.mark.asyncio
+async def test_probe_lag_measures_a_blocked_loop():
+	controller = AdmissionController(max_lag=0.1)
+	controller.lag_source = lambda: controller.probed_lag
+	task = asyncio.create_task(controller.probe_lag(interval=0.01))
+	await asyncio.sleep(0.02)
+	time.sleep(0.2)  # block the loop
+	await asyncio.sleep(0.005)
+	assert controller.probed_lag >= 0.15
+	assert controller.admit(READ) == 'lag'
+	task.cancel()
+	with pytest.raises(asyncio.CancelledError):
+		await task
+	assert controller.probed_lag == 0.0
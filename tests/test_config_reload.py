@@ -0,0 +1,76 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.settings_service.reload import ConfigReloader
+
+
+class FakeDevices:
+	def __init__(self, names):
+		self.items = {name: SimpleNamespace(name=name) for name in names}
+		self.updated = []
+		self.shutdown = []
+
+	def get_device(self, name):
+		return self.items.get(name)
+
+	async def update_device_config(self, name, data):
+		self.updated.append(name)
+		self.items[name] = SimpleNamespace(name=name)
+		return True, None
+
+	async def _shutdown_device(self, device):
+		self.shutdown.append(device.name)
+		self.items.pop(device.name)
+
+
+class FakeDispatcher:
+	def __init__(self):
+		self.reloads = 0
+
+	def reload_dispatches(self):
+		self.reloads += 1
+
+
+def write(path, name, content):
+	(path / f'{name}.json').write_text(json.dumps(content), encoding='utf-8')
+
+
+@pytest.mark.asyncio
+async def test_reload_applies_only_changed_configs(tmp_path):
+	devices_path, dispatchers_path = tmp_path / 'devices', tmp_path / 'dispatchers'
+	devices_path.mkdir()
+	dispatchers_path.mkdir()
+	for name in ('portal_1', 'portal_2', 'portal_3'):
+		write(devices_path, name, {'reader': 'X714', 'power': 20})
+	write(dispatchers_path, 'erp', {'type': 'post'})
+
+	reloader = ConfigReloader(str(devices_path), str(dispatchers_path))
+	devices = FakeDevices(['portal_1', 'portal_2', 'portal_3'])
+	dispatcher = FakeDispatcher()
+
+	result = await reloader.reload(devices, dispatcher)
+	assert devices.updated == [] and devices.shutdown == [] and dispatcher.reloads == 0
+
+	write(devices_path, 'portal_2', {'reader': 'X714', 'power': 30})
+	write(devices_path, 'portal_4', {'reader': 'R700'})
+	(devices_path / 'portal_3.json').unlink()
+	signature = reloader.signature()
+
+	result = await reloader.reload(devices, dispatcher)
+	assert result['devices'] == {
+		'added': ['portal_4'],
+		'changed': ['portal_2'],
+		'removed': ['portal_3'],
+	}
+	assert devices.updated == ['portal_4', 'portal_2']
+	assert devices.shutdown == ['portal_3']
+	assert dispatcher.reloads == 0
+	assert reloader.signature() == signature
+
+	write(dispatchers_path, 'erp', {'type': 'sql'})
+	result = await reloader.reload(devices, dispatcher)
+	assert result['dispatchers']['changed'] == ['erp']
+	assert dispatcher.reloads == 1
+	assert devices.updated == ['portal_4', 'portal_2']
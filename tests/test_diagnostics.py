@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.diagnostics import LoopStallDetector, SamplingProfiler
+
+
+def _busy_worker(stop: threading.Event):
+	while not stop.is_set():
+		sum(range(1000))
+
+
+@pytest.mark.asyncio
+async def test_profiler_samples_threads_and_tasks():
+	stop = threading.Event()
+	worker = threading.Thread(target=_busy_worker, args=(stop,), name='busy-worker')
+	worker.start()
+
+	async def idle_task():
+		await asyncio.sleep(10)
+
+	task = asyncio.create_task(idle_task(), name='idle-task')
+	try:
+		result = await asyncio.to_thread(
+			SamplingProfiler().profile,
+			duration=0.2,
+			interval=0.01,
+			loop=asyncio.get_running_loop(),
+		)
+	finally:
+		stop.set()
+		worker.join()
+		task.cancel()
+
+	lines = result['collapsed'].splitlines()
+	assert result['samples'] > 1
+	assert any(line.startswith('thread:busy-worker;') and '_busy_worker' in line for line in lines)
+	assert any(line.startswith('task:idle-task;idle_task') for line in lines)
+	# collapsed format: "frame;frame count"
+	assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_stall_detector_logs_blocking_stack():
+	detector = LoopStallDetector(threshold=0.05)
+	detector.start()
+	try:
+		await asyncio.sleep(0.05)
+		time.sleep(0.3)  # block the loop
+		await asyncio.sleep(0.05)
+	finally:
+		detector.stop()
+
+	assert len(detector.stalls) == 1
+	stall = detector.stalls[0]
+	assert 'test_stall_detector_logs_blocking_stack' in stall['stack']
+	assert stall['duration'] >= 0.25
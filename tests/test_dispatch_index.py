@@ -0,0 +1,35 @@
+import json
+
+import pytest
+from smartx_rfid.dispatcher import EventDispatcher
+
+from app.services.rfid.dispatch_index import DispatchIndex
+
+
+def write_dispatch(path, name, on_event):
+	content = {'dispatch_type': 'post', 'url': 'http://localhost:5001', 'on_event': on_event}
+	(path / f'{name}.json').write_text(json.dumps(content), encoding='utf-8')
+
+
+@pytest.mark.asyncio
+async def test_index_skips_event_types_without_dispatches(tmp_path):
+	write_dispatch(tmp_path, 'tags', 'tag')
+	dispatcher = EventDispatcher(dispatches_path=str(tmp_path))
+	index = DispatchIndex(dispatcher)
+	assert index.wants('reading')  # not started yet: let the first event start it
+
+	await dispatcher.start()
+	try:
+		assert index.wants('tag')
+		assert not index.wants('reading')
+		assert index.get_stats() == {
+			'indexed_event_types': ['tag'],
+			'catch_all': False,
+			'events_skipped': 1,
+		}
+
+		write_dispatch(tmp_path, 'any', '{event_type}')
+		dispatcher.reload_dispatches()
+		assert index.wants('reading')
+	finally:
+		await dispatcher.stop(drain=False)
@@ -0,0 +1,161 @@
+import asyncio
+import gzip
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+from smartx_rfid.devices import X714
+
+from emulator import (
+	R700Emulator,
+	R700WebhookEmulator,
+	ReplayTags,
+	SyntheticTags,
+	X714TcpEmulator,
+	load_recording,
+)
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def wait_for(condition, timeout=5.0):
+	deadline = time.monotonic() + timeout
+	while not condition():
+		if time.monotonic() > deadline:
+			raise AssertionError('condition not met in time')
+		await asyncio.sleep(0.02)
+
+
+@pytest.mark.asyncio
+async def test_x714_driver_reads_tags_from_tcp_emulator():
+	emulator = X714TcpEmulator('EMU-1', source=SyntheticTags(rate=500, population=20, seed=1))
+	await emulator.start()
+	device = X714(
+		name='portal',
+		connection_type='TCP',
+		ip='127.0.0.1',
+		tcp_port=emulator.port,
+		start_reading=True,
+	)
+	tags = []
+	device.on_event = lambda name, event_type, data=None: (
+		tags.append(data) if event_type == 'tag' else None
+	)
+	task = asyncio.create_task(device.connect())
+	try:
+		await wait_for(lambda: len(tags) >= 50)
+		assert emulator.reading  # the driver sent its start command
+		tag = tags[0]
+		assert tag['epc'].startswith('3034') and len(tag['epc']) == 24
+		assert 1 <= tag['ant'] <= 4
+		assert -75 <= tag['rssi'] <= -40
+	finally:
+		task.cancel()
+		await asyncio.gather(task, return_exceptions=True)
+		await emulator.stop()
+
+
+@pytest.mark.asyncio
+async def test_x714_emulator_answers_commands():
+	emulator = X714TcpEmulator('EMU-1', source=SyntheticTags(rate=0))
+	await emulator.start()
+	reader, writer = await asyncio.open_connection('127.0.0.1', emulator.port)
+	try:
+		writer.write(b'#get_info\n#READ:ON\nping\n')
+		lines = [(await reader.readline()).decode().strip() for _ in range(3)]
+		assert lines == ['#NAME:EMU-1', '#READ:ON', '#PONG']
+	finally:
+		writer.close()
+		await emulator.stop()
+
+
+@pytest.mark.asyncio
+async def test_r700_emulator_api_and_stream():
+	emulator = R700Emulator('EMU-R700', source=SyntheticTags(rate=1000, population=10, seed=2))
+	await emulator.start()
+	base = f'http://127.0.0.1:{emulator.port}/api/v1'
+	try:
+		async with httpx.AsyncClient() as client:
+			assert (await client.get(f'{base}/status')).json() == {'status': 'idle'}
+			assert (await client.post(f'{base}/profiles/inventory/start')).status_code == 204
+			assert (await client.get(f'{base}/system')).json()['serialNumber'] == 'EMU-R700'
+
+			events = []
+			async with client.stream('GET', f'{base}/data/stream') as response:
+				async for line in response.aiter_lines():
+					events.append(json.loads(line))
+					if len(events) >= 20:
+						break
+		tag = events[0]['tagInventoryEvent']
+		assert {'epcHex', 'tidHex', 'antennaPort', 'peakRssiCdbm'} <= tag.keys()
+		assert emulator.tags_sent >= 20
+	finally:
+		await emulator.stop()
+
+
+@pytest.mark.asyncio
+async def test_r700_webhook_posts_batched_events():
+	received = []
+
+	def handler(request: httpx.Request):
+		received.extend(json.loads(request.content))
+		return httpx.Response(200)
+
+	client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+	emulator = R700WebhookEmulator(
+		'EMU-R700',
+		'http://x-bridge/api/v1/receive/r700',
+		source=SyntheticTags(rate=1000, seed=3),
+		client=client,
+	)
+	await emulator.start()
+	try:
+		await wait_for(lambda: len(received) >= 50)
+	finally:
+		await emulator.stop()
+		await client.aclose()
+	assert received[0]['hostname'] == 'EMU-R700'
+	assert received[0]['eventType'] == 'tagInventory'
+	assert emulator.tags_sent == len(received)
+
+
+@pytest.mark.asyncio
+async def test_replay_keeps_timing_scaled_by_speed(tmp_path):
+	path = tmp_path / 'session.ndjson.gz'
+	with gzip.open(path, 'wt', encoding='utf-8') as f:
+		for i in range(10):
+			record = {
+				't': i * 0.05,
+				'device': 'portal',
+				'event_type': 'tag',
+				'data': {'epc': f'{i:024x}'},
+			}
+			f.write(json.dumps(record) + '\n')
+		f.write(
+			json.dumps({'t': 0.1, 'device': 'portal', 'event_type': 'reading', 'data': True}) + '\n'
+		)
+	records = load_recording(str(path))
+	assert len(records) == 10
+
+	start = time.monotonic()
+	replayed = [tag async for batch in ReplayTags(records, speed=2).batches() for tag in batch]
+	elapsed = time.monotonic() - start
+	assert [tag['epc'] for tag in replayed] == [f'{i:024x}' for i in range(10)]
+	assert 0.2 <= elapsed < 0.45  # 0.45 s recorded, replayed at 2x
+
+	start = time.monotonic()
+	batches = [batch async for batch in ReplayTags(records, speed=0).batches()]
+	assert len(batches) == 1 and time.monotonic() - start < 0.1
+
+
+def test_emulator_imports_without_the_application():
+	code = (
+		'import sys, emulator; '
+		"assert not [m for m in sys.modules if m == 'app' or m.startswith('app.')]"
+	)
+	subprocess.run([sys.executable, '-c', code], check=True, cwd=ROOT)
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.jobs import run_fleet_command, select_devices
+
+
+class FakeDevices:
+	def __init__(self, count, delay=0.1):
+		self.items = {
+			f'portal_{i}': SimpleNamespace(device_type='rfid', is_connected=i != 0)
+			for i in range(count)
+		}
+		self.items['printer'] = SimpleNamespace(device_type='printer', is_connected=True)
+		self.delay = delay
+		self.active = 0
+		self.max_active = 0
+		self.configs = {name: {'reader': 'X714', 'power': 20} for name in self.items}
+		self.powers = {}
+
+	def get_devices(self):
+		return list(self.items)
+
+	def get_device(self, name):
+		return self.items.get(name)
+
+	async def set_power(self, device_name, power):
+		self.active += 1
+		self.max_active = max(self.max_active, self.active)
+		try:
+			await asyncio.sleep(1 if device_name == 'portal_1' else self.delay)
+		finally:
+			self.active -= 1
+		if device_name == 'portal_2':
+			return False, 'Device does not support power'
+		self.powers[device_name] = power
+		return True, None
+
+	def get_device_config(self, name):
+		return dict(self.configs[name])
+
+	async def update_device_config(self, name, data):
+		self.configs[name] = data
+		return True, None
+
+
+def test_select_devices():
+	devices = FakeDevices(4)
+	assert select_devices(devices, device_type='rfid', connected=True) == [
+		'portal_1',
+		'portal_2',
+		'portal_3',
+	]
+	assert select_devices(devices, pattern='portal_[23]') == ['portal_2', 'portal_3']
+	assert select_devices(devices, names=['printer', 'missing']) == ['printer']
+
+
+@pytest.mark.asyncio
+async def test_fleet_command_runs_concurrently_with_timeouts():
+	devices = FakeDevices(40)
+	names = select_devices(devices, device_type='rfid')
+	start = time.perf_counter()
+	summary = await run_fleet_command(
+		devices, names, 'set_power', {'power': 25}, concurrency=8, timeout=0.5
+	)
+	elapsed = time.perf_counter() - start
+
+	assert elapsed < 2  # 40 devices x 0.1 s sequentially would take 4 s
+	assert devices.max_active == 8
+	assert summary['total'] == 40
+	assert summary['failed'] == 2
+	assert summary['results']['portal_1']['error'].startswith('Timed out')
+	assert summary['results']['portal_1']['elapsed'] < 1
+
+	# the timed-out reconfiguration is not cancelled halfway
+	assert devices.active == 1 and 'portal_1' not in devices.powers
+	for _ in range(100):
+		if 'portal_1' in devices.powers:
+			break
+		await asyncio.sleep(0.02)
+	assert devices.powers['portal_1'] == 25
+	assert summary['results']['portal_2']['error'] == 'Device does not support power'
+	assert summary['results']['portal_3'] == {
+		'success': True,
+		'error': None,
+		'elapsed': summary['results']['portal_3']['elapsed'],
+	}
+
+
+@pytest.mark.asyncio
+async def test_fleet_update_config_merges_and_validates():
+	devices = FakeDevices(2)
+	summary = await run_fleet_command(
+		devices, ['portal_0', 'portal_1'], 'update_config', {'config': {'power': 30}}
+	)
+	assert summary['succeeded'] == 2
+	assert devices.configs['portal_0'] == {'reader': 'X714', 'power': 30}
+
+	with pytest.raises(ValueError):
+		await run_fleet_command(devices, ['portal_0'], 'set_power', {'power': 'high'})
+	with pytest.raises(ValueError):
+		await run_fleet_command(devices, ['portal_0'], 'reboot')
+
+
+@pytest.mark.asyncio
+async def test_fleet_timeout_cancels_commands_that_do_not_reconfigure():
+	devices = FakeDevices(1)
+	cancelled = []
+
+	async def start_inventory(name):
+		try:
+			await asyncio.sleep(10)
+		except asyncio.CancelledError:
+			cancelled.append(name)
+			raise
+
+	devices.start_inventory = start_inventory
+	summary = await run_fleet_command(devices, ['portal_0'], 'start_inventory', timeout=0.05)
+	assert summary['results']['portal_0']['error'] == 'Timed out after 0.05s'
+	assert cancelled == ['portal_0']
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.services.jobs import JobManager, run_protected_mode_job
+
+
+class FakeDevices:
+	def __init__(self):
+		self.in_flight = {}
+		self.max_in_flight = {}
+
+	async def protected_mode(self, device_name, epc, password=None, active=True):
+		self.in_flight[device_name] = self.in_flight.get(device_name, 0) + 1
+		self.max_in_flight[device_name] = max(
+			self.max_in_flight.get(device_name, 0), self.in_flight[device_name]
+		)
+		await asyncio.sleep(0.01)
+		self.in_flight[device_name] -= 1
+		if epc.endswith('f'):
+			return False, 'tag not found'
+		return True, None
+
+
+@pytest.mark.asyncio
+async def test_protected_mode_job_pipelines_per_device():
+	devices = FakeDevices()
+	targets = {
+		'reader-a': [f'{i:024x}' for i in range(20)],
+		'reader-b': [f'{i:024x}' for i in range(100, 110)],
+	}
+	manager = JobManager()
+	job = manager.submit(
+		kind='protected_mode',
+		total=30,
+		runner=lambda job: run_protected_mode_job(
+			job, devices=devices, targets=targets, password=None, active=True, window=4
+		),
+	)
+
+	assert await job.wait(timeout=5)
+	assert job.status == 'completed'
+	assert job.done == 30
+	assert devices.max_in_flight == {'reader-a': 4, 'reader-b': 4}
+	assert job.failed == 1  # 00..0f
+	assert job.errors == [{'device': 'reader-a', 'item': f'{15:024x}', 'error': 'tag not found'}]
+	assert job.devices['reader-b'] == {'total': 10, 'succeeded': 10, 'failed': 0}
+	assert manager.get(job.id) is job
+
+
+@pytest.mark.asyncio
+async def test_job_cancel():
+	manager = JobManager()
+	job = manager.submit(kind='sleep', runner=lambda job: asyncio.sleep(10))
+	await asyncio.sleep(0)
+	assert manager.cancel(job.id)
+	assert await job.wait(timeout=1)
+	assert job.status == 'cancelled'
+	assert not manager.cancel(job.id)
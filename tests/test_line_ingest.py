@@ -0,0 +1,97 @@
+import asyncio
+import json
+import socket
+
+import pytest
+
+from app.services.rfid.line_ingest import LineIngestServer, parse_line
+
+
+class FakeManager:
+	def __init__(self):
+		self.tags = []
+
+	def on_tag(self, name, tag_data):
+		self.tags.append((name, tag_data))
+
+
+def test_parse_line():
+	assert parse_line(b'portal_1,3034aa,e280bb,2,-55\r\n') == (
+		'portal_1',
+		{'epc': '3034aa', 'tid': 'e280bb', 'ant': 2, 'rssi': -55},
+	)
+	assert parse_line(b',3034aa,,,') == (None, {'epc': '3034aa', 'tid': None})
+	assert parse_line(b'{"device": "d", "epc": "aa", "ant": 1}') == ('d', {'epc': 'aa', 'ant': 1})
+	assert parse_line(b'  ') is None
+	for bad in (b'portal_1', b'portal_1,aa,bb,x', b'{"epc":'):
+		with pytest.raises(ValueError):
+			parse_line(bad)
+
+
+async def wait_until(condition):
+	for _ in range(500):
+		if condition():
+			return
+		await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_tcp_connections_and_udp():
+	manager = FakeManager()
+	server = LineIngestServer(
+		manager, host='127.0.0.1', tcp_port=0, udp_port=0, default_device='push', batch_size=7
+	)
+	await server.start()
+	try:
+		writers = []
+		for i in range(20):
+			_, writer = await asyncio.open_connection('127.0.0.1', server.tcp_port)
+			writers.append(writer)
+		for i, writer in enumerate(writers):
+			# split mid-record: the tail must wait for the rest of the line
+			epc = f'{i + 100:024x}'
+			writer.write(f'dev{i},{i:024x},,1,-60\ndev{i},{epc[:10]}'.encode())
+		await asyncio.gather(*(writer.drain() for writer in writers))
+		for i, writer in enumerate(writers):
+			writer.write(f'{i + 100:024x}'[10:].encode() + b'\nbroken line\n')
+		await asyncio.gather(*(writer.drain() for writer in writers))
+
+		udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+		udp.sendto(
+			json.dumps({'epc': 'ff' * 12, 'rssi': -40}).encode() + b'\n' + b'udp,' + b'ee' * 12,
+			('127.0.0.1', server.udp_port),
+		)
+		udp.close()
+
+		await wait_until(lambda: len(manager.tags) >= 42)
+		stats = server.get_stats()
+		assert stats['connections'] == 20 and stats['connections_total'] == 20
+		assert stats['errors'] == 20 and stats['records'] == 42
+		assert stats['tcp_bytes'] > 0 and stats['udp_bytes'] > 0 and stats['datagrams'] == 1
+		names = [name for name, _ in manager.tags]
+		assert names.count('dev3') == 2 and 'push' in names and 'udp' in names
+		assert ('dev3', {'epc': f'{103:024x}'}) in manager.tags
+
+		for writer in writers:
+			writer.close()
+		await wait_until(lambda: server.get_stats()['connections'] == 0)
+		assert server.get_stats()['connections'] == 0
+	finally:
+		await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_pauses_tcp_reading():
+	manager = FakeManager()
+	server = LineIngestServer(manager, host='127.0.0.1', tcp_port=0, max_pending=10, batch_size=5)
+	await server.start()
+	try:
+		_, writer = await asyncio.open_connection('127.0.0.1', server.tcp_port)
+		writer.write(b''.join(f'd,{i:024x}\n'.encode() for i in range(1000)))
+		await writer.drain()
+		await wait_until(lambda: server.records >= 1000)
+		assert [tag['epc'] for _, tag in manager.tags] == [f'{i:024x}' for i in range(1000)]
+		assert server.dropped == 0 and not server._paused
+		writer.close()
+	finally:
+		await server.stop()
@@ -0,0 +1,143 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from datetime import datetime, timedelta, timezone
+
+from app.core.log_pipeline import (
+	BatchedJsonFileHandler,
+	LazyQueueHandler,
+	RateLimitFilter,
+	setup_log_pipeline,
+)
+
+
+def _record(msg, *args, level=logging.INFO):
+	return logging.LogRecord('test', level, __file__, 1, msg, args, None)
+
+
+def test_rate_limit_filter_caps_category_without_formatting():
+	rate_filter = RateLimitFilter({'[ TAG ]': 2})
+
+	class Unformattable:
+		def __str__(self):
+			raise AssertionError('suppressed records must not be formatted')
+
+	allowed = [rate_filter.filter(_record('[ TAG ] %s', 'x')) for _ in range(2)]
+	suppressed = rate_filter.filter(_record('[ TAG ] %s', Unformattable()))
+
+	assert allowed == [True, True]
+	assert suppressed is False
+	assert rate_filter.suppressed_total['[ TAG ]'] == 1
+	assert rate_filter.filter(_record('[ EVENT ] %s', 'x')) is True
+	assert rate_filter.filter(_record('[ TAG ] %s', 'x', level=logging.ERROR)) is True
+
+
+def test_prepared_record_keeps_exception_for_json_output():
+	try:
+		raise RuntimeError('boom')
+	except RuntimeError:
+		record = logging.LogRecord('test', logging.ERROR, __file__, 1, 'failed %s', ('x',), None)
+		record.exc_info = sys.exc_info()
+
+	prepared = LazyQueueHandler(None).prepare(record)
+	output = BatchedJsonFileHandler.to_json(prepared)
+
+	assert prepared.args is None
+	assert '"message": "failed x"' in output
+	assert 'RuntimeError: boom' in output
+
+
+class FakeLoggerManager:
+	"""The parts of LoggerManager the pipeline uses, without its threads and root handlers."""
+
+	def __init__(self, log_path):
+		self.log_path = log_path
+		self.current_date = datetime.now(timezone.utc).date()
+		self.filename = self._get_filename_for_date(self.current_date)
+		self.cleanups = 0
+		self.closed = False
+
+	def _get_filename_for_date(self, day):
+		return str(self.log_path / f'{day:%Y-%m-%d}_test.jsonl')
+
+	def _cleanup_old_logs(self):
+		self.cleanups += 1
+
+	def _switch_to_default_path(self, failed_path, error):
+		return False
+
+	def close(self):
+		self.closed = True
+
+
+def _read_lines(path):
+	with open(path, encoding='utf-8') as f:
+		return [json.loads(line) for line in f]
+
+
+def test_batched_file_handler_writes_batches_and_rolls_over(tmp_path):
+	manager = FakeLoggerManager(tmp_path)
+	log_queue = queue.Queue()
+	log_queue.put('more records waiting')
+	handler = BatchedJsonFileHandler(manager, log_queue, batch_size=3)
+
+	for i in range(2):
+		handler.emit(_record('[ TAG ] read %d', i))
+	assert not os.path.exists(manager.filename)  # buffered while the queue is busy
+	handler.emit(_record('[ TAG ] read %d', 2))
+	assert [line['message'] for line in _read_lines(manager.filename)] == [
+		'[ TAG ] read 0',
+		'[ TAG ] read 1',
+		'[ TAG ] read 2',
+	]
+
+	# first write of a new day goes to that day's file and cleans up old logs
+	today_file = manager.filename
+	manager.current_date -= timedelta(days=1)
+	manager.filename = manager._get_filename_for_date(manager.current_date)
+	log_queue.get()
+	handler.emit(_record('[ EVENT ] %s', 'reading'))  # queue empty: written at once
+	assert manager.filename == today_file and manager.cleanups == 1
+	assert not os.path.exists(manager._get_filename_for_date(manager.current_date - timedelta(1)))
+	last = _read_lines(today_file)[-1]
+	assert last['message'] == '[ EVENT ] reading' and last['level'] == 'INFO'
+
+
+def test_setup_log_pipeline_writes_from_the_listener_thread(tmp_path):
+	root = logging.getLogger()
+	handlers, level = root.handlers[:], root.level
+	root.setLevel(logging.INFO)
+	manager = FakeLoggerManager(tmp_path)
+	try:
+		listener = setup_log_pipeline(manager, rate_limits={'[ TAG ]': 5}, batch_size=4)
+		for i in range(20):
+			logging.info('[ TAG ] %s', i)
+		logging.warning('reader %s disconnected', 'portal_1')
+		listener.stop()
+	finally:
+		atexit.unregister(listener.stop)
+		atexit.unregister(listener.handlers[1].flush)
+		listener.handlers[1].flush()
+		for handler in root.handlers[:]:
+			root.removeHandler(handler)
+		for handler in handlers:
+			root.addHandler(handler)
+		root.setLevel(level)
+
+	assert manager.closed  # LoggerManager's own writer thread is stopped
+	messages = [line['message'] for line in _read_lines(manager.filename)]
+	assert messages[0].startswith('Async log pipeline enabled')
+	assert messages[1:] == [f'[ TAG ] {i}' for i in range(5)] + ['reader portal_1 disconnected']
+
+
+def test_batched_file_handler_reports_failed_writes(tmp_path):
+	manager = FakeLoggerManager(tmp_path / 'missing')  # no fallback path either
+	handler = BatchedJsonFileHandler(manager, queue.Queue())
+	errors = []
+	handler.handleError = lambda record: errors.append((record.getMessage(), sys.exc_info()[0]))
+
+	handler.emit(_record('[ EVENT ] %s', 'reading'))
+	assert errors == [('[ EVENT ] reading', FileNotFoundError)]
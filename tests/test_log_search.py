@@ -0,0 +1,64 @@
+import json
+from datetime import datetime, timezone
+
+from app.services.logs import LogSearcher
+
+
+def _entry(level, message, timestamp):
+	return json.dumps({'timestamp': timestamp, 'level': level, 'message': message, 'module': 'm'})
+
+
+def _write_log(tmp_path, day, entries):
+	path = tmp_path / f'{day}_bridge.jsonl'
+	path.write_text('\n'.join(entries) + '\n', encoding='utf-8')
+	return path
+
+
+def test_search_filters_by_text_level_and_device(tmp_path):
+	_write_log(
+		tmp_path,
+		'2026-01-01',
+		[
+			_entry('INFO', '[ TAG ] reader-01 - epc=ABC123', '2026-01-01T10:00:00+00:00'),
+			_entry('ERROR', 'reader-02 disconnected', '2026-01-01T10:01:00+00:00'),
+			_entry('INFO', '[ TAG ] reader-02 - epc=abc123', '2026-01-01T10:02:00+00:00'),
+		],
+	)
+	searcher = LogSearcher(tmp_path, 'bridge')
+
+	by_text = searcher.search(text='abc123')
+	assert [e['message'] for e in by_text['results']] == [
+		'[ TAG ] reader-01 - epc=ABC123',
+		'[ TAG ] reader-02 - epc=abc123',
+	]
+
+	by_device_level = searcher.search(device='reader-02', levels=['error'])
+	assert [e['message'] for e in by_device_level['results']] == ['reader-02 disconnected']
+
+
+def test_search_pages_across_files_and_time_range(tmp_path):
+	_write_log(
+		tmp_path,
+		'2026-01-01',
+		[_entry('INFO', f'a{i}', '2026-01-01T10:00:00+00:00') for i in range(3)],
+	)
+	_write_log(
+		tmp_path,
+		'2026-01-02',
+		[_entry('INFO', f'b{i}', '2026-01-02T10:00:00+00:00') for i in range(3)],
+	)
+	searcher = LogSearcher(tmp_path, 'bridge')
+
+	messages = []
+	cursor = None
+	while True:
+		page = searcher.search(limit=2, cursor=cursor)
+		messages.extend(e['message'] for e in page['results'])
+		cursor = page['next_cursor']
+		if cursor is None:
+			break
+	assert messages == ['a0', 'a1', 'a2', 'b0', 'b1', 'b2']
+
+	second_day = searcher.search(start=datetime(2026, 1, 2, tzinfo=timezone.utc))
+	assert [e['message'] for e in second_day['results']] == ['b0', 'b1', 'b2']
+	assert second_day['files'] == ['2026-01-02_bridge.jsonl']
@@ -0,0 +1,69 @@
+import os
+
+from app.services.logs import LogTailer
+
+
+def _write(path, text, mode='a'):
+	with open(path, mode, encoding='utf-8') as f:
+		f.write(text)
+
+
+def test_tail_returns_last_lines_and_cursor(tmp_path):
+	log_file = tmp_path / 'app.jsonl'
+	_write(log_file, ''.join(f'line {i}\n' for i in range(10)), mode='w')
+
+	result = LogTailer().read(str(log_file), limit=3)
+
+	assert result['reset'] is True
+	assert result['lines'] == ['line 7', 'line 8', 'line 9']
+	assert result['offset'] == os.path.getsize(log_file)
+	assert result['total_lines'] == 10
+
+
+def test_incremental_read_only_returns_new_complete_lines(tmp_path):
+	log_file = tmp_path / 'app.jsonl'
+	_write(log_file, 'a\nb\n', mode='w')
+	tailer = LogTailer()
+	first = tailer.read(str(log_file), limit=10)
+
+	_write(log_file, 'c\nd\npartial')
+	second = tailer.read(str(log_file), offset=first['offset'], inode=first['inode'])
+
+	assert second['reset'] is False
+	assert second['lines'] == ['c', 'd']
+	assert second['total_lines'] == 4
+
+	_write(log_file, ' line\n')
+	third = tailer.read(str(log_file), offset=second['offset'], inode=second['inode'])
+	assert third['lines'] == ['partial line']
+	assert third['total_lines'] == 5
+
+
+def test_line_longer_than_the_read_window_advances_the_cursor(tmp_path):
+	log_file = tmp_path / 'app.jsonl'
+	_write(log_file, 'a\n', mode='w')
+	tailer = LogTailer(max_bytes_per_read=8)
+	first = tailer.read(str(log_file), limit=10)
+
+	_write(log_file, 'x' * 20 + '\nb\n')
+	cursor, pieces = first, []
+	for _ in range(5):
+		cursor = tailer.read(str(log_file), offset=cursor['offset'], inode=cursor['inode'])
+		pieces += cursor['lines']
+	assert pieces == ['x' * 8, 'x' * 8, 'xxxx', 'b']
+	assert cursor['offset'] == os.path.getsize(log_file)
+
+
+def test_rotation_resets_cursor(tmp_path):
+	log_file = tmp_path / 'app.jsonl'
+	_write(log_file, 'old 1\nold 2\nold 3\n', mode='w')
+	tailer = LogTailer()
+	first = tailer.read(str(log_file), limit=10)
+
+	os.remove(log_file)
+	_write(log_file, 'new\n', mode='w')
+	second = tailer.read(str(log_file), offset=first['offset'], inode=first['inode'])
+
+	assert second['reset'] is True
+	assert second['lines'] == ['new']
+	assert second['total_lines'] == 1
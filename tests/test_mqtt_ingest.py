@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.mqtt import MqttIngest
+
+from .mqtt_broker import LocalBroker
+from app.services.mqtt.ingest import decode_r700, decode_x714
+
+
+class FakeManager:
+	def __init__(self):
+		self.tags = []
+		self.events = []
+		self.r700_batches = []
+		self.xscan = []
+
+	def on_tag(self, name, tag_data):
+		self.tags.append((name, tag_data))
+
+	def on_event(self, name, event_type, event_data):
+		if event_type == 'tag':
+			self.on_tag(name, event_data)
+		else:
+			self.events.append((name, event_type, event_data))
+
+	def handle_r700_event(self, events):
+		self.r700_batches.append(events)
+
+	def on_xscan_event(self, device_name, event_type, event_data):
+		self.xscan.append((device_name, event_type, event_data))
+
+
+def r700_tag(epc):
+	return {
+		'eventType': 'tagInventory',
+		'tagInventoryEvent': {'epcHex': epc, 'antennaPort': 1, 'peakRssiCdbm': -5500},
+	}
+
+
+def test_decoders():
+	ndjson = '\n'.join(json.dumps(r700_tag(f'{i:024x}')) for i in range(3)).encode()
+	events = decode_r700(ndjson, 'dock_1')
+	assert len(events) == 3 and {event['hostname'] for event in events} == {'dock_1'}
+
+	lines = b'#T+@3034000000000000000000AB|E28011910000000000000001|2|61\n#READ:ON\n'
+	assert decode_x714(lines, 'door') == [
+		(
+			'door',
+			'tag',
+			{
+				'epc': '3034000000000000000000ab',
+				'tid': 'e28011910000000000000001',
+				'ant': 2,
+				'rssi': -61,
+			},
+		)
+	]
+	event = json.dumps({'event_type': 'reading', 'event_data': True, 'device_name': 'x'}).encode()
+	assert decode_x714(event, None) == [('x', 'reading', True)]
+
+
+def ingest_subscriptions():
+	return [
+		{'topic': 'readers/{device}/events', 'format': 'r700'},
+		{'topic': 'dock/door1', 'format': 'x714', 'device': 'door_1'},
+		{'topic': 'xscan/{device}', 'format': 'xscan'},
+		{'topic': 'tags/{device}', 'format': 'tags'},
+	]
+
+
+def test_topics_map_to_devices_and_formats():
+	manager = FakeManager()
+	ingest = MqttIngest('mqtt://localhost', ingest_subscriptions(), manager=manager)
+	fed = ingest.process(
+		[
+			(
+				'readers/portal_1/events',
+				json.dumps([r700_tag('aa' * 12), r700_tag('bb' * 12)]).encode(),
+			),
+			('readers/portal_2/events', json.dumps(r700_tag('cc' * 12)).encode()),
+			('dock/door1', b'#T+@dd|e2|1|50\n'),
+			('xscan/scanner', json.dumps({'event_type': 'inventory', 'event_data': {}}).encode()),
+			('tags/gate', json.dumps([{'epc': 'ee' * 12, 'ant': 1}]).encode()),
+			('unknown/topic', b'{}'),
+			('readers/portal_1/events', b'{not json'),
+		]
+	)
+	assert fed == 6 and ingest.errors == 1
+	assert len(manager.r700_batches) == 1  # one call for the whole batch
+	assert [event['hostname'] for event in manager.r700_batches[0]] == [
+		'portal_1',
+		'portal_1',
+		'portal_2',
+	]
+	assert [name for name, _ in manager.tags] == ['door_1', 'gate']
+	assert manager.xscan == [('scanner', 'inventory', {})]
+
+	# stable client ID: the persistent session is resumed after a restart
+	same = MqttIngest('mqtt://localhost', ingest_subscriptions(), manager=manager)
+	other = MqttIngest('mqtt://broker', ingest_subscriptions(), manager=manager)
+	assert ingest.client_id == same.client_id != other.client_id
+
+	with pytest.raises(ValueError):
+		MqttIngest('mqtt://localhost', [{'topic': 'x', 'format': 'csv'}], manager=manager)
+
+
+@pytest.mark.asyncio
+async def test_ingest_receives_from_broker():
+	broker = LocalBroker()
+	await broker.start()
+	manager = FakeManager()
+	ingest = MqttIngest(
+		f'mqtt://127.0.0.1:{broker.port}',
+		[{'topic': 'readers/{device}/events', 'format': 'r700'}],
+		manager=manager,
+	)
+	task = asyncio.create_task(ingest.run())
+	try:
+		for _ in range(200):
+			if any(session.subscriptions for session in broker._sessions):
+				break
+			await asyncio.sleep(0.01)
+		for i in range(50):
+			broker.publish('readers/portal_1/events', json.dumps(r700_tag(f'{i:024x}')).encode())
+		for _ in range(200):
+			if ingest.events >= 50:
+				break
+			await asyncio.sleep(0.01)
+	finally:
+		task.cancel()
+		await asyncio.gather(task, return_exceptions=True)
+		await broker.stop()
+	events = [event for batch in manager.r700_batches for event in batch]
+	assert [event['tagInventoryEvent']['epcHex'] for event in events] == [
+		f'{i:024x}' for i in range(50)
+	]
+	assert ingest.get_stats()['messages'] == 50
@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services.mqtt import MqttPublisher, topic_matches
+
+from .mqtt_broker import LocalBroker
+
+
+async def started(publisher):
+	task = asyncio.create_task(publisher.run())
+	for _ in range(200):
+		if publisher.connected:
+			return task
+		await asyncio.sleep(0.01)
+	raise AssertionError('publisher did not connect')
+
+
+async def stop(task):
+	task.cancel()
+	await asyncio.gather(task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_tags_and_events_are_batched_per_topic():
+	broker = LocalBroker()
+	await broker.start()
+	publisher = MqttPublisher(
+		f'mqtt://127.0.0.1:{broker.port}', topic_prefix='site1', batch_size=500
+	)
+	task = await started(publisher)
+	try:
+		for i in range(1200):
+			await publisher.publish_tag({'device': 'portal_1', 'epc': f'{i:024x}'})
+		await publisher.publish_event('portal_1', 'reading', True)
+		await broker.wait_for_messages(4)
+	finally:
+		await stop(task)
+		await broker.stop()
+
+	tag_batches = [
+		json.loads(p) for topic, p, qos in broker.messages if topic == 'site1/portal_1/tags'
+	]
+	assert [len(batch) for batch in tag_batches] == [500, 500, 200]
+	assert [tag['epc'] for batch in tag_batches for tag in batch] == [
+		f'{i:024x}' for i in range(1200)
+	]
+	events = [(topic, json.loads(p)) for topic, p, qos in broker.messages if 'events' in topic]
+	assert events == [
+		(
+			'site1/portal_1/events/reading',
+			[{'device': 'portal_1', 'event_type': 'reading', 'event_data': True}],
+		)
+	]
+	assert {qos for _, _, qos in broker.messages} == {1}
+
+
+@pytest.mark.asyncio
+async def test_qos1_inflight_window_is_bounded():
+	broker = LocalBroker()
+	await broker.start()
+	broker.hold_acks = True
+	publisher = MqttPublisher(f'mqtt://127.0.0.1:{broker.port}', batch_size=1, max_inflight=3)
+	task = await started(publisher)
+	try:
+		for i in range(10):
+			await publisher.publish_tag({'device': 'd', 'epc': str(i)})
+		await broker.wait_for_messages(3)
+		await asyncio.sleep(0.2)
+		assert len(broker.messages) == 3
+		assert publisher.get_stats()['inflight'] == 3
+
+		broker.hold_acks = False
+		broker.release_acks()
+		await broker.wait_for_messages(10)
+	finally:
+		await stop(task)
+		await broker.stop()
+	assert [json.loads(p)[0]['epc'] for _, p, _ in broker.messages] == [str(i) for i in range(10)]
+
+
+@pytest.mark.asyncio
+async def test_items_are_buffered_until_the_broker_is_reachable():
+	broker = LocalBroker()
+	await broker.start()
+	port = broker.port
+	await broker.stop()  # nothing listens on the port yet
+
+	publisher = MqttPublisher(f'mqtt://127.0.0.1:{port}', batch_size=10)
+	task = asyncio.create_task(publisher.run())
+	try:
+		for i in range(25):
+			await publisher.publish_tag({'device': 'd', 'epc': str(i)})
+		await asyncio.sleep(0.1)
+		assert not publisher.connected and publisher.get_stats()['buffered'] == 25
+
+		broker = LocalBroker(port=port)
+		await broker.start()
+		await broker.wait_for_messages(3, timeout=10)
+	finally:
+		await stop(task)
+		await broker.stop()
+	assert sum(len(json.loads(p)) for _, p, _ in broker.messages) == 25
+
+
+@pytest.mark.asyncio
+async def test_offline_buffer_drops_oldest_batches():
+	publisher = MqttPublisher('mqtt://127.0.0.1:1', batch_size=5, buffer_size=10)
+	for i in range(30):
+		await publisher.publish_tag({'device': 'd', 'epc': str(i)})
+	stats = publisher.get_stats()
+	assert stats['buffered'] == 10 and stats['dropped'] == 20
+	assert [tag['epc'] for _, batch in publisher._ready for tag in batch] == [
+		str(i) for i in range(20, 30)
+	]
+
+
+def test_topic_filters():
+	assert topic_matches('xbridge/+/tags', 'xbridge/portal_1/tags')
+	assert topic_matches('xbridge/#', 'xbridge/portal_1/events/reading')
+	assert not topic_matches('xbridge/+/tags', 'xbridge/portal_1/events/tags')
+
+
+def test_client_id_is_stable_across_restarts():
+	first = MqttPublisher('mqtt://broker:1883')
+	assert MqttPublisher('mqtt://broker:1883').client_id == first.client_id
+	assert MqttPublisher('mqtt://broker:1883', topic_prefix='site2').client_id != first.client_id
+	assert MqttPublisher('mqtt://broker:1883', client_id='gate').client_id == 'gate'
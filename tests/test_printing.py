@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.services.printing import PrintService, ZplTemplate
+
+
+def test_template_render_and_missing():
+	template = ZplTemplate('^XA^FD{epc}^FS^FO{{x}}^FD{name}^FS^XZ')
+	assert template.variables == {'epc', 'name'}
+	assert template.render({'epc': 'ABC', 'name': 'shirt'}) == '^XA^FDABC^FS^FO{x}^FDshirt^FS^XZ'
+	assert template.missing({'epc': 'ABC'}) == {'name'}
+	assert ZplTemplate('{epc}').render({'epc': 1}) == '1'
+
+
+class FakePrinter:
+	device_type = 'printer'
+
+	def __init__(self):
+		self.is_connected = True
+		self.can_print = True
+
+
+class FakeDevices:
+	def __init__(self, service_ref):
+		self.printer = FakePrinter()
+		self.sent = []
+		self.service_ref = service_ref
+		self.drop_on = {1}  # disconnect while the label with this index is printing
+
+	def get_device(self, name):
+		return self.printer if name == 'sato' else None
+
+	def print(self, device_name, data):
+		if not self.printer.is_connected:
+			return False, 'Printer not connected.'
+		index = len(self.sent)
+		self.sent.append(data)
+		loop = asyncio.get_running_loop()
+		service = self.service_ref[0]
+		if index in self.drop_on:
+			self.drop_on.discard(index)
+			self.printer.is_connected = False
+			loop.call_later(0.3, setattr, self.printer, 'is_connected', True)
+		else:
+			loop.call_later(0.01, service.on_event, device_name, 'print_success', data)
+		return True, data
+
+
+@pytest.mark.asyncio
+async def test_print_job_resumes_after_reconnect():
+	ref = []
+	devices = FakeDevices(ref)
+	service = PrintService(devices=devices)
+	ref.append(service)
+
+	job = service.create_job(
+		device='sato',
+		template='^XA^FD{epc}^FS^XZ',
+		labels=[{'epc': f'{i:024x}'} for i in range(4)],
+	)
+	with pytest.raises(ValueError):
+		service.create_job(device='sato', template='{epc}', labels=[{'epc': 1}])
+
+	assert await job.wait(timeout=5)
+	run = service.runs[job.id]
+	assert job.status == 'completed'
+	assert job.succeeded == 4
+	assert run.resent == 1
+	assert devices.sent[1] == devices.sent[2]  # unconfirmed label sent again
+	assert run.get_labels()['counts']['printed'] == 4
+	assert run.labels_per_minute > 0
+
+
+def test_create_job_validates_variables():
+	service = PrintService(devices=FakeDevices([]))
+	with pytest.raises(ValueError, match='missing variables'):
+		service.create_job(device='sato', template='{epc}{sku}', labels=[{'epc': '1'}])
+	with pytest.raises(ValueError, match='not a printer'):
+		service.create_job(device='other', template='{epc}', labels=[{'epc': '1'}])
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from app.services.rfid.lanes import CONTROL, TAG, PriorityLanes
+
+
+@pytest.mark.asyncio
+async def test_control_work_starts_before_queued_tag_work():
+	lanes = PriorityLanes(tag_concurrency=2, control_concurrency=4)
+	log = []
+
+	async def work(label, delay=0.001):
+		log.append(label)
+		await asyncio.sleep(delay)
+
+	for i in range(500):
+		lanes.submit(TAG, f'reader_{i % 2}', work(f'tag-{i}'))
+	await asyncio.sleep(0.005)  # burst in progress
+	lanes.submit(CONTROL, 'reader_0', work('stop-0'))
+	lanes.submit(CONTROL, 'reader_1', work('stop-1'))
+	assert lanes.get_stats()[TAG]['running'] <= 2
+
+	for _ in range(1000):
+		if lanes.started[TAG] == 500 and not lanes.running[TAG]:
+			break
+		await asyncio.sleep(0.005)
+	started_before_stop = log.index('stop-0')
+	assert started_before_stop < 20  # not behind the ~490 queued tag items
+	assert log.index('stop-1') < 20
+	assert [label for label in log if label.startswith('tag')] == [f'tag-{i}' for i in range(500)]
+	assert lanes.max_wait[CONTROL] < lanes.max_wait[TAG]
+
+
+@pytest.mark.asyncio
+async def test_control_work_runs_in_order_per_device():
+	lanes = PriorityLanes(control_concurrency=8)
+	events = []
+
+	async def work(device, label, delay):
+		events.append(('start', device, label))
+		await asyncio.sleep(delay)
+		events.append(('end', device, label))
+
+	lanes.submit(CONTROL, 'a', work('a', 'start', 0.03))
+	lanes.submit(CONTROL, 'a', work('a', 'stop', 0.0))
+	lanes.submit(CONTROL, 'b', work('b', 'connection', 0.0))
+
+	async def failing():
+		raise RuntimeError('boom')
+
+	lanes.submit(CONTROL, 'a', failing())
+	lanes.submit(CONTROL, 'a', work('a', 'after-error', 0.0))
+
+	for _ in range(100):
+		if ('end', 'a', 'after-error') in events:
+			break
+		await asyncio.sleep(0.01)
+
+	a_events = [(kind, label) for kind, device, label in events if device == 'a']
+	assert a_events == [
+		('start', 'start'),
+		('end', 'start'),
+		('start', 'stop'),
+		('end', 'stop'),
+		('start', 'after-error'),
+		('end', 'after-error'),
+	]
+	# device b was not held up by device a
+	assert events.index(('end', 'b', 'connection')) < events.index(('end', 'a', 'start'))
+	assert lanes.get_stats()[CONTROL] == {
+		'queued': 0,
+		'running': 0,
+		'started': 5,
+		'dropped': 0,
+		'max_wait': lanes.max_wait[CONTROL],
+		'limit': 8,
+	}
+
+
+@pytest.mark.asyncio
+async def test_tag_queue_is_bounded_and_closed_at_shutdown():
+	lanes = PriorityLanes(tag_concurrency=1, tag_queue_limit=3)
+	release = asyncio.Event()
+	done = []
+
+	async def work(label):
+		await release.wait()
+		done.append(label)
+
+	coros = [work(f'tag-{i}') for i in range(6)]
+	for coro in coros:
+		lanes.submit(TAG, 'reader', coro)
+	await asyncio.sleep(0)
+	# one running, three queued, two dropped (closed, never awaited)
+	assert lanes.get_stats()[TAG]['queued'] == 3
+	assert lanes.dropped[TAG] == 2
+	assert coros[4].cr_frame is None and coros[5].cr_frame is None
+
+	lanes.close()
+	assert lanes.queued(TAG) == 0
+	assert all(coro.cr_frame is None for coro in coros[1:4])
+	release.set()
+	await asyncio.sleep(0.01)
+	assert done == ['tag-0']
+
+
+@pytest.mark.asyncio
+async def test_release_starts_queued_tag_work_of_a_device_first():
+	lanes = PriorityLanes(tag_concurrency=1)
+	release = asyncio.Event()
+	log = []
+
+	async def work(label, wait=False):
+		log.append(label)
+		if wait:
+			await release.wait()
+
+	lanes.submit(TAG, 'other', work('busy', wait=True))
+	for i in range(3):
+		lanes.submit(TAG, 'reader', work(f'read-{i}'))
+		lanes.submit(TAG, 'other', work(f'other-{i}'))
+	await asyncio.sleep(0)
+
+	# reading start: the reads of the previous session go before the start event
+	assert lanes.release('reader') == 3
+	lanes.submit(CONTROL, 'reader', work('start'))
+	await asyncio.sleep(0.01)
+	assert log == ['busy', 'read-0', 'read-1', 'read-2', 'start']
+	assert lanes.queued(TAG) == 3
+
+	release.set()
+	await asyncio.sleep(0.01)
+	assert log[5:] == ['other-0', 'other-1', 'other-2']
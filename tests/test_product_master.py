@@ -0,0 +1,112 @@
+import os
+import sqlite3
+
+import pytest
+
+from app.services.rfid.product_master import ProductIndex, ProductMaster, build_index
+
+
+def write_csv(path, rows):
+	with open(path, 'w', encoding='utf-8') as f:
+		f.write('GTIN,epc_prefix,sku,description\n')
+		for row in rows:
+			f.write(','.join(row) + '\n')
+
+
+def test_index_lookup(tmp_path):
+	source = str(tmp_path / 'products.csv')
+	rows = [(f'{7891000000000 + i:014d}', '', f'SKU-{i}', f'Item {i}') for i in range(5000)]
+	rows += [
+		('', '3034aabb', 'SKU-PALLET', 'Pallet'),
+		('', '3034AA', 'SKU-SHORT', ''),
+		('not-a-gtin', '', 'SKU-BAD', ''),
+		(f'{7891000000000:014d}', '', 'SKU-0-NEW', 'Item 0 replaced'),
+	]
+	write_csv(source, rows)
+	stats = build_index(source, str(tmp_path / 'index.idx'))
+	assert stats == {'entries': 5002, 'skipped': 1, 'fields': ['sku', 'description']}
+
+	index = ProductIndex(str(tmp_path / 'index.idx'))
+	try:
+		assert index.lookup(gtin='07891000004999') == {
+			'sku': 'SKU-4999',
+			'description': 'Item 4999',
+		}
+		assert index.lookup(gtin='07891000000000')['sku'] == 'SKU-0-NEW'  # last row wins
+		# longest EPC prefix first, case-insensitive; GTIN takes precedence
+		assert index.lookup(epc='3034AABB0000')['sku'] == 'SKU-PALLET'
+		assert index.lookup(epc='3034aa110000') == {'sku': 'SKU-SHORT', 'description': None}
+		assert index.lookup(gtin='07891000000001', epc='3034aabb')['sku'] == 'SKU-1'
+		assert index.lookup(gtin='00000000000000', epc='e200') is None
+		assert index.lookup(epc='zz34aabb') is None
+	finally:
+		index.close()
+
+
+@pytest.mark.asyncio
+async def test_enrich_and_hot_reload(tmp_path):
+	source = str(tmp_path / 'products.db')
+	connection = sqlite3.connect(source)
+	connection.execute('CREATE TABLE products (gtin TEXT, sku TEXT, description TEXT)')
+	connection.execute("INSERT INTO products VALUES ('07891000000001', 'SKU-1', 'Shirt')")
+	connection.commit()
+
+	index_dir = str(tmp_path / 'state')
+	master = ProductMaster(source=source, index_dir=index_dir)
+	tag = {'epc': '3034', 'gtin': '07891000000001'}
+	master.enrich(tag)
+	assert 'sku' not in tag  # not loaded yet
+
+	assert await master.reload_if_changed()
+	assert not await master.reload_if_changed()
+	master.enrich(tag)
+	unknown = {'epc': '3034', 'gtin': '07891000000002'}
+	master.enrich(unknown)
+	assert tag['sku'] == 'SKU-1' and unknown == {
+		'epc': '3034',
+		'gtin': '07891000000002',
+		'sku': None,
+		'description': None,
+	}
+
+	connection.execute("INSERT INTO products VALUES ('07891000000002', 'SKU-2', 'Pants')")
+	connection.commit()
+	connection.close()
+	stat = os.stat(source)
+	os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+	assert await master.reload_if_changed()
+	master.enrich(unknown)
+	assert unknown['sku'] == 'SKU-2'
+	assert len(os.listdir(index_dir)) == 1  # the previous index file was removed
+	assert master.get_stats()['hits'] == 2 and master.get_stats()['reloads'] == 2
+
+	# a restart reuses the index of an unchanged source
+	restarted = ProductMaster(source=source, index_dir=index_dir)
+	assert await restarted.reload_if_changed()
+	assert restarted.index.path == master.index.path
+	restarted.close()
+	master.close()
+
+
+@pytest.mark.asyncio
+async def test_columns_named_like_tag_fields_do_not_overwrite_the_tag(tmp_path):
+	source = tmp_path / 'products.csv'
+	source.write_text('gtin,sku,epc,timestamp,count\n07891000000001,SKU-1,ffff,yesterday,9\n')
+	stats = build_index(str(source), str(tmp_path / 'index.idx'))
+	assert stats['fields'] == ['sku', 'product_epc', 'product_timestamp', 'product_count']
+
+	master = ProductMaster(source=str(source), index_dir=str(tmp_path / 'state'))
+	assert await master.reload_if_changed()
+	tag = {'epc': '3034', 'gtin': '07891000000001', 'timestamp': 1.0, 'count': 3}
+	master.enrich(tag)
+	master.close()
+	assert tag == {
+		'epc': '3034',
+		'gtin': '07891000000001',
+		'timestamp': 1.0,
+		'count': 3,
+		'sku': 'SKU-1',
+		'product_epc': 'ffff',
+		'product_timestamp': 'yesterday',
+		'product_count': '9',
+	}
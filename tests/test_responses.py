@@ -0,0 +1,58 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core import responses
+from app.core.responses import FastJSONResponse, dumps, negotiated_response
+
+
+def make_request(accept: str = '*/*') -> Request:
+	return Request({'type': 'http', 'method': 'GET', 'headers': [(b'accept', accept.encode())]})
+
+
+TAGS = [
+	{
+		'timestamp': datetime(2026, 1, 2, 3, 4, 5, 123456),
+		'first_seen': datetime(2026, 1, 2, 3, 4, 5),
+		'device': 'portal',
+		'epc': f'{i:024x}',
+		'tid': None,
+		'ant': 1,
+		'rssi': -60.5,
+		'protected': False,
+		'description': 'Camisa ç',
+	}
+	for i in range(100)
+]
+
+
+@pytest.mark.parametrize('fast', [True, False])
+def test_dumps_matches_jsonable_encoder(monkeypatch, fast):
+	if not fast:
+		monkeypatch.setattr(responses, 'orjson', None)
+	expected = JSONResponse(content=jsonable_encoder(TAGS)).body
+	assert dumps(TAGS) == expected
+	assert FastJSONResponse(content=TAGS).body == expected
+
+	other = {'total': Decimal('2.5'), 1: 'numeric key'}
+	assert json.loads(dumps(other)) == {'total': 2.5, '1': 'numeric key'}
+
+
+def test_negotiated_response_json_by_default():
+	response = negotiated_response(make_request(), ['3034'])
+	assert response.media_type == 'application/json'
+	assert response.body == b'["3034"]'
+	assert response.headers['vary'] == 'Accept'
+
+
+def test_negotiated_response_msgpack():
+	msgpack = pytest.importorskip('msgpack')
+	response = negotiated_response(make_request('application/msgpack'), TAGS)
+	assert response.media_type == 'application/msgpack'
+	decoded = msgpack.unpackb(response.body)
+	assert decoded == json.loads(dumps(TAGS))
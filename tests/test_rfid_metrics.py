@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.services.rfid import metrics
+
+
+def _value(name, **labels):
+	return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_observe_tag_and_connection_counters():
+	before_new = _value('rfid_tag_reads_total', device='m-reader', antenna='1', kind='new')
+	before_reread = _value('rfid_tag_reads_total', device='m-reader', antenna='1', kind='reread')
+
+	metrics.observe_tag('m-reader', 1, True)
+	metrics.observe_tag('m-reader', 1, False)
+	metrics.observe_tag('m-reader', 1, False)
+
+	assert (
+		_value('rfid_tag_reads_total', device='m-reader', antenna='1', kind='new') == before_new + 1
+	)
+	assert (
+		_value('rfid_tag_reads_total', device='m-reader', antenna='1', kind='reread')
+		== before_reread + 2
+	)
+
+	metrics.observe_connection('m-reader', True)
+	metrics.observe_connection('m-reader', False)
+	metrics.observe_connection('m-reader', True)
+
+	assert _value('rfid_device_connections_total', device='m-reader', kind='connect') == 1
+	assert _value('rfid_device_connections_total', device='m-reader', kind='reconnect') == 1
+	assert _value('rfid_device_disconnections_total', device='m-reader') == 1
+
+
+@pytest.mark.asyncio
+async def test_tracked_task_and_latency():
+	async def fail():
+		raise RuntimeError('boom')
+
+	before_ok = _value('rfid_integration_latency_seconds_count', target='m-target', result='ok')
+	before_error = _value(
+		'rfid_integration_latency_seconds_count', target='m-target', result='error'
+	)
+
+	gate = asyncio.Event()
+	task = metrics.create_tracked_task('m-kind', metrics.timed('m-target', gate.wait()))
+	await asyncio.sleep(0)
+	assert _value('rfid_pending_tasks', kind='m-kind') == 1
+
+	gate.set()
+	await task
+	await asyncio.sleep(0)
+	assert _value('rfid_pending_tasks', kind='m-kind') == 0
+
+	with pytest.raises(RuntimeError):
+		await metrics.timed('m-target', fail())
+
+	assert (
+		_value('rfid_integration_latency_seconds_count', target='m-target', result='ok')
+		== before_ok + 1
+	)
+	assert (
+		_value('rfid_integration_latency_seconds_count', target='m-target', result='error')
+		== before_error + 1
+	)
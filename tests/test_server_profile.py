@@ -0,0 +1,41 @@
+import pytest
+
+from app.core import server
+from app.core.server import server_options
+
+
+def test_default_profile_keeps_uvicorn_defaults():
+	assert server_options('default', workers=4) == {'workers': 1}
+	assert server_options('default', keep_alive=30) == {'workers': 1, 'timeout_keep_alive': 30}
+	with pytest.raises(ValueError):
+		server_options('fast')
+
+
+def test_performance_profile(monkeypatch):
+	monkeypatch.setattr(server, '_installed', lambda module: True)
+	assert server_options('performance', workers=4, platform='linux', frozen=False) == {
+		'workers': 4,
+		'loop': 'uvloop',
+		'http': 'httptools',
+		'timeout_keep_alive': server.PERFORMANCE_KEEP_ALIVE,
+		'backlog': server.PERFORMANCE_BACKLOG,
+	}
+	assert server_options('performance', workers=4, platform='linux', frozen=True)['workers'] == 1
+	assert server_options('performance', backlog=128, platform='linux')['backlog'] == 128
+
+	# Windows keeps the selector loop policy set in main.py and a single process
+	windows = server_options('performance', workers=4, platform='win32', frozen=False)
+	assert windows['loop'] == 'asyncio' and windows['workers'] == 1
+
+	monkeypatch.setattr(server, '_installed', lambda module: False)
+	fallback = server_options('performance', platform='linux')
+	assert fallback['loop'] == 'asyncio' and fallback['http'] == 'h11'
+
+
+def test_workers_refused_while_a_single_process_feature_is_enabled(monkeypatch):
+	monkeypatch.setattr(server, '_installed', lambda module: True)
+	options = server_options(
+		'performance', workers=4, platform='linux', frozen=False, single_process=['devices']
+	)
+	assert options['workers'] == 1
+	assert server_options('performance', workers=4, platform='linux', frozen=False)['workers'] == 4
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+from smartx_rfid.dispatcher import EventDispatcher
+from smartx_rfid.dispatcher.main import _SqlBatchKey, _SqlItem
+
+from app.services.rfid.sql_dispatch import SqlBatchDispatcher
+
+
+def count_rows(db_path):
+	with sqlite3.connect(db_path) as conn:
+		return conn.execute('SELECT COUNT(*) FROM tags').fetchone()[0]
+
+
+@pytest.mark.asyncio
+async def test_sql_batches_flush_by_window_under_steady_load(tmp_path):
+	db_path = tmp_path / 'tags.db'
+	with sqlite3.connect(db_path) as conn:
+		conn.execute('CREATE TABLE tags (epc TEXT, ant INTEGER)')
+	dispatches = tmp_path / 'dispatchers'
+	dispatches.mkdir()
+	(dispatches / 'tags_sql.json').write_text(
+		json.dumps(
+			{
+				'dispatch_type': 'sql',
+				'on_event': 'tag',
+				'connection_string': f'sqlite+aiosqlite:///{db_path}',
+				'query': 'INSERT INTO tags (epc, ant) VALUES (:epc, :ant)',
+				'params': {'epc': '{data[epc]}', 'ant': '{data[ant]}'},
+			}
+		),
+		encoding='utf-8',
+	)
+
+	sql = SqlBatchDispatcher(batch_size=1000, flush_interval_seconds=0.05)
+	dispatcher = EventDispatcher(dispatches_path=str(dispatches), sql=sql)
+	await dispatcher.start()
+	try:
+		# a row every 10 ms: the queue is never idle for a whole flush interval
+		for i in range(30):
+			await dispatcher.add_async('portal', 'tag', {'epc': f'{i:024x}', 'ant': 1})
+			await asyncio.sleep(0.01)
+		assert await asyncio.to_thread(count_rows, db_path) > 0  # sent before the batch filled
+
+		await dispatcher.flush()
+		assert await asyncio.to_thread(count_rows, db_path) == 30
+		assert sql.rows_sent == 30
+		assert 1 < sql.batches_sent < 30  # grouped, not one INSERT per event
+	finally:
+		await dispatcher.stop(drain=False)
+		await sql.dispose_all()
+
+
+@pytest.mark.asyncio
+async def test_slow_database_applies_backpressure():
+	sql = SqlBatchDispatcher(batch_size=10, flush_interval_seconds=0.01, queue_max_size=50)
+	release = asyncio.Event()
+	executed = []
+
+	async def blocking_execute_many(connection_string, query, params_list):
+		await release.wait()
+		executed.append(len(params_list))
+
+	sql._execute_many = blocking_execute_many
+	key = _SqlBatchKey('sqlite+aiosqlite://', 'INSERT', retry_attempts=1, backoff_seconds=0)
+	sql.start()
+	try:
+		accepted = 0
+		for i in range(500):
+			try:
+				await sql.enqueue(_SqlItem(key, {'i': i}, 0.0), add_timeout=0.01)
+				accepted += 1
+			except asyncio.TimeoutError:
+				break
+		# 2 batches held per key + the batch being built + the bounded queue
+		assert accepted <= 2 * 10 + 10 + 50 + 1
+		assert len(sql._sending) <= 2 and sql.backpressure_waits >= 1
+
+		release.set()
+		await sql.flush()
+		assert sum(executed) == accepted == sql.rows_sent
+		assert sql._keys == {}  # idle keys are pruned
+	finally:
+		await sql.stop(drain=False)
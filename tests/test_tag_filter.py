@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.rfid._main import RfidManager
+from app.services.rfid.tag_filter import PrefixTrie, TagFilter
+
+
+def test_prefix_trie():
+	trie = PrefixTrie(['3034', 'E2801', '3034'])
+	assert len(trie) == 2
+	assert trie.match('3034aabb') and trie.match('e28011aa') and trie.match('E2801FFF')
+	assert not trie.match('303') and not trie.match('e280') and not trie.match('')
+	assert PrefixTrie(['']).match('anything')
+
+	many = PrefixTrie(f'{i:06x}' for i in range(0, 5000, 2))
+	assert many.match(f'{4998:06x}' + 'ff' * 9) and not many.match(f'{4999:06x}' + 'ff' * 9)
+
+
+def test_rules_count_drops():
+	tag_filter = TagFilter.from_settings(
+		{
+			'prefixes': ['3034', 'e200'],
+			'exclude_prefixes': '3034ff',
+			'rssi_floor': {'default': -70, '2': -50},
+			'devices': ['door', 'dock'],
+			'antennas': {'door': [1, 2]},
+			'epc_regex': '^[0-9a-f]{8}$',
+		},
+		tag_prefix=None,
+	)
+	reads = [
+		('door', '3034aaaa', 1, -60, True),
+		('dock', 'E200AAAA', 4, None, True),  # no RSSI, antennas unrestricted for dock
+		('hall', '3034aaaa', 1, -60, False),  # device
+		('door', '3034aaaa', 3, -60, False),  # antenna
+		('door', '3034aaaa', 2, -55, False),  # rssi (antenna 2 floor)
+		('dock', '3034aaaa', 1, -71, False),  # rssi (default floor)
+		('door', '1111aaaa', 1, -60, False),  # prefix
+		('door', None, 1, -60, False),  # prefix
+		('door', '3034ffaa', 1, -60, False),  # exclude_prefix
+		('door', '3034aaaaa', 1, -60, False),  # epc_regex
+	]
+	for device, epc, ant, rssi, accepted in reads:
+		assert tag_filter.accepts(device, epc, ant, rssi) is accepted, (device, epc, ant, rssi)
+	assert tag_filter.get_stats() == {
+		'rules': ['device', 'antenna', 'rssi', 'prefix', 'exclude_prefix', 'epc_regex'],
+		'accepted': 2,
+		'dropped': {
+			'device': 1,
+			'antenna': 1,
+			'rssi': 2,
+			'prefix': 2,
+			'exclude_prefix': 1,
+			'epc_regex': 1,
+			'invalid': 0,
+		},
+		'dropped_total': 8,
+	}
+
+	assert TagFilter.from_settings(None, tag_prefix=None) is None
+	assert TagFilter.from_settings({}, tag_prefix=['abc']).rules == ['tag_prefix']
+	with pytest.raises(ValueError):
+		TagFilter.from_settings({'prefix': ['30']})
+	with pytest.raises(ValueError):
+		TagFilter.from_settings({'epc_regex': '('})
+
+
+def test_r700_reads_filtered_before_tag_dict():
+	added = []
+	manager = SimpleNamespace(
+		tag_filter=TagFilter(prefixes=['3034'], rssi_floor=-60),
+		recorder=SimpleNamespace(active=False),
+		_add_tag=lambda name, tag_data: added.append((name, tag_data)),
+	)
+
+	def read(epc, cdbm):
+		return {
+			'hostname': 'portal',
+			'eventType': 'tagInventory',
+			'tagInventoryEvent': {'epcHex': epc, 'antennaPort': 1, 'peakRssiCdbm': cdbm},
+		}
+
+	RfidManager.handle_r700_event(
+		manager, [read('3034aa', -5500), read('3034bb', -6500), read('e200cc', -5000)]
+	)
+	assert added == [('portal', {'epc': '3034aa', 'tid': None, 'ant': 1, 'rssi': -55})]
+	assert manager.tag_filter.drops == {'rssi': 1, 'prefix': 1, 'invalid': 0}
+
+	assert RfidManager.on_tag(manager, 'portal', {'epc': 'e200cc', 'ant': 1}) == (False, None)
+	assert manager.tag_filter.drops['prefix'] == 2
+
+
+def test_filtered_reads_are_still_captured():
+	recorded, added = [], []
+	manager = SimpleNamespace(
+		tag_filter=TagFilter(prefixes=['3034']),
+		recorder=SimpleNamespace(active=True, record=lambda *args: recorded.append(args)),
+		_add_tag=lambda name, tag_data: added.append(tag_data['epc']),
+	)
+	r700_read = {
+		'hostname': 'portal',
+		'eventType': 'tagInventory',
+		'tagInventoryEvent': {'epcHex': 'e200aa', 'antennaPort': 2, 'peakRssiCdbm': -5000},
+	}
+	RfidManager.handle_r700_event(manager, [r700_read])
+	assert RfidManager.on_tag(manager, 'door', {'epc': 'e200bb', 'ant': 1}) == (False, None)
+	assert RfidManager.on_tag(manager, 'door', {'epc': '3034cc', 'ant': 1}) is None
+
+	assert added == ['3034cc']
+	assert recorded == [
+		('portal', 'tag', {'epc': 'e200aa', 'tid': None, 'ant': 2, 'rssi': -50}),
+		('door', 'tag', {'epc': 'e200bb', 'ant': 1}),
+		('door', 'tag', {'epc': '3034cc', 'ant': 1}),
+	]
+
+
+def test_string_fields_are_converted_before_the_rules():
+	tag_filter = TagFilter(rssi_floor={'default': -70, '2': -50}, antennas=[1, 2])
+	assert tag_filter.accepts('door', '3034', '1', '-60')
+	assert tag_filter.accepts('door', '3034', 1.0, -60.7)
+	assert not tag_filter.accepts('door', '3034', '2', '-55')  # antenna 2 floor
+	assert not tag_filter.accepts('door', '3034', '3', None)
+	assert tag_filter.accepts('door', '3034', 2, '')  # empty RSSI counts as missing
+	assert not tag_filter.accepts('door', '3034', 'one', -60)
+	assert not tag_filter.accepts('door', '3034', 1, 'strong')
+	assert not tag_filter.accepts('door', '3034', [1], -60)
+	assert tag_filter.drops == {'antenna': 1, 'rssi': 1, 'invalid': 3}
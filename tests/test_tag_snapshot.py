@@ -0,0 +1,99 @@
+import os
+
+import pytest
+from datetime import datetime, timedelta
+
+from smartx_rfid.utils import TagList
+
+from app.services.rfid.snapshot import TagSnapshot
+
+EPC = '30340242201d8840009f1' + '{:03x}'
+TID = 'e2801191200078' + '{:010x}'
+
+
+def read(tags, i, device='portal'):
+	return tags.add({'epc': EPC.format(i), 'tid': TID.format(i), 'ant': 1, 'rssi': -50}, device)
+
+
+def test_snapshot_restores_tags_and_write_list(tmp_path):
+	tags, write_list = TagList(unique_identifier='tid'), {}
+	snapshot = TagSnapshot(str(tmp_path), tags, write_list, compact_every=3)
+	for i in range(5):
+		read(tags, i)
+	assert snapshot.save() is True  # first record is the base
+	assert snapshot.save() is False  # nothing changed
+
+	for _ in range(3):
+		read(tags, 1)
+	write_list[TID.format(1)] = {'target': 'a' * 24}
+	tags.remove_tag_by_identifier(TID.format(4), 'tid')
+	record = snapshot.capture()
+	assert not record['full'] and list(record['tags']) == [TID.format(1)]
+	assert record['removed'] == [TID.format(4)]
+	snapshot.write(record)
+
+	# a record cut short by a crash is ignored
+	with open(snapshot.delta_path, 'ab') as f:
+		f.write(b'\x00\x00\x01\x00garbage')
+
+	restored_tags, restored_write_list = TagList(unique_identifier='tid'), {}
+	result = TagSnapshot(str(tmp_path), restored_tags, restored_write_list).restore()
+	assert result == {'tags': 4, 'skipped': 0, 'write_list': 1}
+	assert restored_write_list == write_list
+	tag = restored_tags.get_by_identifier(EPC.format(1))
+	assert tag['count'] == 4 and isinstance(tag['first_seen'], datetime)
+	new_tag, _ = read(restored_tags, 2)
+	assert new_tag is False  # not reported as new after the restart
+
+
+def test_snapshot_compacts_and_filters_old_tags(tmp_path):
+	tags, write_list = TagList(unique_identifier='tid'), {}
+	snapshot = TagSnapshot(str(tmp_path), tags, write_list, compact_every=3)
+	read(tags, 0)
+	snapshot.save()
+	for i in range(1, 4):
+		read(tags, i)
+		snapshot.save()
+	assert os.path.getsize(snapshot.delta_path) > 0
+	read(tags, 9)
+	snapshot.save()  # after three deltas the base is rewritten
+	assert os.path.getsize(snapshot.delta_path) == 0
+
+	tags.get_by_identifier(EPC.format(0))['timestamp'] = datetime.now() - timedelta(hours=2)
+	snapshot.save(full=True)
+	restored = TagList(unique_identifier='tid')
+	result = TagSnapshot(str(tmp_path), restored, {}).restore(max_age=3600)
+	assert result['tags'] == 4 and result['skipped'] == 1
+	assert restored.get_by_identifier(EPC.format(0)) is None
+
+
+def test_failed_write_is_followed_by_a_full_record(tmp_path, monkeypatch):
+	tags = TagList(unique_identifier='tid')
+	snapshot = TagSnapshot(str(tmp_path), tags, {}, compact_every=60)
+	read(tags, 0)
+	snapshot.save()
+
+	read(tags, 1)
+	record = snapshot.capture()
+	assert not record['full']
+	real_write = snapshot._write
+
+	def disk_full(record):
+		raise OSError(28, 'No space left on device')
+
+	monkeypatch.setattr(snapshot, '_write', disk_full)
+	with pytest.raises(OSError):
+		snapshot.write(record)
+	monkeypatch.setattr(snapshot, '_write', real_write)
+
+	read(tags, 2)
+	record = snapshot.capture()
+	assert record['full'] and len(record['tags']) == 3
+	snapshot.write(record)
+
+	restored = TagList(unique_identifier='tid')
+	assert TagSnapshot(str(tmp_path), restored, {}).restore()['tags'] == 3
+	assert restored.get_by_identifier(EPC.format(1)) is not None
+
+	read(tags, 3)
+	assert not snapshot.capture()['full']  # back to deltas
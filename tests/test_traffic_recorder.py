@@ -0,0 +1,104 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from emulator import load_recording
+from app.services.rfid.recorder import TrafficRecorder, list_segments, read_segment, replay_capture
+
+
+def tag(i):
+	return {'epc': f'{i:024x}', 'tid': f'e280{i:020x}', 'ant': 1, 'rssi': -50}
+
+
+@pytest.mark.asyncio
+async def test_recorder_writes_one_gzip_member_per_flush(tmp_path):
+	recorder = TrafficRecorder(str(tmp_path))
+	capture = recorder.start('field')
+	for i in range(100):
+		recorder.record('portal', 'tag', tag(i))
+	recorder.record('portal', 'reading', True)
+	assert await recorder.flush() == 101
+	for i in range(100, 150):
+		recorder.record('portal', 'tag', tag(i))
+	recorder.stop()
+	assert await recorder.flush() == 50
+
+	segments = list_segments(str(tmp_path / capture))
+	assert len(segments) == 1
+	records = read_segment(segments[0])
+	assert len(records) == 151
+	assert records[100] == {
+		't': records[100]['t'],
+		'device': 'portal',
+		'event_type': 'reading',
+		'data': True,
+	}
+	times = [record['t'] for record in records]
+	assert times == sorted(times)
+	assert recorder.list_captures()[0]['name'] == 'field'
+
+
+@pytest.mark.asyncio
+async def test_segments_rotate_and_old_ones_are_deleted(tmp_path):
+	recorder = TrafficRecorder(str(tmp_path), segment_bytes=1, max_segments=3)
+	capture = recorder.start()
+	for i in range(5):
+		recorder.record('portal', 'tag', tag(i))
+		await recorder.flush()
+	segments = list_segments(str(tmp_path / capture))
+	assert [os.path.basename(segment) for segment in segments] == [
+		'segment-00003.ndjson.gz',
+		'segment-00004.ndjson.gz',
+		'segment-00005.ndjson.gz',
+	]
+	assert [read_segment(segment)[0]['data']['epc'] for segment in segments] == [
+		tag(i)['epc'] for i in (2, 3, 4)
+	]
+
+
+@pytest.mark.asyncio
+async def test_replay_feeds_events_with_scaled_timing(tmp_path):
+	recorder = TrafficRecorder(str(tmp_path), segment_bytes=1)
+	capture = recorder.start()
+	for i in range(5):
+		recorder.record('portal', 'tag', tag(i))
+		await recorder.flush()  # one segment per record: replay crosses segments
+		await asyncio.sleep(0.05)
+	recorder.record('portal', 'reading', False)
+	recorder.stop()
+	await recorder.flush()
+
+	tags, events = [], []
+	path = recorder.capture_path(capture)
+	start = time.monotonic()
+	replayed = await replay_capture(
+		path,
+		on_event=lambda name, event_type, event_data: events.append((name, event_type, event_data)),
+		on_tag=lambda name, tag_data: tags.append(tag_data['epc']),
+		speed=2,
+	)
+	elapsed = time.monotonic() - start
+	assert replayed == 6
+	assert tags == [tag(i)['epc'] for i in range(5)]
+	assert events == [('portal', 'reading', False)]
+	assert 0.1 <= elapsed < 0.3  # ~0.25 s recorded, replayed at 2x
+
+	start = time.monotonic()
+	await replay_capture(path, on_event=lambda **_: None, on_tag=lambda **_: None, speed=0)
+	assert time.monotonic() - start < 0.1
+
+	# the emulator replays captures too
+	assert [record['data']['epc'] for record in load_recording(path)] == tags
+
+
+def test_capture_path_rejects_unknown_and_traversal(tmp_path):
+	recorder = TrafficRecorder(str(tmp_path / 'captures'))
+	(tmp_path / 'captures').mkdir()
+	with pytest.raises(ValueError):
+		recorder.capture_path('../captures')
+	with pytest.raises(ValueError):
+		recorder.capture_path('..')
+	with pytest.raises(ValueError):
+		recorder.capture_path('missing')
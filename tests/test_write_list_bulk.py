@@ -0,0 +1,71 @@
+from pyepc import SGTIN
+from smartx_rfid.utils import TagList
+
+from app.services.rfid.controller import Controller
+from app.services.rfid.write_rules import build_transform
+from app.services.rfid.write_scheduler import WriteScheduler
+
+
+def _controller(tags):
+	controller = object.__new__(Controller)
+	controller.tags = tags
+	controller.write_list = {}
+	controller.write_scheduler = WriteScheduler(
+		devices=None, write_list=controller.write_list, on_confirmed=lambda tag: None
+	)
+	controller.events = []
+	controller.on_event = lambda name, event_type, event_data: controller.events.append(
+		(event_type, event_data)
+	)
+	return controller
+
+
+def _sgtin(gtin, serial):
+	return (
+		SGTIN.from_sgtin(gtin=gtin, serial_number=str(serial), company_prefix_len=7)
+		.encode()
+		.lower()
+	)
+
+
+def test_transform_rules():
+	epc = _sgtin('07894900011517', 5)
+	assert build_transform({'type': 'prefix', 'prefix': 'abc'})(epc, 0) == 'abc' + epc[3:]
+	assert build_transform({'type': 'counter', 'prefix': 'ff', 'start': 10})(
+		epc, 2
+	) == 'ff' + 'c'.zfill(22)
+
+	target = build_transform({'type': 'sgtin', 'start': 100})(epc, 1)
+	decoded = SGTIN.decode(target)
+	assert decoded.gtin == '07894900011517'
+	assert decoded.serial_number == '101'
+
+
+def test_create_write_list_from_epcs_and_selector():
+	tags = TagList(unique_identifier='tid')
+	for i in range(5):
+		tags.add({'epc': _sgtin('07894900011517', i + 1), 'tid': f'e2{i:022x}'}, device='reader-01')
+	tags.add({'epc': 'bbbb00000000000000000001', 'tid': f'e2{99:022x}'}, device='reader-02')
+	controller = _controller(tags)
+
+	result = controller.create_write_list(
+		rule={'type': 'prefix', 'prefix': 'aaaa'},
+		epcs=['BBBB00000000000000000001', '000000000000000000000404'],
+	)
+	assert result['created'] == 1
+	assert result['not_found'] == ['000000000000000000000404']
+	assert controller.write_list == {f'e2{99:022x}': {'target': 'aaaa00000000000000000001'}}
+
+	result = controller.create_write_list(
+		rule={'type': 'sgtin', 'start': 1000},
+		selector={'device': 'reader-01', 'gtin': '07894900011517'},
+		replace=True,
+	)
+	assert result['created'] == 5
+	assert result['errors'] == []
+	assert len(controller.write_list) == 5
+	assert [event_type for event_type, _ in controller.events] == [
+		'write_list_created',
+		'write_list_created',
+	]
+	assert controller.events[-1][1]['created'] == 5
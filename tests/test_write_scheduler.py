@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.services.rfid.write_scheduler import WriteScheduler
+
+
+class FakeDevices:
+	def __init__(self):
+		self.writes = []
+		self.in_flight = 0
+		self.max_in_flight = 0
+
+	async def write_epc(self, device_name, write_tag):
+		self.in_flight += 1
+		self.max_in_flight = max(self.max_in_flight, self.in_flight)
+		await asyncio.sleep(0.02)
+		self.in_flight -= 1
+		self.writes.append((device_name, write_tag.target_value, write_tag.new_epc))
+		return True, None
+
+
+TID = 'e28011700000020a1b2c3d4e'
+OLD = '000000000000000000000001'
+TARGET = 'aaaa00000000000000000001'
+
+
+def _tag(tid, epc):
+	return {'tid': tid, 'epc': epc, 'device': 'reader-01'}
+
+
+@pytest.mark.asyncio
+async def test_rereads_are_deduplicated_and_confirmed():
+	devices = FakeDevices()
+	write_list = {TID: {'target': TARGET}}
+	confirmed = []
+	scheduler = WriteScheduler(
+		devices=devices, write_list=write_list, on_confirmed=confirmed.append, retry_interval=10
+	)
+
+	tag = _tag(TID, OLD)
+	for _ in range(40):
+		scheduler.on_tag('reader-01', tag)
+		await asyncio.sleep(0)
+	await asyncio.sleep(0.05)
+
+	assert devices.writes == [('reader-01', TID, TARGET)]
+
+	tag['epc'] = TARGET
+	scheduler.on_tag('reader-01', tag)
+	assert confirmed == [tag]
+	assert scheduler.get_stats()['encoded_per_minute'] == 1
+	assert scheduler.get_stats()['attempts'] == 1
+
+
+@pytest.mark.asyncio
+async def test_per_device_concurrency_and_empty_list():
+	devices = FakeDevices()
+	write_list = {}
+	scheduler = WriteScheduler(
+		devices=devices, write_list=write_list, on_confirmed=lambda tag: None, concurrency=3
+	)
+
+	scheduler.on_tag('reader-01', _tag(f'{0:024x}', OLD))
+	assert scheduler._workers == {}
+
+	for i in range(10):
+		write_list[f'{i:024x}'] = {'target': f'{i + 100:024x}'}
+		scheduler.on_tag('reader-01', _tag(f'{i:024x}', OLD))
+	await asyncio.sleep(0.2)
+
+	assert len(devices.writes) == 10
+	assert devices.max_in_flight == 3